@@ -1 +1,5 @@
+from accounts.admin.account import AccountAdmin  # noqa: F401
+from accounts.admin.api_token import ApiTokenAdmin  # noqa: F401
+from accounts.admin.balance_stats import BalanceStatsAdmin  # noqa: F401
+from accounts.admin.transfer import TransferAdmin  # noqa: F401
 from accounts.admin.user import UserAdmin  # noqa: F401
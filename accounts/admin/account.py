@@ -0,0 +1,33 @@
+from django.contrib import admin
+
+from accounts.models import Account
+from core.services.hot_accounts import disable_hot_account, enable_hot_account
+
+
+@admin.register(Account)
+class AccountAdmin(admin.ModelAdmin):
+    list_display = ("tin", "user", "total_balance", "is_hot_account", "version")
+    list_select_related = ("user",)
+    search_fields = ("tin",)
+    ordering = ("-pk",)
+    fields = ("user", "tin", "balance", "is_hot_account", "version")
+    readonly_fields = ("user", "tin", "is_hot_account", "version")
+    actions = ("enable_hot_account_mode", "disable_hot_account_mode")
+
+    # accounts are created together with their users
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="balance")
+    def total_balance(self, obj):
+        return obj.total_balance
+
+    @admin.action(description="Enable hot account mode")
+    def enable_hot_account_mode(self, request, queryset):
+        for account in queryset:
+            enable_hot_account(account)
+
+    @admin.action(description="Disable hot account mode")
+    def disable_hot_account_mode(self, request, queryset):
+        for account in queryset:
+            disable_hot_account(account)
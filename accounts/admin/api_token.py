@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from accounts.models import ApiToken
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ("user", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    readonly_fields = ("key", "created_at")
+    ordering = ("-id",)
@@ -0,0 +1,40 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+
+from accounts.models import BalanceSummary
+from core.services.balance_stats import get_balance_stats
+
+
+@admin.register(BalanceSummary)
+class BalanceStatsAdmin(admin.ModelAdmin):
+    """Dashboard of the precomputed statistics, it never scans the accounts."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        stats = get_balance_stats()
+        max_count = max(bucket["accounts_count"] for bucket in stats["buckets"])
+        for bucket in stats["buckets"]:
+            bucket["percent"] = (
+                100 * bucket["accounts_count"] // max_count if max_count else 0
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Balance statistics",
+            "opts": self.opts,
+            "stats": stats,
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, "admin/balance_stats.html", context)
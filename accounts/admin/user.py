@@ -1,10 +1,61 @@
 from django.contrib import admin
 
-from accounts.models import User
+from accounts.constants import TIN_MAX_LENGTH, TIN_MIN_LENGTH, TRIGRAM_MIN_LENGTH
+from accounts.models import Account, User
+from core.paginator import EstimatedCountPaginator
+
+
+class AccountInline(admin.StackedInline):
+    model = Account
+    fields = ("balance", "is_hot_account")
+    readonly_fields = ("is_hot_account",)
+    can_delete = False
+
+    # the account is created together with the user
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ("username", "email", "first_name", "last_name", "tin", "balance")
-    search_fields = ("username", "email", "first_name", "last_name", "tin")
+    list_display = (
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "tin",
+        "balance",
+    )
+    list_select_related = ("account",)
+    # every field is served by a trigram index, TINs are searched separately
+    search_fields = ("username", "email", "first_name", "last_name")
+    # the primary key index returns the newest users without sorting the table,
+    # sorting by any other column would not
     ordering = ("-id",)
+    sortable_by = ()
+    paginator = EstimatedCountPaginator
+    # the unfiltered total would be one more COUNT(*) of the whole table
+    show_full_result_count = False
+    inlines = (AccountInline,)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+
+        if term.isdigit():
+            # a whole TIN is found by the unique index without scanning a range of prefixes
+            if len(term) in (TIN_MIN_LENGTH, TIN_MAX_LENGTH):
+                user = queryset.filter(tin=term)
+                if user.exists():
+                    return user, False
+            return queryset.filter(tin__startswith=term), False
+
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            return queryset.filter(last_name__istartswith=term), False
+
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.display(description="balance")
+    def balance(self, obj):
+        return obj.account.balance
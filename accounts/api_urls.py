@@ -0,0 +1,12 @@
+from django.urls import path
+
+from accounts.views.balance import BalanceApiView
+from accounts.views.payout import PayoutApiView
+from accounts.views.transfer_api import TransferApiView
+
+
+urlpatterns = [
+    path("transfers/", TransferApiView.as_view(), name="api-transfer"),
+    path("payouts/", PayoutApiView.as_view(), name="api-payout"),
+    path("balances/<str:tin>/", BalanceApiView.as_view(), name="api-balance"),
+]
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+
+CACHE_KEY_PREFIX = "auth-user"
+
+
+def get_cache_key(user_id) -> str:
+    return f"{CACHE_KEY_PREFIX}:{user_id}"
+
+
+def forget_user(user_id) -> None:
+    """Drops the cached user once the transaction changing it commits."""
+    transaction.on_commit(lambda: cache.delete(get_cache_key(user_id)))
+
+
+class CachedModelBackend(ModelBackend):
+    """Keeps the users of authenticated sessions cached for AUTH_USER_CACHE_TIMEOUT seconds.
+
+    Every request of a logged in user looks the user up by the id in the session. Saving or
+    deleting a user forgets it, so a changed password or a deactivated user takes effect
+    on the next request of the workers sharing the cache; with the local memory cache the
+    other workers see it when their copy expires, as they do a QuerySet.update() of users.
+    """
+
+    def get_user(self, user_id):
+        key = get_cache_key(user_id)
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+        user = super().get_user(user_id)
+        if user is not None:
+            # add() does not overwrite a user forgotten and cached again meanwhile
+            cache.add(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
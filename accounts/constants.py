@@ -9,3 +9,40 @@ TIN_MIN_LENGTH = 10
 TIN_MAX_LENGTH = 12
 
 MAX_RECIPIENTS_COUNT = 100
+
+# payouts read recipients from an uploaded file and credit them in chunks of this size
+MAX_PAYOUT_RECIPIENTS_COUNT = 100000
+PAYOUT_CHUNK_SIZE = 5000
+
+# how many times a transfer is retried after a deadlock or a serialization failure
+MAX_TRANSFER_RETRIES = 3
+TRANSFER_RETRY_BACKOFF_SECONDS = 0.01
+# optimistic transfers lose a race instead of waiting for a lock, so they get more retries
+MAX_OPTIMISTIC_TRANSFER_RETRIES = 10
+
+MAX_BATCH_TRANSFERS_COUNT = 50000
+# transfers of a batch are applied in separate transactions of this size
+BATCH_TRANSFER_CHUNK_SIZE = 1000
+
+# number of balance rows credits to a hot account are spread across
+HOT_ACCOUNT_SHARDS_COUNT = 16
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+SENDER_LOOKUP_MIN_QUERY_LENGTH = 2
+SENDER_LOOKUP_MAX_QUERY_LENGTH = 32
+SENDER_LOOKUP_RESULTS_COUNT = 20
+SENDER_LOOKUP_CACHE_TIMEOUT = 60 * 5
+
+# admin changelists count the rows exactly only up to this estimated number
+ESTIMATED_COUNT_THRESHOLD = 100000
+# shorter search terms contain no trigram, so trigram indexes cannot serve them
+TRIGRAM_MIN_LENGTH = 3
+
+# cached balances are forgotten when a transfer commits, the timeout bounds
+# how long a balance changed outside of the services can be served
+BALANCE_CACHE_TIMEOUT = 60
+
+# the balance histogram of the dashboard has a bucket below every edge and one above the last
+BALANCE_BUCKET_EDGES = tuple(Decimal(10) ** power for power in range(1, 7))
+TOP_ACCOUNTS_COUNT = 10
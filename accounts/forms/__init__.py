@@ -1 +1,4 @@
-from accounts.forms.transfer_money import TransferMoneyForm  # noqa: F401
+from accounts.forms.batch_transfer import BatchTransferItemForm  # noqa: F401
+from accounts.forms.payout import PayoutForm, RecipientsFile  # noqa: F401
+from accounts.forms.transfer_api import TransferApiForm  # noqa: F401
+from accounts.forms.transfer_money import BaseTransferForm, TransferMoneyForm  # noqa: F401
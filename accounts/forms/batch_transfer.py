@@ -0,0 +1,13 @@
+from django import forms
+
+from accounts.forms.transfer_money import BaseTransferForm
+from accounts.validators import validate_tin
+
+
+class BatchTransferItemForm(BaseTransferForm):
+    sender = forms.CharField(label="Sender tin", strip=True, validators=[validate_tin])
+
+    field_order = ["sender", "recipients", "amount"]
+
+    def get_sender_tin(self):
+        return self.cleaned_data.get("sender")
@@ -0,0 +1,59 @@
+from django import forms
+
+from accounts.constants import MAX_PAYOUT_RECIPIENTS_COUNT, MIN_TRANSFER_AMOUNT, TIN_MAX_LENGTH, TIN_MIN_LENGTH
+from accounts.validators import validate_tin
+
+
+class RecipientsFile:
+    """TINs of an uploaded file separated by commas or new lines.
+
+    The file is read line by line and from the start on every iteration.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.count = 0
+
+    def __iter__(self):
+        self.file.seek(0)
+        for line in self.file:
+            for tin in line.decode().split(","):
+                tin = tin.strip()
+                if tin:
+                    yield tin
+
+
+class PayoutForm(forms.Form):
+    recipients = forms.FileField(
+        label="Recipients file", help_text="TINs separated by commas or new lines"
+    )
+    amount = forms.DecimalField(
+        max_digits=10, decimal_places=2, min_value=MIN_TRANSFER_AMOUNT
+    )
+
+    def __init__(self, sender, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sender = sender
+
+    def clean_recipients(self):
+        recipients = RecipientsFile(self.cleaned_data["recipients"])
+        try:
+            for tin in recipients:
+                validate_tin(tin)
+                if tin == self.sender.tin:
+                    raise forms.ValidationError("User cannot send money to himself")
+
+                recipients.count += 1
+                if recipients.count > MAX_PAYOUT_RECIPIENTS_COUNT:
+                    raise forms.ValidationError(
+                        f"Money cannot be sent to more than {MAX_PAYOUT_RECIPIENTS_COUNT} recipients"
+                    )
+        except UnicodeDecodeError:
+            raise forms.ValidationError("Recipients file must be a text file")
+
+        if not recipients.count:
+            raise forms.ValidationError(
+                f"TIN must be passed through a comma and contain {TIN_MIN_LENGTH} or {TIN_MAX_LENGTH} digits"
+            )
+
+        return recipients
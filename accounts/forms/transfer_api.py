@@ -0,0 +1,42 @@
+from django import forms
+
+from accounts.constants import IDEMPOTENCY_KEY_MAX_LENGTH
+from accounts.forms.transfer_money import BaseTransferForm
+
+
+class TransferApiForm(BaseTransferForm):
+    idempotency_key = forms.CharField(
+        required=False, max_length=IDEMPOTENCY_KEY_MAX_LENGTH
+    )
+    # relative shares of the recipients, the amount is split equally without them
+    weights = forms.JSONField(required=False)
+
+    def __init__(self, sender, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sender = sender
+
+    def get_sender_tin(self):
+        return self.sender.tin
+
+    def clean_weights(self):
+        weights = self.cleaned_data["weights"]
+        if weights is None:
+            return None
+
+        if not isinstance(weights, list) or not all(
+            isinstance(weight, int) and not isinstance(weight, bool) and weight > 0
+            for weight in weights
+        ):
+            raise forms.ValidationError("Weights must be a list of positive integers")
+
+        return weights
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        recipients = cleaned_data.get("recipients")
+        weights = cleaned_data.get("weights")
+        if recipients and weights is not None and len(weights) != len(recipients):
+            raise forms.ValidationError("Every recipient must have a weight")
+
+        return cleaned_data
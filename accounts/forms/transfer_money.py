@@ -1,13 +1,26 @@
 from django import forms
 
-from accounts.constants import MAX_RECIPIENTS_COUNT, MIN_TRANSFER_AMOUNT, TIN_MAX_LENGTH, TIN_MIN_LENGTH
+from accounts.constants import (
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    MAX_RECIPIENTS_COUNT,
+    MIN_TRANSFER_AMOUNT,
+    TIN_MAX_LENGTH,
+    TIN_MIN_LENGTH,
+)
 from accounts.models import User
 from accounts.validators import validate_tin
 
 
-class TransferMoneyForm(forms.Form):
-    sender = forms.ModelChoiceField(queryset=User.objects.all())
-    recipients = forms.CharField(
+class RecipientsField(forms.CharField):
+    def to_python(self, value):
+        # JSON clients pass a list of TINs instead of a comma separated string
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(map(str, value))
+        return super().to_python(value)
+
+
+class BaseTransferForm(forms.Form):
+    recipients = RecipientsField(
         label="Recipients tin",
         strip=True,
         min_length=TIN_MIN_LENGTH,
@@ -40,12 +53,43 @@ class TransferMoneyForm(forms.Form):
 
         return tins
 
+    def get_sender_tin(self):
+        """Returns the TIN of the sender once it is cleaned, a form without one skips the self-transfer check."""
+        return None
+
     def clean(self):
         cleaned_data = super().clean()
 
         recipients = cleaned_data.get("recipients")
-        sender = cleaned_data.get("sender")
-        if sender and recipients and sender.tin in recipients:
+        sender_tin = self.get_sender_tin()
+        if sender_tin and recipients and sender_tin in recipients:
             raise forms.ValidationError("User cannot send money to himself")
 
         return cleaned_data
+
+
+class TransferMoneyForm(BaseTransferForm):
+    # the choices are never rendered: the page looks senders up by TIN or last name,
+    # and validation fetches only the selected user
+    sender = forms.ModelChoiceField(
+        queryset=User.objects.all(),
+        widget=forms.TextInput(
+            attrs={
+                "list": "sender-options",
+                "autocomplete": "off",
+                "placeholder": "Start typing TIN or last name",
+            }
+        ),
+    )
+    # generated for every rendered form, so a resubmitted form does not transfer money twice
+    idempotency_key = forms.CharField(
+        widget=forms.HiddenInput,
+        required=False,
+        max_length=IDEMPOTENCY_KEY_MAX_LENGTH,
+    )
+
+    field_order = ["sender", "recipients", "amount"]
+
+    def get_sender_tin(self):
+        sender = self.cleaned_data.get("sender")
+        return sender.tin if sender else None
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = "Run a performance scenario against the configured database and print a JSON report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", choices=sorted(SCENARIOS))
+        parser.add_argument(
+            "--threads", type=int, default=8, help="Number of concurrent threads"
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=100,
+            help="Number of operations per thread",
+        )
+        parser.add_argument(
+            "--users", type=int, default=10, help="Number of users to seed"
+        )
+
+    def handle(self, *args, **options):
+        scenario = SCENARIOS[options["scenario"]]
+        report = scenario(
+            threads=options["threads"],
+            operations=options["operations"],
+            users=options["users"],
+        )
+        self.stdout.write(
+            json.dumps({"scenario": options["scenario"], **report}, indent=2)
+        )
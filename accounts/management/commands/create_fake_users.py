@@ -1,39 +1,123 @@
 import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
+from multiprocessing import get_context
+from typing import Optional
 
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 
 from faker import Faker
 
-from accounts.constants import ZERO_DECIMAL
-from accounts.models import User
+from accounts.models import Account, User
+from core.db import max_bulk_batch_size
 
 
 DEFAULT_USERS_COUNT = 5
+DEFAULT_USERS_PASSWORD = "password"
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_PROCESSES_COUNT = 1
 DEFAULT_SUPERUSER_TIN = "1234567890"
 DEFAULT_SUPERUSER_PASSWORD = "admin"
 
+# fake TINs are the numbers 1000000000-8999999999 shuffled by a multiplicative permutation,
+# so they are unique without remembering the ones already used and do not clash with
+# the benchmark users, whose TINs start with 9
+TIN_FIRST = 10**9
+TIN_SPACE = 8 * 10**9
+TIN_MULTIPLIER = 2654435761  # coprime with TIN_SPACE
 
-def create_fake_users(users_count: int):
-    fake = Faker()
+NAMES_POOL_SIZE = 1000
+
+
+def fake_tin(number: int) -> str:
+    return str(TIN_FIRST + number * TIN_MULTIPLIER % TIN_SPACE)
+
+
+def fake_tin_number(tin: str) -> Optional[int]:
+    """Returns the number fake_tin() turns into the TIN, None if it never generates it."""
+    if not tin.isdigit() or not TIN_FIRST <= int(tin) < TIN_FIRST + TIN_SPACE:
+        return None
+    return (int(tin) - TIN_FIRST) * pow(TIN_MULTIPLIER, -1, TIN_SPACE) % TIN_SPACE
+
+
+def create_fake_users(
+    start: int,
+    stop: int,
+    password: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    reserved_tin: Optional[str] = None,
+) -> int:
+    """Creates users with the fake TINs number start to stop, skipping reserved_tin.
 
-    for _ in range(users_count):
-        first_name = fake.first_name()
-        last_name = fake.last_name()
-        tin = fake.unique.numerify(text="##########")
-        balance = Decimal(fake.random_number(digits=5)) / 100
-
-        user = User(
-            username=tin,
-            first_name=first_name,
-            last_name=last_name,
-            tin=tin,
-            balance=balance,
-            is_staff=False,
-            is_superuser=False,
+    password is an already hashed password shared by all the users.
+    """
+    fake = Faker()
+    first_names = [fake.first_name() for _ in range(NAMES_POOL_SIZE)]
+    last_names = [fake.last_name() for _ in range(NAMES_POOL_SIZE)]
+    reserved_number = fake_tin_number(reserved_tin) if reserved_tin else None
+
+    created = 0
+    for batch_start in range(start, stop, batch_size):
+        users = []
+        for number in range(batch_start, min(batch_start + batch_size, stop)):
+            if reserved_number is not None and number >= reserved_number:
+                number += 1
+            tin = fake_tin(number)
+            users.append(
+                User(
+                    username=tin,
+                    first_name=random.choice(first_names),
+                    last_name=random.choice(last_names),
+                    tin=tin,
+                    password=password,
+                    is_staff=False,
+                    is_superuser=False,
+                )
+            )
+        # bulk_create skips the signal creating accounts of saved users
+        users = User.objects.bulk_create(users, batch_size=max_bulk_batch_size(User))
+        Account.objects.bulk_create(
+            (
+                Account(
+                    user=user,
+                    tin=user.tin,
+                    balance=Decimal(random.randrange(10**5)) / 100,
+                )
+                for user in users
+            ),
+            batch_size=max_bulk_batch_size(Account),
         )
-        user.set_password(tin)
-        user.save()
+        created += len(users)
+    return created
+
+
+def create_fake_users_in_processes(
+    users_count: int,
+    password: str,
+    batch_size: int,
+    processes: int,
+    reserved_tin: Optional[str] = None,
+) -> int:
+    step = -(-users_count // processes)
+    ranges = [
+        (start, min(start + step, users_count)) for start in range(0, users_count, step)
+    ]
+    # forked workers must open their own database connections
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=len(ranges), mp_context=get_context("fork")
+    ) as executor:
+        futures = [
+            executor.submit(
+                create_fake_users, start, stop, password, batch_size, reserved_tin
+            )
+            for start, stop in ranges
+        ]
+        return sum(future.result() for future in futures)
 
 
 def create_superuser():
@@ -43,7 +127,6 @@ def create_superuser():
         first_name="admin",
         last_name="admin",
         tin=tin,
-        balance=ZERO_DECIMAL,
         is_staff=True,
         is_superuser=True,
     )
@@ -59,21 +142,66 @@ class Command(BaseCommand):
             "--users_count",
             type=int,
             default=DEFAULT_USERS_COUNT,
-            choices=range(1, 101),
             help="Number of fake users to create",
         )
+        parser.add_argument(
+            "--password",
+            default=DEFAULT_USERS_PASSWORD,
+            help="Password of all the fake users",
+        )
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of users inserted at a time, a batch too big for one query is split",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=DEFAULT_PROCESSES_COUNT,
+            help="Number of processes inserting users in parallel",
+        )
 
     def handle(self, *args, **options):
+        users_count = options["users_count"]
+        if users_count < 1:
+            raise CommandError("users_count must be at least 1")
+        if users_count > TIN_SPACE:
+            raise CommandError(f"users_count cannot be greater than {TIN_SPACE}")
+        if options["batch_size"] < 1 or options["processes"] < 1:
+            raise CommandError("batch_size and processes must be at least 1")
+
         if User.objects.exists():
             self.stdout.write(
                 self.style.WARNING("Users already exist. No new users created.")
             )
             return
 
-        users_count = options["users_count"]
-        create_fake_users(users_count - 1)  # one user will be superuser
+        # hashing is slow on purpose, so every user gets the same hash computed once
+        password = make_password(options["password"])
+        reserved_tin = os.getenv("SUPERUSER_TIN", DEFAULT_SUPERUSER_TIN)
+        fake_users_count = users_count - 1  # one user will be superuser
+
+        started_at = time.perf_counter()
+        if options["processes"] > 1 and fake_users_count > options["batch_size"]:
+            created = create_fake_users_in_processes(
+                fake_users_count,
+                password,
+                options["batch_size"],
+                options["processes"],
+                reserved_tin,
+            )
+        else:
+            created = create_fake_users(
+                0, fake_users_count, password, options["batch_size"], reserved_tin
+            )
+        elapsed = time.perf_counter() - started_at
+
+        rate = created / elapsed if elapsed else 0
         self.stdout.write(
-            self.style.SUCCESS(f"Successfully created {users_count - 1} fake users")
+            self.style.SUCCESS(
+                f"Successfully created {created} fake users in {elapsed:.1f}s ({rate:.0f} rows/sec)"
+            )
         )
 
         create_superuser()
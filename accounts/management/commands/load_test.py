@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.load_test import TARGETS, read_traffic, run_load_test
+
+
+class Command(BaseCommand):
+    help = "Send concurrent transfers to the service, the form view or the API and report throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            choices=TARGETS,
+            default="service",
+            help="Where transfers are sent",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=8, help="Number of concurrent clients"
+        )
+        parser.add_argument(
+            "--transfers", type=int, default=100, help="Number of transfers per client"
+        )
+        parser.add_argument(
+            "--users", type=int, default=100, help="Number of users to seed"
+        )
+        parser.add_argument(
+            "--max-recipients",
+            type=int,
+            default=1,
+            help="Maximum number of recipients of a synthesized transfer",
+        )
+        parser.add_argument(
+            "--hot-skew",
+            type=float,
+            default=0.0,
+            help="Share of transfers paying the same (hot) recipient",
+        )
+        parser.add_argument(
+            "--hot-account",
+            action="store_true",
+            help="Shard the balance of the hot recipient",
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Random seed of synthesized traffic"
+        )
+        parser.add_argument(
+            "--replay",
+            help="JSON lines file with transfers to replay against existing users instead of synthesized traffic",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["transfers"] < 1:
+            raise CommandError("--threads and --transfers must be positive")
+        if not 0 <= options["hot_skew"] <= 1:
+            raise CommandError("--hot-skew must be between 0 and 1")
+        if options["users"] < 2:
+            raise CommandError("--users must be at least 2")
+
+        traffic = None
+        if options["replay"]:
+            with open(options["replay"]) as f:
+                traffic = read_traffic(f)
+            if not traffic:
+                raise CommandError("Nothing to replay")
+
+        report = run_load_test(
+            target=options["target"],
+            threads=options["threads"],
+            operations=options["transfers"],
+            users=options["users"],
+            max_recipients=options["max_recipients"],
+            hot_skew=options["hot_skew"],
+            hot_account=options["hot_account"],
+            traffic=traffic,
+            seed=options["seed"],
+        )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
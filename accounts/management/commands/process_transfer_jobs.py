@@ -0,0 +1,86 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.db import Busy, VersionConflict
+from core.services.transfer_jobs import process_next_job
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS_COUNT = 4
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class Command(BaseCommand):
+    help = "Apply enqueued transfers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS_COUNT,
+            help="Number of jobs processed concurrently",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help="Seconds to wait before checking an empty queue again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty",
+        )
+
+    def work(self, stop: threading.Event, poll_interval: float, once: bool) -> int:
+        processed = 0
+        try:
+            while not stop.is_set():
+                try:
+                    job = process_next_job()
+                except (Busy, VersionConflict):
+                    # the accounts are contended, the job is taken again later
+                    stop.wait(poll_interval)
+                    continue
+                except Exception:
+                    # the job transaction was rolled back, the job stays pending
+                    logger.exception("Transfer job failed")
+                    stop.wait(poll_interval)
+                    continue
+
+                if job is not None:
+                    processed += 1
+                elif once:
+                    break
+                else:
+                    stop.wait(poll_interval)
+        except BaseException:
+            # the other workers stop too, or the command would wait for them forever
+            stop.set()
+            raise
+        finally:
+            connections.close_all()
+        return processed
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        workers = options["workers"]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self.work, stop, options["poll_interval"], options["once"]
+                )
+                for _ in range(workers)
+            ]
+            try:
+                processed = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                stop.set()
+                processed = sum(future.result() for future in futures)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} transfer jobs"))
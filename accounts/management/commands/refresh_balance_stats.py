@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.services.balance_stats import refresh_balance_stats
+
+
+class Command(BaseCommand):
+    help = "Recount the balance statistics of the admin dashboard"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Seconds between refreshes, 0 refreshes once and exits",
+        )
+
+    def refresh(self) -> None:
+        started_at = time.perf_counter()
+        drift = refresh_balance_stats()
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed balance statistics in {elapsed:.1f}s, drift {drift}"
+            )
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        self.refresh()
+        while interval > 0:
+            time.sleep(interval)
+            close_old_connections()
+            self.refresh()
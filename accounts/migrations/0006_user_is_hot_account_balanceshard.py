@@ -0,0 +1,58 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:09
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_transfer_ledgerentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="is_hot_account",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name="BalanceShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveSmallIntegerField()),
+                (
+                    "balance",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_shards",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "slot"), name="unique_balance_shard_slot"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,155 @@
+from django.db import migrations, transaction
+
+
+BATCH_SIZE = 10000
+
+# ids of the users whose balance has changed since the copy started, filled by a trigger
+CHANGES_TABLE = "accounts_user_balance_change"
+
+
+def track_balance_changes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    User = apps.get_model("accounts", "User")
+    table = schema_editor.quote_name(CHANGES_TABLE)
+    schema_editor.execute(f"CREATE TABLE {table} (user_id bigint NOT NULL)")
+    schema_editor.execute(
+        f"CREATE FUNCTION {table}() RETURNS trigger AS $$ BEGIN "
+        f"INSERT INTO {table} VALUES (NEW.id); RETURN NULL; "
+        "END $$ LANGUAGE plpgsql"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {table} AFTER INSERT OR UPDATE OF balance, is_hot_account "
+        f"ON {schema_editor.quote_name(User._meta.db_table)} "
+        f"FOR EACH ROW EXECUTE FUNCTION {table}()"
+    )
+
+
+def stop_tracking_balance_changes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    User = apps.get_model("accounts", "User")
+    table = schema_editor.quote_name(CHANGES_TABLE)
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {table} "
+        f"ON {schema_editor.quote_name(User._meta.db_table)}"
+    )
+    schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}()")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def _copy_users(apps, users) -> None:
+    Account = apps.get_model("accounts", "Account")
+    # a re-run or a user copied again refreshes the account
+    Account.objects.bulk_create(
+        [
+            Account(
+                user_id=user["pk"],
+                tin=user["tin"],
+                balance=user["balance"],
+                is_hot_account=user["is_hot_account"],
+            )
+            for user in users
+        ],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["tin", "balance", "is_hot_account"],
+    )
+
+
+def copy_balances_to_accounts(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+
+    # every batch commits on its own and reads users without locking them;
+    # users changed behind the copy are recorded by the trigger and copied again
+    last_pk = 0
+    while True:
+        users = list(
+            User.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values("pk", "tin", "balance", "is_hot_account")[:BATCH_SIZE]
+        )
+        if not users:
+            break
+
+        _copy_users(apps, users)
+        last_pk = users[-1]["pk"]
+
+
+def copy_changed_balances(apps, schema_editor):
+    """Copies the users recorded by the trigger again, until a batch finds fewer than BATCH_SIZE.
+
+    A user changed while its batch is copied is recorded once more and copied by a later batch.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    User = apps.get_model("accounts", "User")
+    table = schema_editor.quote_name(CHANGES_TABLE)
+    while True:
+        # the recorded ids are taken and copied in one transaction, a failed batch keeps them
+        with transaction.atomic(using=schema_editor.connection.alias):
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE ctid IN "
+                    f"(SELECT ctid FROM {table} LIMIT %s) RETURNING user_id",
+                    [BATCH_SIZE],
+                )
+                user_ids = [user_id for (user_id,) in cursor.fetchall()]
+            _copy_users(
+                apps,
+                User.objects.filter(pk__in=set(user_ids)).values(
+                    "pk", "tin", "balance", "is_hot_account"
+                ),
+            )
+        # a user changed twice is recorded twice, the batch is full before duplicates are dropped
+        if len(user_ids) < BATCH_SIZE:
+            break
+
+
+def copy_balances_to_users(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    Account = apps.get_model("accounts", "Account")
+
+    last_pk = 0
+    while True:
+        accounts = list(
+            Account.objects.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE]
+        )
+        if not accounts:
+            break
+
+        User.objects.bulk_update(
+            [
+                User(
+                    pk=account.pk,
+                    balance=account.balance,
+                    is_hot_account=account.is_hot_account,
+                )
+                for account in accounts
+            ],
+            ["balance", "is_hot_account"],
+        )
+        last_pk = accounts[-1].pk
+
+
+class Migration(migrations.Migration):
+    """Copies the balances without locking the user table while the old code keeps writing them.
+
+    A trigger records the users changed since the copy started, they are copied again after
+    the full copy and once more by 0013, which drops the columns.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0011_account"),
+    ]
+
+    operations = [
+        migrations.RunPython(track_balance_changes, stop_tracking_balance_changes),
+        migrations.RunPython(copy_balances_to_accounts, copy_balances_to_users),
+        migrations.RunPython(copy_changed_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:27
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+copy_balances = import_module("accounts.migrations.0012_copy_balances_to_accounts")
+
+
+def copy_last_changed_balances(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+
+    # the changes made since 0012 are copied without a lock first; transfers still writing
+    # the user rows wait only while the last few are copied and the columns are dropped
+    copy_balances.copy_changed_balances(apps, schema_editor)
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"LOCK TABLE {schema_editor.quote_name(User._meta.db_table)} "
+            "IN SHARE ROW EXCLUSIVE MODE"
+        )
+    copy_balances.copy_changed_balances(apps, schema_editor)
+    copy_balances.stop_tracking_balance_changes(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0012_copy_balances_to_accounts"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            copy_last_changed_balances, copy_balances.copy_balances_to_users
+        ),
+        migrations.RemoveField(
+            model_name="user",
+            name="balance",
+        ),
+        migrations.RemoveField(
+            model_name="user",
+            name="is_hot_account",
+        ),
+        migrations.AlterField(
+            model_name="balanceshard",
+            name="account",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="balance_shards",
+                to="accounts.account",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ledgerentry",
+            name="account",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="ledger_entries",
+                to="accounts.account",
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:03
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0014_user_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.PositiveSmallIntegerField(unique=True)),
+                ("accounts_count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BalanceBucketChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.PositiveSmallIntegerField()),
+                ("accounts_delta", models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BalanceSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "total_balance",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=20
+                    ),
+                ),
+                ("accounts_count", models.BigIntegerField(default=0)),
+                ("top_accounts", models.JSONField(default=list)),
+                ("drift", models.BigIntegerField(default=0)),
+                ("refreshed_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "verbose_name": "balance statistics",
+                "verbose_name_plural": "balance statistics",
+            },
+        ),
+    ]
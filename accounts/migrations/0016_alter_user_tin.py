@@ -0,0 +1,26 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+import accounts.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0015_balance_stats"),
+    ]
+
+    # the baseline model already validated tins with validate_tin, no migration recorded it;
+    # validators live in the migration state only, so this changes no table
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="tin",
+            field=models.CharField(
+                max_length=12,
+                unique=True,
+                validators=[accounts.validators.validate_tin],
+            ),
+        ),
+    ]
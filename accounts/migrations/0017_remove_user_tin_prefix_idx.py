@@ -0,0 +1,20 @@
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # the user table is too big to block writes while the index is dropped
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0016_alter_user_tin"),
+    ]
+
+    # tin is unique, so Django has already created accounts_user_tin_<hash>_like with
+    # varchar_pattern_ops for its prefix searches; this index only doubled its writes
+    operations = [
+        RemoveIndexConcurrently(
+            model_name="user",
+            name="user_tin_prefix_idx",
+        ),
+    ]
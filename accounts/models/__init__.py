@@ -1 +1,7 @@
+from accounts.models.account import Account, BalanceShard  # noqa: F401
+from accounts.models.api_token import ApiToken  # noqa: F401
+from accounts.models.balance_stats import BalanceBucket, BalanceBucketChange, BalanceSummary  # noqa: F401
+from accounts.models.idempotency_key import IdempotencyKey  # noqa: F401
+from accounts.models.transfer import LedgerEntry, Transfer  # noqa: F401
+from accounts.models.transfer_job import TransferJob  # noqa: F401
 from accounts.models.user import User  # noqa: F401
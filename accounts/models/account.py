@@ -0,0 +1,72 @@
+from django.core.validators import MinValueValidator
+from django.db import models
+from django.db.models import F, Sum
+
+from accounts.constants import TIN_MAX_LENGTH, ZERO_DECIMAL
+from accounts.models.user import User
+
+
+class Account(models.Model):
+    """Money of a user, kept apart from the auth row.
+
+    Transfers lock and rewrite this narrow row only, so they neither copy password hashes
+    and names on every update nor wait for logins writing last_login.
+    The primary key is the user id.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="account"
+    )
+    # copy of the user's TIN, transfers find recipients without joining users
+    tin = models.CharField(max_length=TIN_MAX_LENGTH, unique=True)
+    balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=ZERO_DECIMAL,
+        validators=[MinValueValidator(ZERO_DECIMAL)],
+    )
+    # credits to a hot account go to its balance shards instead of the balance column,
+    # so concurrent transfers to it do not wait for each other's row lock
+    is_hot_account = models.BooleanField(default=False)
+    # incremented by every change of the balance column
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return self.tin
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        changes_balance = update_fields is None or "balance" in update_fields
+        if self._state.adding or not changes_balance:
+            return super().save(*args, **kwargs)
+
+        # optimistic transfers check the version, so a balance edited in the admin
+        # makes the ones that have read the previous balance retry
+        self.version = F("version") + 1
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "version"}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=["version"])
+
+    @property
+    def total_balance(self):
+        if not self.is_hot_account:
+            return self.balance
+
+        shards_balance = self.balance_shards.aggregate(total=Sum("balance"))["total"]
+        return self.balance + (shards_balance or ZERO_DECIMAL)
+
+
+class BalanceShard(models.Model):
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="balance_shards"
+    )
+    slot = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=ZERO_DECIMAL)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "slot"], name="unique_balance_shard_slot"
+            ),
+        ]
@@ -0,0 +1,22 @@
+import secrets
+
+from django.db import models
+
+from accounts.models.user import User
+
+
+API_TOKEN_LENGTH = 40
+
+
+def generate_api_token():
+    return secrets.token_hex(API_TOKEN_LENGTH // 2)
+
+
+class ApiToken(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="api_token"
+    )
+    key = models.CharField(
+        max_length=API_TOKEN_LENGTH, unique=True, default=generate_api_token
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,42 @@
+from django.db import models
+
+from accounts.constants import ZERO_DECIMAL
+
+
+class BalanceSummary(models.Model):
+    """Totals of all accounts as of the last refresh, a single row.
+
+    A transfer moves money between accounts, so it changes none of the totals; they drift
+    only when balances are changed outside the services or accounts are created.
+    """
+
+    total_balance = models.DecimalField(
+        max_digits=20, decimal_places=2, default=ZERO_DECIMAL
+    )
+    accounts_count = models.BigIntegerField(default=0)
+    # [{"tin": ..., "balance": ...}] of the richest accounts, balances as strings
+    top_accounts = models.JSONField(default=list)
+    # by how much the incremental bucket counts were off when last refreshed
+    drift = models.BigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        verbose_name = verbose_name_plural = "balance statistics"
+
+
+class BalanceBucket(models.Model):
+    """Number of accounts whose balance falls into a bucket, as of the last refresh."""
+
+    bucket = models.PositiveSmallIntegerField(unique=True)
+    accounts_count = models.BigIntegerField(default=0)
+
+
+class BalanceBucketChange(models.Model):
+    """Accounts a transfer has moved into (positive delta) or out of a bucket.
+
+    Transfers only append these rows, so they never wait for each other to update a counter;
+    the refresh folds them into BalanceBucket.
+    """
+
+    bucket = models.PositiveSmallIntegerField()
+    accounts_delta = models.IntegerField()
@@ -0,0 +1,20 @@
+from django.db import models
+
+from accounts.constants import IDEMPOTENCY_KEY_MAX_LENGTH
+from accounts.models.transfer import Transfer
+from accounts.models.user import User
+
+
+class IdempotencyKey(models.Model):
+    sender = models.ForeignKey(User, on_delete=models.PROTECT, related_name="+")
+    key = models.CharField(max_length=IDEMPOTENCY_KEY_MAX_LENGTH)
+    transfer = models.ForeignKey(Transfer, on_delete=models.PROTECT, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # also serves the lookup of a retried transfer
+            models.UniqueConstraint(
+                fields=["sender", "key"], name="unique_sender_idempotency_key"
+            ),
+        ]
@@ -0,0 +1,32 @@
+from django.db import models
+
+from accounts.models.account import Account
+from accounts.models.user import User
+
+
+class Transfer(models.Model):
+    sender = models.ForeignKey(
+        User, on_delete=models.PROTECT, related_name="sent_transfers"
+    )
+    # total amount debited from the sender
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class LedgerEntry(models.Model):
+    transfer = models.ForeignKey(
+        Transfer, on_delete=models.PROTECT, related_name="entries"
+    )
+    account = models.ForeignKey(
+        Account, on_delete=models.PROTECT, related_name="ledger_entries"
+    )
+    # negative for the sender's debit, positive for recipients' credits
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "ledger entries"
+        indexes = [
+            # per-account history, newest first
+            models.Index(fields=["account", "-id"], name="ledger_account_history_idx"),
+        ]
@@ -0,0 +1,43 @@
+from django.db import models
+
+from accounts.constants import IDEMPOTENCY_KEY_MAX_LENGTH
+from accounts.models.transfer import Transfer
+from accounts.models.user import User
+
+
+class TransferJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    sender = models.ForeignKey(
+        User, on_delete=models.PROTECT, related_name="transfer_jobs"
+    )
+    recipients = models.JSONField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=16, choices=Status, default=Status.PENDING)
+    errors = models.JSONField(default=list, blank=True)
+    idempotency_key = models.CharField(
+        max_length=IDEMPOTENCY_KEY_MAX_LENGTH, null=True, blank=True
+    )
+    # retried jobs with the same idempotency key resolve to the same transfer
+    transfer = models.ForeignKey(
+        Transfer, on_delete=models.PROTECT, null=True, blank=True, related_name="jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # workers only ever scan the pending jobs in FIFO order
+            models.Index(
+                fields=["id"],
+                condition=models.Q(status="pending"),
+                name="transfer_job_pending_idx",
+            ),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status != self.Status.PENDING
@@ -1,8 +1,9 @@
 from django.contrib.auth.models import AbstractUser
-from django.core.validators import MinValueValidator
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
-from accounts.constants import TIN_MAX_LENGTH, ZERO_DECIMAL
+from accounts.constants import TIN_MAX_LENGTH
 from accounts.validators import validate_tin
 
 
@@ -14,11 +15,23 @@ class User(AbstractUser):
     tin = models.CharField(
         max_length=TIN_MAX_LENGTH, unique=True, validators=[validate_tin]
     )
-    balance = models.DecimalField(
-        max_digits=12,
-        decimal_places=2,
-        default=ZERO_DECIMAL,
-        validators=[MinValueValidator(ZERO_DECIMAL)],
-    )
 
     REQUIRED_FIELDS = ["first_name", "last_name", "tin"]
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # prefix (LIKE 'x%') searches of the sender lookup; the ones by tin use
+            # the varchar_pattern_ops index PostgreSQL gets for every unique CharField
+            models.Index(
+                OpClass(Upper("last_name"), name="text_pattern_ops"),
+                name="user_last_name_prefix_idx",
+            ),
+            # substring (ILIKE '%x%') searches of the admin changelist
+            *(
+                GinIndex(
+                    OpClass(Upper(field), name="gin_trgm_ops"),
+                    name=f"user_{field}_trgm_idx",
+                )
+                for field in ("username", "email", "first_name", "last_name")
+            ),
+        ]
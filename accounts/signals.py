@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.backends import forget_user
+from accounts.models import Account, User
+from core.services.balances import forget_balances
+from core.services.sender_lookup import invalidate_sender_lookup
+
+
+SENDER_LOOKUP_FIELDS = {"tin", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=User)
+def invalidate_sender_lookup_on_save(
+    sender, instance, created, update_fields, **kwargs
+):
+    # saves of other fields, e.g. last_login on every login, do not change lookup results
+    if created or update_fields is None or SENDER_LOOKUP_FIELDS & set(update_fields):
+        invalidate_sender_lookup()
+
+
+@receiver(post_save, sender=User)
+def forget_user_on_save(sender, instance, created, **kwargs):
+    # the cached user keeps the password hash and the flags checked on every request
+    if not created:
+        forget_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def save_account(sender, instance, created, update_fields, raw, **kwargs):
+    if raw:
+        return
+
+    if created:
+        Account.objects.create(user=instance, tin=instance.tin)
+    elif update_fields is None or "tin" in update_fields:
+        Account.objects.filter(pk=instance.pk).exclude(tin=instance.tin).update(
+            tin=instance.tin
+        )
+
+
+@receiver(post_save, sender=Account)
+def forget_balance_on_save(sender, instance, created, update_fields, **kwargs):
+    # e.g. a balance edited in the admin
+    if not created and (update_fields is None or "balance" in update_fields):
+        forget_balances([instance.tin])
+
+
+@receiver(post_delete, sender=User)
+def invalidate_sender_lookup_on_delete(sender, instance, **kwargs):
+    invalidate_sender_lookup()
+
+
+@receiver(post_delete, sender=User)
+def forget_user_on_delete(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=Account)
+def forget_balance_on_delete(sender, instance, **kwargs):
+    forget_balances([instance.tin])
@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+from django.urls import reverse
+
+import pytest
+
+from core.services.balance_stats import refresh_balance_stats
+
+
+@pytest.mark.django_db
+def test_balance_stats_dashboard(admin_client, make_users):
+    sender, _ = make_users(sender_balance=Decimal("1234.50"), recipients_count=1)
+    refresh_balance_stats()
+
+    response = admin_client.get(reverse("admin:accounts_balancesummary_changelist"))
+
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "1234.50" in content
+    assert sender.tin in content
+    assert "1,000 - 10,000" in content
+
+
+@pytest.mark.django_db
+def test_balance_stats_dashboard_requires_permission(client, make_users):
+    sender, _ = make_users(recipients_count=0)
+    sender.user.is_staff = True
+    sender.user.save()
+    client.force_login(sender.user)
+
+    response = client.get(reverse("admin:accounts_balancesummary_changelist"))
+
+    assert response.status_code == 403
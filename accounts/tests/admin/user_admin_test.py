@@ -0,0 +1,92 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+from model_bakery import baker
+
+from accounts.models import User
+from core.benchmarks.admin import admin_changelist
+
+
+def search(admin_client, query):
+    response = admin_client.get(reverse("admin:accounts_user_changelist"), {"q": query})
+    assert response.status_code == 200
+    return {user.tin for user in response.context["cl"].result_list}
+
+
+@pytest.mark.django_db
+def test_users_are_found_by_tin(admin_client):
+    baker.make("accounts.User", tin="5550000001")
+    baker.make("accounts.User", tin="555000000123")
+    baker.make("accounts.User", tin="5560000001")
+
+    assert search(admin_client, "5550000001") == {"5550000001"}
+    assert search(admin_client, "555000000") == {"5550000001", "555000000123"}
+    assert search(admin_client, "55500000012") == {"555000000123"}
+
+
+@pytest.mark.django_db
+def test_users_are_found_by_part_of_name_or_email(admin_client):
+    baker.make(
+        "accounts.User",
+        tin="5550000001",
+        first_name="John",
+        last_name="Smith",
+        email="john@example.com",
+    )
+    baker.make("accounts.User", tin="5550000002", first_name="Anna", last_name="Ohm")
+
+    assert search(admin_client, "mit") == {"5550000001"}
+    assert search(admin_client, "JOHN@EXAMPLE") == {"5550000001"}
+    assert search(admin_client, "anna ohm") == {"5550000002"}
+    # too short for a trigram, only a prefix of the last name matches
+    assert search(admin_client, "oh") == {"5550000002"}
+
+
+@pytest.mark.django_db
+def test_large_changelist_is_not_counted(admin_client, monkeypatch):
+    baker.make("accounts.User", _quantity=3)
+    monkeypatch.setattr("core.paginator.estimate_count", lambda queryset: 1000000)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse("admin:accounts_user_changelist"))
+
+    assert response.context["cl"].result_count == 1000000
+    assert not [query for query in queries if "COUNT(" in query["sql"].upper()]
+
+
+@pytest.mark.django_db
+def test_small_changelist_is_counted_exactly(admin_client, monkeypatch):
+    baker.make("accounts.User", _quantity=3)
+    monkeypatch.setattr("core.paginator.estimate_count", lambda queryset: 10)
+
+    response = admin_client.get(reverse("admin:accounts_user_changelist"))
+
+    assert response.context["cl"].result_count == User.objects.count()
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="trigram indexes require PostgreSQL"
+)
+def test_search_by_part_of_name_uses_trigram_index():
+    queryset = User.objects.filter(last_name__icontains="smi")
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        assert "user_last_name_trgm_idx" in queryset.explain()
+
+
+@pytest.mark.django_db
+def test_admin_changelist_benchmark_times_every_search(make_users):
+    make_users(recipients_count=2)
+
+    report = admin_changelist(operations=1)
+
+    assert report["users"] == 3
+    for name in ["all", "name", "tin"]:
+        assert set(report[name]) == {
+            "exact_count_icontains",
+            "estimated_count_indexed",
+            "changelist_page",
+        }
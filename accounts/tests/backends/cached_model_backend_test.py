@@ -0,0 +1,91 @@
+from django.urls import reverse
+
+import pytest
+
+from core.benchmarks.endpoints import session_overhead
+
+
+@pytest.mark.django_db
+def test_user_of_session_is_cached(client, make_users, django_assert_num_queries):
+    sender, _ = make_users(recipients_count=0)
+    client.force_login(sender.user)
+
+    # session and user lookups
+    with django_assert_num_queries(2):
+        client.get(reverse("transfer"))
+
+    # session lookup only
+    with django_assert_num_queries(1):
+        response = client.get(reverse("transfer"))
+
+    assert response.status_code == 200
+    assert response.context["user"] == sender.user
+
+
+@pytest.mark.django_db
+def test_changed_password_ends_session_at_once(
+    client, make_users, django_capture_on_commit_callbacks
+):
+    sender, _ = make_users(recipients_count=0)
+    client.force_login(sender.user)
+    client.get(reverse("transfer"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sender.user.set_password("new password")
+        sender.user.save()
+
+    response = client.get(reverse("transfer"))
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("login"))
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_logged_out_at_once(
+    client, make_users, django_capture_on_commit_callbacks
+):
+    sender, _ = make_users(recipients_count=0)
+    client.force_login(sender.user)
+    client.get(reverse("transfer"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sender.user.is_active = False
+        sender.user.save(update_fields=["is_active"])
+
+    response = client.get(reverse("transfer"))
+    assert response.status_code == 302
+
+
+@pytest.mark.django_db
+def test_users_are_not_cached_with_zero_timeout(
+    client, make_users, settings, django_assert_num_queries
+):
+    settings.AUTH_USER_CACHE_TIMEOUT = 0
+    sender, _ = make_users(recipients_count=0)
+    client.force_login(sender.user)
+    client.get(reverse("transfer"))
+
+    with django_assert_num_queries(2):
+        client.get(reverse("transfer"))
+
+
+@pytest.mark.django_db
+def test_cached_sessions_are_read_without_queries(
+    client, make_users, settings, django_assert_num_queries
+):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    sender, _ = make_users(recipients_count=0)
+    client.force_login(sender.user)
+    client.get(reverse("transfer"))
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse("transfer"))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_session_overhead_benchmark_compares_queries_per_request():
+    report = session_overhead(operations=2)
+
+    assert report["db_sessions"]["page"]["queries_per_request"] == 2
+    assert report["cached_sessions_and_users"]["page"]["queries_per_request"] == 0
@@ -0,0 +1,61 @@
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+
+import pytest
+
+from accounts.management.commands.create_fake_users import (
+    DEFAULT_SUPERUSER_TIN,
+    DEFAULT_USERS_PASSWORD,
+    fake_tin,
+    fake_tin_number,
+)
+from accounts.models import User
+from accounts.validators import validate_tin
+from core.db import max_bulk_batch_size
+
+
+def test_fake_tin_number_reverses_fake_tin():
+    for number in [0, 1, 12345, 7999999999]:
+        assert fake_tin_number(fake_tin(number)) == number
+
+    assert fake_tin_number("9000000000") is None
+
+
+@pytest.mark.django_db
+def test_fake_users_are_created_in_batches():
+    call_command("create_fake_users", users_count=50, batch_size=7)
+
+    users = list(User.objects.all())
+    tins = {user.tin for user in users}
+    assert len(users) == 50
+    assert len(tins) == 50
+    for tin in tins:
+        validate_tin(tin)
+
+    superuser = User.objects.get(is_superuser=True)
+    assert superuser.tin == DEFAULT_SUPERUSER_TIN
+
+    fake_users = User.objects.filter(is_superuser=False)
+    assert len({user.password for user in fake_users}) == 1
+    assert check_password(DEFAULT_USERS_PASSWORD, fake_users[0].password)
+
+
+@pytest.mark.django_db
+def test_fake_users_skip_superuser_tin(monkeypatch):
+    reserved_tin = fake_tin(3)
+    monkeypatch.setenv("SUPERUSER_TIN", reserved_tin)
+
+    call_command("create_fake_users", users_count=10, batch_size=4)
+
+    assert User.objects.count() == 10
+    assert User.objects.get(tin=reserved_tin).is_superuser
+    assert User.objects.filter(tin=fake_tin(9)).exists()
+
+
+@pytest.mark.django_db
+def test_batch_bigger_than_one_query_can_take_is_split():
+    batch_size = max_bulk_batch_size(User) + 1
+
+    call_command("create_fake_users", users_count=batch_size + 1, batch_size=batch_size)
+
+    assert User.objects.count() == batch_size + 1
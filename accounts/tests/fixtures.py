@@ -2,18 +2,32 @@ import random
 from decimal import Decimal
 
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client
 
 import pytest
 from model_bakery import baker
 
 from accounts.constants import TIN_MAX_LENGTH, TIN_MIN_LENGTH
+from core import metrics
+
+
+# transfers set their lock and statement timeouts with one more query on PostgreSQL
+TIMEOUTS_QUERIES_COUNT = 1 if connection.vendor == "postgresql" else 0
 
 
 def client():
     return Client()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached users and balances are kept apart from the rolled back rows of a test,
+    whose ids the next test may reuse."""
+    cache.clear()
+
+
 def generate_tin(number_of_digits=10):
     if number_of_digits not in [TIN_MIN_LENGTH, TIN_MAX_LENGTH]:
         raise ValueError("TIN must be either 10 or 12 digits long")
@@ -23,25 +37,36 @@ def generate_tin(number_of_digits=10):
 
 @pytest.fixture
 def make_users():
-    def inner(sender_balance=Decimal("100"), recipients_count=1):
+    """Creates a sender and recipients and returns their accounts, users are account.user."""
+
+    def make_account(balance):
         tin = generate_tin()
-        sender = baker.make(
-            "accounts.User",
-            balance=sender_balance,
-            tin=tin,
-            password=make_password(tin),
-        )
-
-        recipients = []
-        for i in range(recipients_count):
-            tin = generate_tin()
-            recipient = baker.make(
-                "accounts.User",
-                balance=Decimal(str(i * 10)),
-                tin=tin,
-                password=make_password(tin),
-            )
-            recipients.append(recipient)
+        user = baker.make("accounts.User", tin=tin, password=make_password(tin))
+        account = user.account
+        account.balance = balance
+        account.save(update_fields=["balance"])
+        return account
+
+    def inner(sender_balance=Decimal("100"), recipients_count=1):
+        sender = make_account(sender_balance)
+        recipients = [
+            make_account(Decimal(str(i * 10))) for i in range(recipients_count)
+        ]
         return sender, recipients
 
     return inner
+
+
+@pytest.fixture
+def close_pool_connections(monkeypatch):
+    """Makes the transfer thread pool close its connections after every call,
+    a connection left open would keep the test database from being dropped."""
+    monkeypatch.setitem(connection.settings_dict, "CONN_MAX_AGE", 0)
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.TRANSFER_METRICS = True
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
@@ -12,7 +12,7 @@ def test_form_is_valid(make_users):
     sender, recipients = make_users(recipients_count=1)
 
     form_data = {
-        "sender": 1,
+        "sender": sender.pk,
         "recipients": f"{recipients[0].tin}",
         "amount": Decimal("10"),
     }
@@ -26,7 +26,7 @@ def test_form_is_invalid_when_user_tin_passed_in_recipients(make_users):
     sender, _ = make_users(recipients_count=0)
 
     form_data = {
-        "sender": sender.id,
+        "sender": sender.pk,
         "recipients": f"{sender.tin}",
         "amount": Decimal("10"),
     }
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from model_bakery import baker
+
+from accounts.models import Account
+
+
+@pytest.mark.django_db
+def test_account_is_created_with_user():
+    user = baker.make("accounts.User", tin="1111111111")
+
+    account = Account.objects.get(user=user)
+    assert account.pk == user.pk
+    assert account.tin == "1111111111"
+    assert account.balance == Decimal("0")
+
+
+@pytest.mark.django_db
+def test_account_tin_follows_user_tin():
+    user = baker.make("accounts.User", tin="1111111111")
+
+    user.tin = "2222222222"
+    user.save()
+
+    assert Account.objects.get(user=user).tin == "2222222222"
+
+
+@pytest.mark.django_db
+def test_login_does_not_touch_account(make_users):
+    sender, _ = make_users(recipients_count=0)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert Client().login(username=sender.user.username, password=sender.tin)
+
+    # last_login is written to the user row only
+    assert queries.captured_queries
+    assert not any("accounts_account" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_saving_balance_increments_version(make_users):
+    sender, _ = make_users(recipients_count=0)
+    version = sender.version
+
+    sender.balance += Decimal("1")
+    sender.save()
+    sender.save(update_fields=["balance"])
+    sender.save(update_fields=["is_hot_account"])
+
+    assert sender.version == version + 2
+    assert Account.objects.get(pk=sender.pk).version == version + 2
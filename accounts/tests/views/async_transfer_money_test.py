@@ -0,0 +1,99 @@
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db.backends.utils import CursorWrapper
+from django.urls import reverse
+
+import pytest
+
+from accounts.models import Transfer
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_async_view_transfers_money(client, make_users):
+    sender, recipients = make_users(recipients_count=2)
+    sender_balance = sender.balance
+
+    client.login(username=sender.user.username, password=sender.tin)
+    form_data = {
+        "sender": sender.pk,
+        "recipients": ", ".join(recipient.tin for recipient in recipients),
+        "amount": Decimal("10"),
+    }
+    response = client.post(reverse("transfer-async"), form_data)
+
+    assert response.status_code == 302
+    assert response.url == reverse("transfer-success")
+    sender.refresh_from_db()
+    assert sender.balance == sender_balance - Decimal("10")
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_async_view_queries_only_in_thread_pool(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+    client.login(username=sender.user.username, password=sender.tin)
+    form_data = {
+        "sender": sender.pk,
+        "recipients": recipients[0].tin,
+        "amount": Decimal("10"),
+    }
+
+    threads = set()
+    execute = CursorWrapper._execute
+
+    def record_thread(self, *args):
+        threads.add(threading.current_thread().name)
+        return execute(self, *args)
+
+    with patch.object(CursorWrapper, "_execute", record_thread):
+        response = client.post(reverse("transfer-async"), form_data)
+
+    assert response.status_code == 302
+    assert threads
+    assert all(thread.startswith("transfer") for thread in threads)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+@patch("core.services.transfer_money.Service.transfer")
+def test_async_view_rejects_transfer_before_locking(mock_transfer, client, make_users):
+    sender, recipients = make_users(sender_balance=Decimal("5"), recipients_count=1)
+
+    client.login(username=sender.user.username, password=sender.tin)
+    form_data = {
+        "sender": sender.pk,
+        "recipients": recipients[0].tin,
+        "amount": Decimal("10"),
+    }
+    response = client.post(reverse("transfer-async"), form_data)
+
+    assert response.status_code == 200
+    assert response.context["form"].non_field_errors() == [
+        "User doesn't have enough money"
+    ]
+    mock_transfer.assert_not_called()
+    assert not Transfer.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_async_view_renders_form(client, make_users):
+    sender, _ = make_users(recipients_count=0)
+
+    client.login(username=sender.user.username, password=sender.tin)
+    response = client.get(reverse("transfer-async"))
+
+    assert response.status_code == 200
+    assert response.context["form"].initial["sender"] == sender.pk
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_async_view_redirects_to_login_page_if_user_is_not_authenticated(client):
+    response = client.get(reverse("transfer-async"))
+
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("login"))
@@ -0,0 +1,132 @@
+import json
+from decimal import Decimal
+
+from django.urls import reverse
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_batch_transfer_from_json(client, make_users):
+    sender, recipients = make_users(recipients_count=2)
+    recipient1, recipient2 = recipients
+    sender_balance = sender.balance
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    payload = [
+        {
+            "sender": sender.tin,
+            "recipients": [recipient1.tin, recipient2.tin],
+            "amount": "10",
+        },
+        {"sender": sender.tin, "recipients": recipient1.tin, "amount": "0"},
+        {"sender": sender.tin, "recipients": "2222222222", "amount": "10"},
+    ]
+    response = client.post(
+        reverse("transfer-batch"), json.dumps(payload), content_type="application/json"
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"index": 0, "status": "success", "errors": {}},
+            {
+                "index": 1,
+                "status": "failed",
+                "errors": {
+                    "amount": ["Ensure this value is greater than or equal to 0.01."]
+                },
+            },
+            {
+                "index": 2,
+                "status": "failed",
+                "errors": {"__all__": ["Tin not found: 2222222222"]},
+            },
+        ]
+    }
+
+    sender.refresh_from_db()
+    assert sender.balance == sender_balance - Decimal("10")
+
+
+@pytest.mark.django_db
+def test_batch_transfer_from_csv(client, make_users):
+    sender, recipients = make_users(recipients_count=2)
+    recipient1, recipient2 = recipients
+    recipient1_balance = recipient1.balance
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    payload = f"{sender.tin},10,{recipient1.tin},{recipient2.tin}\n{sender.tin},5,{sender.tin}\n"
+    response = client.post(reverse("transfer-batch"), payload, content_type="text/csv")
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"index": 0, "status": "success", "errors": {}},
+        {
+            "index": 1,
+            "status": "failed",
+            "errors": {"__all__": ["User cannot send money to himself"]},
+        },
+    ]
+
+    recipient1.refresh_from_db()
+    assert recipient1.balance == recipient1_balance + Decimal("5")
+
+
+@pytest.mark.django_db
+def test_short_csv_row_fails_without_shifting_indexes(client, make_users):
+    sender, (recipient,) = make_users(recipients_count=1)
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    payload = f"{sender.tin},10\n\n{sender.tin},5,{recipient.tin}\n"
+    response = client.post(reverse("transfer-batch"), payload, content_type="text/csv")
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {
+            "index": 0,
+            "status": "failed",
+            "errors": {"recipients": ["This field is required."]},
+        },
+        {"index": 1, "status": "success", "errors": {}},
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "payload,error_message",
+    [
+        (
+            "{",
+            "Expecting property name enclosed in double quotes: line 1 column 2 (char 1)",
+        ),
+        ('{"sender": "1111111111"}', "JSON payload must be a list of transfers"),
+        ("[]", "Batch must contain at least one transfer"),
+    ],
+)
+def test_batch_transfer_with_invalid_payload(
+    client, make_users, payload, error_message
+):
+    sender, _ = make_users(recipients_count=0)
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    response = client.post(
+        reverse("transfer-batch"), payload, content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"errors": [error_message]}
+
+
+@pytest.mark.django_db
+def test_batch_transfer_requires_authentication(client):
+    response = client.post(
+        reverse("transfer-batch"), "[]", content_type="application/json"
+    )
+
+    assert response.status_code == 302
+    assert response.url == f"{reverse('login')}?next={reverse('transfer-batch')}"
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+import pytest
+from model_bakery import baker
+
+
+def post_payout(client, token, content, amount="30"):
+    return client.post(
+        reverse("api-payout"),
+        {"recipients": SimpleUploadedFile("recipients.csv", content), "amount": amount},
+        headers={"Authorization": f"Token {token.key}"},
+    )
+
+
+@pytest.mark.django_db
+def test_payout_from_uploaded_file(client, make_users):
+    sender, recipients = make_users(recipients_count=3)
+    recipient1, recipient2, recipient3 = recipients
+    recipient3_balance = recipient3.balance
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    content = f"{recipient1.tin}, {recipient2.tin}\n\n{recipient3.tin}\n".encode()
+    response = post_payout(client, token, content)
+
+    assert response.status_code == 201
+    assert response.json()["recipients"] == 3
+    assert response.json()["amount"] == "30.00"
+
+    sender.refresh_from_db()
+    recipient3.refresh_from_db()
+    assert sender.balance == Decimal("70")
+    assert recipient3.balance == recipient3_balance + Decimal("10")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "content,error_message",
+    [
+        (b"", "The submitted file is empty."),
+        (b"\n, \n", "TIN must be passed through a comma and contain 10 or 12 digits"),
+        (b"123", "The length of the TIN must be either 10 or 12 digits"),
+        (b"\xff\xfe", "Recipients file must be a text file"),
+    ],
+)
+def test_payout_with_invalid_file(client, make_users, content, error_message):
+    sender, _ = make_users(recipients_count=0)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    response = post_payout(client, token, content)
+
+    assert response.status_code == 400
+    assert response.json()["errors"]["recipients"] == [error_message]
+
+
+@pytest.mark.django_db
+def test_payout_to_sender_is_rejected(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    response = post_payout(client, token, f"{recipients[0].tin}\n{sender.tin}".encode())
+
+    assert response.status_code == 400
+    assert response.json()["errors"]["recipients"] == [
+        "User cannot send money to himself"
+    ]
@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+import pytest
+from model_bakery import baker
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_senders_are_found_by_tin_or_last_name_prefix(client, make_users):
+    sender, _ = make_users(recipients_count=0)
+    smith = baker.make(
+        "accounts.User", tin="5550000001", first_name="John", last_name="Smith"
+    )
+    baker.make("accounts.User", tin="5560000001", first_name="Anna", last_name="Smyth")
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    response = client.get(reverse("sender-lookup"), {"q": "555"})
+    assert response.json() == {
+        "results": [{"id": smith.pk, "text": "Smith John (5550000001)"}]
+    }
+
+    response = client.get(reverse("sender-lookup"), {"q": "smi"})
+    assert response.json() == {
+        "results": [{"id": smith.pk, "text": "Smith John (5550000001)"}]
+    }
+
+    response = client.get(reverse("sender-lookup"), {"q": "5"})
+    assert response.json() == {"results": []}
+
+
+@pytest.mark.django_db
+def test_sender_lookup_results_are_cached_until_users_change(
+    client, make_users, django_assert_num_queries
+):
+    sender, _ = make_users(recipients_count=0)
+    smith = baker.make("accounts.User", tin="5550000001", last_name="Smith")
+
+    client.force_login(sender.user)
+    client.get(reverse("sender-lookup"), {"q": "smi"})
+
+    # session lookup only, the user has been cached by the first request
+    with django_assert_num_queries(1):
+        response = client.get(reverse("sender-lookup"), {"q": "SMI"})
+    assert len(response.json()["results"]) == 1
+
+    smith.last_login = smith.date_joined
+    smith.save(update_fields=["last_login"])
+    with django_assert_num_queries(1):
+        client.get(reverse("sender-lookup"), {"q": "smi"})
+
+    smith.last_name = "Jones"
+    smith.save()
+    response = client.get(reverse("sender-lookup"), {"q": "smi"})
+    assert response.json() == {"results": []}
+
+
+@pytest.mark.django_db
+def test_transfer_page_does_not_load_all_users(
+    client, make_users, django_assert_num_queries
+):
+    sender, recipients = make_users(recipients_count=5)
+
+    client.force_login(sender.user)
+
+    # session and user lookups only
+    with django_assert_num_queries(2):
+        response = client.get(reverse("transfer"))
+
+    assert response.status_code == 200
+    for recipient in recipients:
+        assert recipient.tin not in response.content.decode()
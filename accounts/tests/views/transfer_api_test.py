@@ -0,0 +1,224 @@
+import json
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from django.urls import reverse
+
+import pytest
+from model_bakery import baker
+
+from accounts.tests.fixtures import TIMEOUTS_QUERIES_COUNT
+from core.admission import BUSY_MESSAGE
+from core.db import Busy
+from core.services.transfer_money import Service as TransferMoneyService
+
+
+def post_transfer(client, token, data, **headers):
+    return client.post(
+        reverse("api-transfer"),
+        json.dumps(data),
+        content_type="application/json",
+        headers={"Authorization": f"Token {token.key}", **headers},
+    )
+
+
+@pytest.mark.django_db
+def test_transfer_through_api(client, make_users, django_assert_num_queries):
+    sender, recipients = make_users(recipients_count=2)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    # token lookup, savepoint, transaction timeouts, locking select, balances update,
+    # balance bucket moves, transfer and ledger entries inserts, savepoint release
+    with django_assert_num_queries(8 + TIMEOUTS_QUERIES_COUNT):
+        response = post_transfer(
+            client, token, {"recipients": [r.tin for r in recipients], "amount": "20"}
+        )
+
+    assert response.status_code == 201
+    assert response.json()["amount"] == "20.00"
+    assert "sessionid" not in response.cookies
+
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("80")
+
+
+@pytest.mark.django_db
+def test_transfer_through_api_split_by_weights(client, make_users):
+    sender, recipients = make_users(recipients_count=2)
+    recipient1, recipient2 = recipients
+    recipient1_balance = recipient1.balance
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    response = post_transfer(
+        client,
+        token,
+        {
+            "recipients": [recipient1.tin, recipient2.tin],
+            "amount": "20",
+            "weights": [3, 1],
+        },
+    )
+
+    assert response.status_code == 201
+    recipient1.refresh_from_db()
+    assert recipient1.balance == recipient1_balance + Decimal("15")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "weights,error_message",
+    [
+        ([1], "Every recipient must have a weight"),
+        ([1, 0], "Weights must be a list of positive integers"),
+        ({"weight": 1}, "Weights must be a list of positive integers"),
+    ],
+)
+def test_transfer_through_api_with_invalid_weights(
+    client, make_users, weights, error_message
+):
+    sender, recipients = make_users(recipients_count=2)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    response = post_transfer(
+        client,
+        token,
+        {"recipients": [r.tin for r in recipients], "amount": "20", "weights": weights},
+    )
+
+    assert response.status_code == 400
+    errors = response.json()["errors"]
+    assert error_message in [*errors.get("weights", []), *errors.get("__all__", [])]
+
+
+@pytest.mark.django_db
+def test_transfer_through_api_is_idempotent(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    responses = [
+        post_transfer(
+            client,
+            token,
+            {"recipients": recipients[0].tin, "amount": "20"},
+            **{"Idempotency-Key": "key"},
+        )
+        for _ in range(2)
+    ]
+
+    assert responses[0].json() == responses[1].json()
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("80")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data,errors",
+    [
+        (
+            {"recipients": "1a11111111", "amount": "10"},
+            {
+                "recipients": [
+                    "TIN must be passed through a comma and contain 10 or 12 digits"
+                ]
+            },
+        ),
+        ({"recipients": "2222222222"}, {"amount": ["This field is required."]}),
+        (
+            {"recipients": "2222222222", "amount": "10"},
+            {"__all__": ["Tin not found: 2222222222"]},
+        ),
+        ([], {"__all__": ["Invalid JSON"]}),
+    ],
+)
+def test_transfer_through_api_returns_validation_errors(
+    client, make_users, data, errors
+):
+    sender, _ = make_users(recipients_count=0)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    response = post_transfer(client, token, data)
+
+    assert response.status_code == 400
+    assert response.json() == {"errors": errors}
+
+
+@pytest.mark.django_db
+def test_transfer_through_api_cannot_send_money_to_sender(client, make_users):
+    sender, _ = make_users(recipients_count=0)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    response = post_transfer(client, token, {"recipients": sender.tin, "amount": "10"})
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "errors": {"__all__": ["User cannot send money to himself"]}
+    }
+
+
+@pytest.mark.django_db
+def test_transfer_through_api_reports_unexpected_errors(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    with patch.object(
+        TransferMoneyService, "transfer", MagicMock(side_effect=Exception)
+    ):
+        response = post_transfer(
+            client, token, {"recipients": recipients[0].tin, "amount": "10"}
+        )
+
+    assert response.status_code == 500
+    assert response.json() == {
+        "errors": {"__all__": ["Unexpected error occurred. Please, try again"]}
+    }
+
+
+@pytest.mark.django_db
+def test_transfer_through_api_reports_busy(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+
+    with patch.object(
+        TransferMoneyService, "transfer", MagicMock(side_effect=Busy("timed out"))
+    ):
+        response = post_transfer(
+            client, token, {"recipients": recipients[0].tin, "amount": "10"}
+        )
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == "1"
+    assert response.json() == {"errors": {"__all__": [BUSY_MESSAGE]}}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "authorization", ["", "Token", "Token invalid", "Bearer invalid"]
+)
+def test_transfer_through_api_requires_valid_token(client, authorization):
+    response = client.post(
+        reverse("api-transfer"),
+        "{}",
+        content_type="application/json",
+        headers={"Authorization": authorization},
+    )
+
+    assert response.status_code == 401
+    assert response.json() == {"errors": {"__all__": ["Invalid token"]}}
+
+
+@pytest.mark.django_db
+def test_balance_through_api(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+    token = baker.make("accounts.ApiToken", user=sender.user)
+    headers = {"Authorization": f"Token {token.key}"}
+
+    response = client.get(reverse("api-balance", args=[sender.tin]), headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"tin": sender.tin, "balance": "100.00"}
+
+    # other users' balances are visible to staff only
+    response = client.get(
+        reverse("api-balance", args=[recipients[0].tin]), headers=headers
+    )
+    assert response.status_code == 404
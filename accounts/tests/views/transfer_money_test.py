@@ -6,6 +6,10 @@ from django.urls import reverse
 
 import pytest
 
+from accounts.models import TransferJob
+from core.admission import BUSY_MESSAGE, admit
+from core.db import Busy
+from core.services.transfer_jobs import enqueue_transfer, process_next_job
 from core.services.transfer_money import Service as TransferMoneyService
 
 
@@ -18,7 +22,7 @@ def test_redirect_to_success_page_if_form_and_transfer_was_successful(
     tins = [recipient.tin for recipient in recipients]
     amount_to_transfer = Decimal("33.32")
 
-    client.login(username=sender.username, password=sender.tin)
+    client.login(username=sender.user.username, password=sender.tin)
 
     form_data = {
         "sender": sender.pk,
@@ -36,7 +40,7 @@ def test_not_redirect_to_success_page_if_form_is_invalid(client, make_users):
     sender, _ = make_users(recipients_count=0)
     sender_balance = sender.balance
 
-    client.login(username=sender.username, password=sender.tin)
+    client.login(username=sender.user.username, password=sender.tin)
 
     form_data = {
         "sender": sender.pk,
@@ -61,7 +65,7 @@ def test_not_redirect_to_success_page_if_validation_error_occurred_while_transfe
 ):
     sender, _ = make_users(recipients_count=0)
 
-    client.login(username=sender.username, password=sender.tin)
+    client.login(username=sender.user.username, password=sender.tin)
 
     def fake_transfer():
         raise ValidationError("Tin not found: 2111111111")
@@ -89,7 +93,7 @@ def test_not_redirect_to_success_page_if_unexpected_error_occurred_while_transfe
 ):
     sender, _ = make_users(recipients_count=1)
 
-    client.login(username=sender.username, password=sender.tin)
+    client.login(username=sender.user.username, password=sender.tin)
 
     def fake_transfer():
         raise Exception("Unexpected error")
@@ -113,9 +117,144 @@ def test_not_redirect_to_success_page_if_unexpected_error_occurred_while_transfe
     ]
 
 
+@pytest.mark.django_db
+def test_busy_transfer_asks_to_retry_later(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    with patch.object(
+        TransferMoneyService, "transfer", MagicMock(side_effect=Busy("timed out"))
+    ):
+        form_data = {
+            "sender": sender.pk,
+            "recipients": recipients[0].tin,
+            "amount": Decimal("10"),
+        }
+        response = client.post(reverse("transfer"), form_data)
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == "1"
+    assert response.context["form"].errors["__all__"] == [BUSY_MESSAGE]
+
+
+@pytest.mark.django_db
+def test_transfer_is_rejected_when_process_has_no_free_slot(
+    client, make_users, settings
+):
+    settings.TRANSFER_MAX_IN_FLIGHT = 1
+    sender, recipients = make_users(recipients_count=1)
+    sender_balance = sender.balance
+
+    client.login(username=sender.user.username, password=sender.tin)
+    form_data = {
+        "sender": sender.pk,
+        "recipients": recipients[0].tin,
+        "amount": Decimal("10"),
+    }
+    # another thread of the process is running a transfer
+    with admit():
+        response = client.post(reverse("transfer"), form_data)
+
+    assert response.status_code == 503
+    sender.refresh_from_db()
+    assert sender.balance == sender_balance
+
+
 @pytest.mark.django_db
 def test_redirect_to_login_page_if_user_is_not_authenticated(client):
     response = client.get(reverse("transfer"))
 
     assert response.status_code == 302
     assert response.url == f"{reverse("login")}?next={reverse('transfer')}"
+
+
+@pytest.mark.django_db
+def test_transfer_is_enqueued_in_async_mode(client, make_users, settings):
+    settings.TRANSFER_ASYNC = True
+    sender, recipients = make_users(recipients_count=1)
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    form_data = {
+        "sender": sender.pk,
+        "recipients": recipients[0].tin,
+        "amount": Decimal("10"),
+    }
+    response = client.post(reverse("transfer"), form_data)
+
+    job = TransferJob.objects.get()
+    assert response.status_code == 302
+    assert response.url == reverse("transfer-job", kwargs={"pk": job.pk})
+    assert job.sender == sender.user
+    assert job.recipients == [recipients[0].tin]
+    assert job.amount == Decimal("10")
+
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("100")
+
+
+@pytest.mark.django_db
+def test_transfer_job_page_shows_status(client, make_users):
+    sender, _ = make_users(recipients_count=0)
+    job = enqueue_transfer(sender.user, Decimal("10"), ["2222222222"])
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    response = client.get(reverse("transfer-job", kwargs={"pk": job.pk}))
+    assert response.status_code == 200
+    assert b"Transfer is queued" in response.content
+
+    process_next_job()
+
+    response = client.get(reverse("transfer-job", kwargs={"pk": job.pk}))
+    assert response.status_code == 200
+    assert b"Tin not found: 2222222222" in response.content
+
+
+@pytest.mark.django_db
+def test_resubmitted_form_transfers_money_once(client, make_users):
+    sender, recipients = make_users(recipients_count=1)
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    response = client.get(reverse("transfer"))
+    idempotency_key = response.context["form"].initial["idempotency_key"]
+    assert idempotency_key
+
+    form_data = {
+        "sender": sender.pk,
+        "recipients": recipients[0].tin,
+        "amount": Decimal("10"),
+        "idempotency_key": idempotency_key,
+    }
+    for _ in range(2):
+        response = client.post(reverse("transfer"), form_data)
+        assert response.status_code == 302
+        assert response.url == reverse("transfer-success")
+
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("90")
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_transfer_is_committed_in_group_in_group_commit_mode(
+    client, make_users, settings
+):
+    settings.TRANSFER_GROUP_COMMIT = True
+    sender, recipients = make_users(recipients_count=1)
+
+    client.login(username=sender.user.username, password=sender.tin)
+
+    form_data = {
+        "sender": sender.pk,
+        "recipients": recipients[0].tin,
+        "amount": Decimal("10"),
+    }
+    response = client.post(reverse("transfer"), form_data)
+
+    assert response.status_code == 302
+    assert response.url == reverse("transfer-success")
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("90")
@@ -1,9 +1,20 @@
 from django.urls import path
 
-from accounts.views.transfer_money import TransferMoneySuccessView, TransferMoneyView
+from accounts.views.batch_transfer import BatchTransferView
+from accounts.views.sender_lookup import SenderLookupView
+from accounts.views.transfer_money import (
+    AsyncTransferMoneyView,
+    TransferJobView,
+    TransferMoneySuccessView,
+    TransferMoneyView,
+)
 
 
 urlpatterns = [
     path("", TransferMoneyView.as_view(), name="transfer"),
+    path("async/", AsyncTransferMoneyView.as_view(), name="transfer-async"),
+    path("batch/", BatchTransferView.as_view(), name="transfer-batch"),
+    path("jobs/<int:pk>/", TransferJobView.as_view(), name="transfer-job"),
+    path("senders/", SenderLookupView.as_view(), name="sender-lookup"),
     path("success/", TransferMoneySuccessView.as_view(), name="transfer-success"),
 ]
@@ -0,0 +1,19 @@
+from django.http import JsonResponse
+from django.views import View
+
+from accounts.views.mixins import TokenAuthenticationMixin
+from core.services.balances import get_balance
+
+
+class BalanceApiView(TokenAuthenticationMixin, View):
+    def get(self, request, tin, *args, **kwargs):
+        # users read their own balance, staff can read any
+        balance = (
+            get_balance(tin)
+            if tin == self.api_user.tin or self.api_user.is_staff
+            else None
+        )
+        if balance is None:
+            return JsonResponse({"errors": {"__all__": ["Not found"]}}, status=404)
+
+        return JsonResponse({"tin": tin, "balance": str(balance)})
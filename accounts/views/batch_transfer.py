@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from typing import Dict, List
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.urls import reverse_lazy
+from django.views import View
+
+from accounts.constants import MAX_BATCH_TRANSFERS_COUNT
+from accounts.forms import BatchTransferItemForm
+from core.services.batch_transfer import Service as BatchTransferService
+from core.services.batch_transfer import TransferInstruction
+
+
+def parse_json(body: bytes) -> List[Dict]:
+    items = json.loads(body)
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ValueError("JSON payload must be a list of transfers")
+
+    return items
+
+
+def parse_csv(body: bytes) -> List[Dict]:
+    # every row is "sender,amount,recipient[,recipient...]"; a short row is kept with
+    # its missing fields, so it fails alone and the indexes of the next rows stay the same
+    rows = csv.reader(io.StringIO(body.decode()))
+    items = []
+    for row in rows:
+        if not row:
+            continue
+        item = dict(zip(("sender", "amount"), row))
+        if len(row) > 2:
+            item["recipients"] = ", ".join(row[2:])
+        items.append(item)
+    return items
+
+
+class BatchTransferView(LoginRequiredMixin, View):
+    login_url = reverse_lazy("login")
+
+    def parse_payload(self) -> List[Dict]:
+        if self.request.content_type == "text/csv":
+            return parse_csv(self.request.body)
+        return parse_json(self.request.body)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items = self.parse_payload()
+        except ValueError as e:
+            return JsonResponse({"errors": [str(e)]}, status=400)
+
+        if not items:
+            return JsonResponse(
+                {"errors": ["Batch must contain at least one transfer"]}, status=400
+            )
+
+        if len(items) > MAX_BATCH_TRANSFERS_COUNT:
+            return JsonResponse(
+                {
+                    "errors": [
+                        f"Batch cannot contain more than {MAX_BATCH_TRANSFERS_COUNT} transfers"
+                    ]
+                },
+                status=400,
+            )
+
+        results = {}
+        instructions = []
+        for index, item in enumerate(items):
+            form = BatchTransferItemForm(data=item)
+            if form.is_valid():
+                instructions.append(TransferInstruction(index, **form.cleaned_data))
+            else:
+                results[index] = {
+                    "index": index,
+                    "status": "failed",
+                    "errors": {
+                        field: list(errors) for field, errors in form.errors.items()
+                    },
+                }
+
+        for result in BatchTransferService(instructions).transfer():
+            results[result.index] = {
+                "index": result.index,
+                "status": "success" if result.succeeded else "failed",
+                "errors": {"__all__": result.errors} if result.errors else {},
+            }
+
+        return JsonResponse(
+            {"results": [results[index] for index in range(len(items))]}
+        )
@@ -0,0 +1,14 @@
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from core import metrics
+
+
+class MetricsView(View):
+    def get(self, request, *args, **kwargs):
+        if not metrics.is_enabled():
+            raise Http404
+
+        return HttpResponse(
+            metrics.registry.render(), content_type="text/plain; version=0.0.4"
+        )
@@ -0,0 +1,30 @@
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+
+from accounts.models import ApiToken
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class TokenAuthenticationMixin:
+    """Authenticates API clients by the "Authorization: Token <key>" header.
+
+    Sessions are never touched, so API requests neither read nor write them.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+        token = (
+            ApiToken.objects.select_related("user").filter(key=key).first()
+            if keyword == "Token" and key
+            else None
+        )
+        if token is None or not token.user.is_active:
+            return JsonResponse(
+                {"errors": {"__all__": ["Invalid token"]}},
+                status=401,
+                headers={"WWW-Authenticate": "Token"},
+            )
+
+        self.api_user = token.user
+        return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,45 @@
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views import View
+
+from accounts.forms import PayoutForm
+from accounts.views.mixins import TokenAuthenticationMixin
+from core.services.payout import Service as PayoutService
+
+
+class PayoutApiView(TokenAuthenticationMixin, View):
+    def post(self, request, *args, **kwargs):
+        form = PayoutForm(self.api_user, data=request.POST, files=request.FILES)
+        if not form.is_valid():
+            errors = {field: list(errors) for field, errors in form.errors.items()}
+            return JsonResponse({"errors": errors}, status=400)
+
+        recipients = form.cleaned_data["recipients"]
+        try:
+            transfer = PayoutService(
+                self.api_user,
+                form.cleaned_data["amount"],
+                recipients,
+                recipients.count,
+            ).transfer()
+        except ValidationError as e:
+            return JsonResponse({"errors": {"__all__": e.messages}}, status=400)
+        except Exception:
+            return JsonResponse(
+                {
+                    "errors": {
+                        "__all__": ["Unexpected error occurred. Please, try again"]
+                    }
+                },
+                status=500,
+            )
+
+        return JsonResponse(
+            {
+                "id": transfer.pk,
+                "amount": str(transfer.amount),
+                "recipients": recipients.count,
+                "created_at": transfer.created_at,
+            },
+            status=201,
+        )
@@ -0,0 +1,13 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.urls import reverse_lazy
+from django.views import View
+
+from core.services.sender_lookup import find_senders
+
+
+class SenderLookupView(LoginRequiredMixin, View):
+    login_url = reverse_lazy("login")
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"results": find_senders(request.GET.get("q", ""))})
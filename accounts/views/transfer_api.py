@@ -0,0 +1,68 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views import View
+
+from accounts.forms import TransferApiForm
+from accounts.views.mixins import TokenAuthenticationMixin
+from core.admission import BUSY_MESSAGE, RETRY_AFTER_SECONDS, admit
+from core.db import Busy
+from core.services.group_commit import Service as GroupCommitService
+from core.services.transfer_money import Service as TransferService
+
+
+class TransferApiView(TokenAuthenticationMixin, View):
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({"errors": {"__all__": ["Invalid JSON"]}}, status=400)
+
+        data.setdefault("idempotency_key", request.headers.get("Idempotency-Key"))
+        form = TransferApiForm(self.api_user, data=data)
+        if not form.is_valid():
+            errors = {field: list(errors) for field, errors in form.errors.items()}
+            return JsonResponse({"errors": errors}, status=400)
+
+        service_class = (
+            GroupCommitService if settings.TRANSFER_GROUP_COMMIT else TransferService
+        )
+        try:
+            with admit():
+                transfer = service_class(
+                    self.api_user,
+                    form.cleaned_data["amount"],
+                    form.cleaned_data["recipients"],
+                    form.cleaned_data["idempotency_key"] or None,
+                    form.cleaned_data["weights"],
+                ).transfer()
+        except Busy:
+            return JsonResponse(
+                {"errors": {"__all__": [BUSY_MESSAGE]}},
+                status=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        except ValidationError as e:
+            return JsonResponse({"errors": {"__all__": e.messages}}, status=400)
+        except Exception:
+            return JsonResponse(
+                {
+                    "errors": {
+                        "__all__": ["Unexpected error occurred. Please, try again"]
+                    }
+                },
+                status=500,
+            )
+
+        return JsonResponse(
+            {
+                "id": transfer.pk,
+                "amount": str(transfer.amount),
+                "created_at": transfer.created_at,
+            },
+            status=201,
+        )
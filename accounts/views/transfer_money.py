@@ -1,24 +1,62 @@
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import ValidationError
+from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
-from django.views.generic import FormView, TemplateView
+from django.views import View
+from django.views.generic import DetailView, FormView, TemplateView
 
 from accounts.forms import TransferMoneyForm
+from accounts.models import TransferJob
+from core.admission import BUSY_MESSAGE, RETRY_AFTER_SECONDS, admit
+from core.db import Busy
+from core.services.async_transfer import Service as AsyncTransferService
+from core.services.async_transfer import run_in_pool
+from core.services.group_commit import Service as GroupCommitService
+from core.services.transfer_jobs import enqueue_transfer
 from core.services.transfer_money import Service as TransferService
 
 
+def busy(response):
+    response.status_code = 503
+    response["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
 class TransferMoneyView(LoginRequiredMixin, FormView):
     template_name = "transfer_money.html"
     form_class = TransferMoneyForm
     success_url = reverse_lazy("transfer-success")
     login_url = reverse_lazy("login")
 
+    def get_initial(self):
+        return {
+            **super().get_initial(),
+            "sender": self.request.user.pk,
+            "idempotency_key": uuid.uuid4().hex,
+        }
+
     def form_valid(self, form):
         sender = form.cleaned_data["sender"]
         recipients = form.cleaned_data["recipients"]
         amount = form.cleaned_data["amount"]
+        idempotency_key = form.cleaned_data["idempotency_key"] or None
+        if settings.TRANSFER_ASYNC:
+            job = enqueue_transfer(sender, amount, recipients, idempotency_key)
+            return redirect("transfer-job", pk=job.pk)
+
+        service_class = (
+            GroupCommitService if settings.TRANSFER_GROUP_COMMIT else TransferService
+        )
         try:
-            TransferService(sender, amount, recipients).transfer()
+            with admit():
+                service_class(sender, amount, recipients, idempotency_key).transfer()
+        except Busy:
+            form.add_error(None, BUSY_MESSAGE)
+            return busy(self.form_invalid(form))
         except ValidationError as e:
             form.add_error(None, e)
             return self.form_invalid(form)
@@ -28,5 +66,75 @@ class TransferMoneyView(LoginRequiredMixin, FormView):
         return super().form_valid(form)
 
 
+class AsyncTransferMoneyView(View):
+    """TransferMoneyView for ASGI servers.
+
+    A request waiting for the database does not hold a worker: the user, the form, the
+    transfer and the rendering are run in the bounded pool of core.services.async_transfer.
+    """
+
+    template_name = "transfer_money.html"
+    success_url = reverse_lazy("transfer-success")
+    login_url = reverse_lazy("login")
+
+    async def get(self, request, *args, **kwargs):
+        if not await run_in_pool(self.is_authenticated):
+            return redirect_to_login(request.get_full_path(), self.login_url)
+
+        form = TransferMoneyForm(
+            initial={"sender": request.user.pk, "idempotency_key": uuid.uuid4().hex}
+        )
+        return await self.render(form)
+
+    async def post(self, request, *args, **kwargs):
+        if not await run_in_pool(self.is_authenticated):
+            return redirect_to_login(request.get_full_path(), self.login_url)
+
+        form = TransferMoneyForm(data=request.POST)
+        if not await run_in_pool(form.is_valid):
+            return await self.render(form)
+
+        sender = form.cleaned_data["sender"]
+        recipients = form.cleaned_data["recipients"]
+        amount = form.cleaned_data["amount"]
+        idempotency_key = form.cleaned_data["idempotency_key"] or None
+        if settings.TRANSFER_ASYNC:
+            job = await run_in_pool(
+                enqueue_transfer, sender, amount, recipients, idempotency_key
+            )
+            return redirect("transfer-job", pk=job.pk)
+
+        try:
+            await AsyncTransferService(
+                sender, amount, recipients, idempotency_key
+            ).transfer()
+        except Busy:
+            form.add_error(None, BUSY_MESSAGE)
+            return busy(await self.render(form))
+        except ValidationError as e:
+            form.add_error(None, e)
+            return await self.render(form)
+        except Exception:
+            form.add_error(None, "Unexpected error occurred. Please, try again")
+            return await self.render(form)
+        return redirect(self.success_url)
+
+    def is_authenticated(self) -> bool:
+        # loads the session and the user once, the context processors reuse them
+        return self.request.user.is_authenticated
+
+    async def render(self, form):
+        return await run_in_pool(
+            render, self.request, self.template_name, {"form": form}
+        )
+
+
 class TransferMoneySuccessView(TemplateView):
     template_name = "transfer_money_success.html"
+
+
+class TransferJobView(LoginRequiredMixin, DetailView):
+    template_name = "transfer_job.html"
+    model = TransferJob
+    context_object_name = "job"
+    login_url = reverse_lazy("login")
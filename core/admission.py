@@ -0,0 +1,40 @@
+"""Admission control of transfers.
+
+A transfer waiting for a locked row holds its worker thread. Every process lets at most
+settings.TRANSFER_MAX_IN_FLIGHT transfers in at once and turns the others away at once,
+so the remaining threads keep serving logins, the admin and the other pages.
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.conf import settings
+
+from core import metrics
+from core.db import Busy
+
+
+BUSY_MESSAGE = "Too many transfers are in progress. Please, try again in a few seconds"
+# seconds a client is asked to wait before retrying
+RETRY_AFTER_SECONDS = 1
+
+
+@functools.cache
+def get_slots(limit: int) -> threading.BoundedSemaphore:
+    return threading.BoundedSemaphore(limit)
+
+
+@contextmanager
+def admit() -> Iterator[None]:
+    """Runs the block if a transfer slot of the process is free, raises Busy otherwise."""
+    slots = get_slots(settings.TRANSFER_MAX_IN_FLIGHT)
+    if not slots.acquire(blocking=False):
+        metrics.increment("transfer_shed_total", reason="in_flight_limit")
+        raise Busy("Too many transfers in flight")
+
+    try:
+        yield
+    finally:
+        slots.release()
@@ -0,0 +1,32 @@
+from core.benchmarks.admin import admin_changelist
+from core.benchmarks.balances import balance_reads
+from core.benchmarks.endpoints import api_latency, connection_reuse, request_capacity, session_overhead, transfer_storm
+from core.benchmarks.transfers import (
+    batch_transfers,
+    concurrency_modes,
+    crossing_transfers,
+    group_commit,
+    hot_account,
+    ledger_overhead,
+    payout_fanout,
+    statement_latency,
+)
+
+
+SCENARIOS = {
+    "admin_changelist": admin_changelist,
+    "api_latency": api_latency,
+    "balance_reads": balance_reads,
+    "batch_transfers": batch_transfers,
+    "concurrency_modes": concurrency_modes,
+    "connection_reuse": connection_reuse,
+    "crossing_transfers": crossing_transfers,
+    "group_commit": group_commit,
+    "hot_account": hot_account,
+    "ledger_overhead": ledger_overhead,
+    "payout_fanout": payout_fanout,
+    "request_capacity": request_capacity,
+    "session_overhead": session_overhead,
+    "statement_latency": statement_latency,
+    "transfer_storm": transfer_storm,
+}
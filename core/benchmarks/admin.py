@@ -0,0 +1,86 @@
+import random
+import time
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max, Q, QuerySet
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import User
+from core.benchmarks.endpoints import measure_requests
+from core.benchmarks.runner import percentile
+from core.benchmarks.seed import benchmark_users
+from core.paginator import EstimatedCountPaginator
+
+
+# the fields the changelist searched with icontains before the trigram indexes
+UNINDEXED_SEARCH_FIELDS = ("username", "email", "first_name", "last_name", "tin")
+PER_PAGE = 100
+
+
+def measure(run: Callable[[], None], operations: int) -> Dict:
+    latencies = []
+    for _ in range(operations):
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return {
+        "mean_ms": round(sum(latencies) / operations, 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+    }
+
+
+def unindexed_search(term: str) -> QuerySet:
+    condition = Q()
+    for field in UNINDEXED_SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__icontains": term})
+    return User.objects.filter(condition)
+
+
+def first_page(paginator_class, queryset: QuerySet) -> Callable[[], None]:
+    def run() -> None:
+        page = paginator_class(queryset.order_by("-id"), PER_PAGE).page(1)
+        list(page.object_list)
+
+    return run
+
+
+def admin_changelist(operations: int = 10, **options) -> Dict:
+    """Times the first page of the user changelist on the users already in the database:
+    counted exactly and searched with icontains against the estimated count and the indexed search.
+
+    Seed the users first, e.g. manage.py create_fake_users --users_count 1000000.
+    """
+    user_admin = admin.site._registry[User]
+    max_pk = User.objects.aggregate(max_pk=Max("pk"))["max_pk"] or 0
+    sample = User.objects.filter(pk__gte=random.randint(1, max_pk)).order_by("pk")
+    sample = sample.first() or User.objects.first()
+    terms = {"all": "", "name": sample.last_name[1:5], "tin": sample.tin}
+
+    report = {"users": User.objects.count(), "terms": terms}
+    for name, term in terms.items():
+        before = unindexed_search(term) if term else User.objects.all()
+        after, _ = user_admin.get_search_results(None, User.objects.all(), term)
+        report[name] = {
+            "exact_count_icontains": measure(first_page(Paginator, before), operations),
+            "estimated_count_indexed": measure(
+                first_page(EstimatedCountPaginator, after), operations
+            ),
+        }
+
+    client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    with benchmark_users(1) as (staff,):
+        User.objects.filter(pk=staff.pk).update(is_staff=True, is_superuser=True)
+        client.force_login(staff)
+        url = reverse("admin:accounts_user_changelist")
+        for name, term in terms.items():
+            report[name]["changelist_page"] = measure_requests(
+                lambda: client.get(url, {"q": term}).status_code, operations
+            )
+
+    return report
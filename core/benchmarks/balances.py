@@ -0,0 +1,45 @@
+import random
+from typing import Dict
+
+from accounts.models import Account, User
+from core.benchmarks.runner import run_in_threads
+from core.benchmarks.seed import benchmark_users
+from core.services.balances import get_balance
+
+
+def balance_reads(
+    threads: int = 8, operations: int = 100, users: int = 10, **options
+) -> Dict:
+    """Reads random balances from full user and account rows, from the balance column and from a warm cache."""
+    with benchmark_users(users) as accounts:
+        tins = [account.tin for account in accounts]
+
+        def read_user(thread_number: int, i: int) -> None:
+            User.objects.select_related("account").get(
+                tin=random.choice(tins)
+            ).account.balance
+
+        def read_column(thread_number: int, i: int) -> None:
+            Account.objects.filter(tin=random.choice(tins)).values_list(
+                "balance", flat=True
+            ).first()
+
+        def read_cache(thread_number: int, i: int) -> None:
+            get_balance(random.choice(tins))
+
+        for tin in tins:
+            get_balance(tin)
+
+        report = {
+            name: run_in_threads(operation, threads, operations).as_dict()
+            for name, operation in [
+                ("full_row", read_user),
+                ("balance_column", read_column),
+                ("cache", read_cache),
+            ]
+        }
+
+    cached = report["cache"]["operations_per_second"]
+    full_row = report["full_row"]["operations_per_second"]
+    report["speedup"] = round(cached / full_row, 1)
+    return report
@@ -0,0 +1,351 @@
+import asyncio
+import io
+import json
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from asgiref.sync import async_to_sync
+
+from accounts.models import Account, ApiToken
+from core.benchmarks.runner import percentile, run_in_threads
+from core.benchmarks.seed import benchmark_users
+
+
+def measure_requests(send: Callable[[], int], operations: int) -> Dict:
+    latencies = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(operations):
+            started = time.perf_counter()
+            status_code = send()
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status_code >= 400:
+                raise RuntimeError(f"Request failed with status {status_code}")
+
+    latencies.sort()
+    return {
+        "mean_ms": round(sum(latencies) / operations, 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_request": round(len(queries) / operations, 1),
+    }
+
+
+def api_latency(operations: int = 100, **options) -> Dict:
+    """Compares the per-request cost of the HTML form view and the JSON API for the same transfer."""
+    client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    with benchmark_users(2) as (sender, recipient):
+        client.force_login(sender)
+        token = ApiToken.objects.create(user=sender)
+
+        def post_form() -> int:
+            data = {"sender": sender.pk, "recipients": recipient.tin, "amount": "0.01"}
+            return client.post(reverse("transfer"), data).status_code
+
+        def post_api() -> int:
+            return client.post(
+                reverse("api-transfer"),
+                json.dumps({"recipients": [recipient.tin], "amount": "0.01"}),
+                content_type="application/json",
+                headers={"Authorization": f"Token {token.key}"},
+            ).status_code
+
+        report = {
+            "form_view": measure_requests(post_form, operations),
+            "json_api": measure_requests(post_api, operations),
+        }
+
+    report["mean_ms_saved"] = round(
+        report["form_view"]["mean_ms"] - report["json_api"]["mean_ms"], 3
+    )
+    return report
+
+
+SESSION_MODES = {
+    "db_sessions": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "AUTHENTICATION_BACKENDS": ["django.contrib.auth.backends.ModelBackend"],
+    },
+    "cached_sessions_and_users": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+        "AUTHENTICATION_BACKENDS": ["accounts.backends.CachedModelBackend"],
+    },
+}
+
+
+def session_overhead(operations: int = 100, **options) -> Dict:
+    """Times the transfer page and form with sessions and users read from the database
+    for every request and with both of them cached.
+    """
+    report = {}
+    with benchmark_users(2) as (sender, recipient):
+        for mode, mode_settings in SESSION_MODES.items():
+            # the session middleware imports its engine when the client first runs it
+            with override_settings(**mode_settings):
+                client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+                client.force_login(sender)
+
+                def get_page() -> int:
+                    return client.get(reverse("transfer")).status_code
+
+                def post_form() -> int:
+                    data = {
+                        "sender": sender.pk,
+                        "recipients": recipient.tin,
+                        "amount": "0.01",
+                    }
+                    return client.post(reverse("transfer"), data).status_code
+
+                # the first request caches the session and the user
+                get_page()
+                report[mode] = {
+                    "page": measure_requests(get_page, operations),
+                    "transfer": measure_requests(post_form, operations),
+                }
+
+    before, after = report["db_sessions"], report["cached_sessions_and_users"]
+    report["page_mean_ms_saved"] = round(
+        before["page"]["mean_ms"] - after["page"]["mean_ms"], 3
+    )
+    return report
+
+
+def connection_reuse(operations: int = 100, **options) -> Dict:
+    """Times the same API read with a database connection opened for every request and
+    with a persistent one (or with the configured pool), the difference is the setup cost.
+    """
+    settings_dict = connection.settings_dict
+    if "pool" in settings_dict.get("OPTIONS", {}):
+        # the pool cannot be combined with persistent connections
+        modes = {"pooled": 0}
+    else:
+        modes = {"per_request": 0, "persistent": 60}
+
+    # the test client keeps connections open on purpose, the WSGI handler uWSGI calls
+    # closes them at the end of a request like in production
+    handler = WSGIHandler()
+    connects = []
+
+    def count_connect(sender, connection, **kwargs):
+        connects.append(connection.alias)
+
+    report = {}
+    max_age = settings_dict["CONN_MAX_AGE"]
+    connection_created.connect(count_connect)
+    try:
+        with benchmark_users(1) as (user,):
+            token = ApiToken.objects.create(user=user)
+
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": reverse("api-balance", args=[user.tin]),
+                "SERVER_NAME": settings.ALLOWED_HOSTS[0],
+                "SERVER_PORT": "80",
+                "HTTP_AUTHORIZATION": f"Token {token.key}",
+                "wsgi.url_scheme": "http",
+            }
+
+            def get_balance() -> int:
+                statuses = []
+                response = handler(
+                    {**environ, "wsgi.input": io.BytesIO()},
+                    lambda status, headers, exc_info=None: statuses.append(status),
+                )
+                response.close()
+                return int(statuses[0].split()[0])
+
+            for mode, mode_max_age in modes.items():
+                # the age is read when a connection is opened, so the current one is closed
+                settings_dict["CONN_MAX_AGE"] = mode_max_age
+                connection.close()
+                connects.clear()
+                report[mode] = measure_requests(get_balance, operations)
+                report[mode]["connects_per_request"] = round(
+                    len(connects) / operations, 2
+                )
+    finally:
+        settings_dict["CONN_MAX_AGE"] = max_age
+        connection_created.disconnect(count_connect)
+
+    if "persistent" in report:
+        report["mean_ms_saved"] = round(
+            report["per_request"]["mean_ms"] - report["persistent"]["mean_ms"], 3
+        )
+    return report
+
+
+# requests the async view has in flight at once, an ASGI worker is not limited by threads
+ASYNC_REQUESTS_IN_FLIGHT = 64
+
+
+def request_capacity(
+    threads: int = 8, operations: int = 20, users: int = 10, **options
+) -> Dict:
+    """Serves the same transfers through the sync view from as many threads as uWSGI
+    has slots (4 processes x 2 threads) and through the async view from one event loop.
+    """
+    requests_count = threads * operations
+    report = {}
+    with benchmark_users(max(users, 2)) as accounts:
+        # the views let any authenticated user choose the sender
+        user = accounts[0]
+
+        def form_data() -> Dict:
+            sender, recipient = random.sample(accounts, 2)
+            return {"sender": sender.pk, "recipients": recipient.tin, "amount": "0.01"}
+
+        clients = [Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]) for _ in range(threads)]
+        for client in clients:
+            client.force_login(user)
+
+        def post_sync(thread_number: int, i: int) -> None:
+            response = clients[thread_number].post(reverse("transfer"), form_data())
+            if response.status_code != 302:
+                raise RuntimeError(f"Unexpected response status {response.status_code}")
+
+        # the threads stand for the slots of all uWSGI processes
+        with override_settings(TRANSFER_MAX_IN_FLIGHT=threads):
+            report["sync_view"] = run_in_threads(
+                post_sync, threads, operations
+            ).as_dict()
+
+        async def post_async(
+            client: AsyncClient, semaphore: asyncio.Semaphore
+        ) -> float:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(reverse("transfer-async"), form_data())
+                if response.status_code != 302:
+                    raise RuntimeError(
+                        f"Unexpected response status {response.status_code}"
+                    )
+                return time.perf_counter() - started
+
+        async def run_async() -> Dict:
+            client = AsyncClient(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+            await client.aforce_login(user)
+            semaphore = asyncio.Semaphore(ASYNC_REQUESTS_IN_FLIGHT)
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(post_async(client, semaphore) for _ in range(requests_count)),
+                return_exceptions=True,
+            )
+            elapsed = time.perf_counter() - started
+            latencies_ms = sorted(
+                result * 1000 for result in results if isinstance(result, float)
+            )
+            return {
+                "operations": len(latencies_ms),
+                "elapsed_seconds": round(elapsed, 3),
+                "operations_per_second": round(len(latencies_ms) / elapsed, 1),
+                "p50_ms": round(percentile(latencies_ms, 50), 3),
+                "p99_ms": round(percentile(latencies_ms, 99), 3),
+                "errors": requests_count - len(latencies_ms),
+            }
+
+        report["async_view"] = async_to_sync(run_async)()
+
+    report["requests_in_flight"] = {
+        "sync_view": threads,
+        "async_view": ASYNC_REQUESTS_IN_FLIGHT,
+    }
+    return report
+
+
+# the unprotected setup lets every slot run a transfer and wait for locks forever
+STORM_MODES = {
+    "unprotected": {"max_in_flight": None, "lock_timeout_ms": 0},
+    "admission_control": {"max_in_flight": 0.5, "lock_timeout_ms": 100},
+}
+
+
+def transfer_storm(
+    threads: int = 8, operations: int = 20, hold_seconds: float = 2.0, **options
+) -> Dict:
+    """Floods the transfer view with payments to a locked account while the same worker
+    slots serve the sender lookup, and reports the lookup latency with and without
+    admission control.
+
+    The threads stand for the slots of all uWSGI processes, requests wait in a shared queue
+    for a free slot like they wait in the uWSGI listen queue.
+    """
+    report = {}
+    for mode, config in STORM_MODES.items():
+        max_in_flight = max(int(threads * (config["max_in_flight"] or 1)), 1)
+        with benchmark_users(threads + 1) as accounts, override_settings(
+            TRANSFER_MAX_IN_FLIGHT=max_in_flight,
+            TRANSFER_LOCK_TIMEOUT_MS=config["lock_timeout_ms"],
+        ):
+            recipient, *senders = accounts
+            locked = threading.Event()
+
+            def hold_lock():
+                with transaction.atomic():
+                    Account.objects.select_for_update().get(pk=recipient.pk)
+                    locked.set()
+                    time.sleep(hold_seconds)
+                connections.close_all()
+
+            requests = queue.Queue()
+            for i in range(threads * operations):
+                requests.put(("transfer", time.perf_counter()))
+                if i % threads == 0:
+                    requests.put(("lookup", time.perf_counter()))
+
+            latencies = {"transfer": [], "lookup": []}
+            statuses = {}
+            lock = threading.Lock()
+
+            def serve(thread_number: int):
+                client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+                client.force_login(senders[thread_number])
+                while True:
+                    try:
+                        kind, queued_at = requests.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == "transfer":
+                        data = {
+                            "sender": senders[thread_number].pk,
+                            "recipients": recipient.tin,
+                            "amount": "0.01",
+                        }
+                        response = client.post(reverse("transfer"), data)
+                    else:
+                        response = client.get(reverse("sender-lookup"), {"q": "9"})
+                    with lock:
+                        latencies[kind].append((time.perf_counter() - queued_at) * 1000)
+                        key = f"{kind}_{response.status_code}"
+                        statuses[key] = statuses.get(key, 0) + 1
+                connections.close_all()
+
+            holder = threading.Thread(target=hold_lock)
+            holder.start()
+            locked.wait()
+            workers = [
+                threading.Thread(target=serve, args=(n,)) for n in range(threads)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            holder.join()
+
+        report[mode] = {
+            "max_in_flight": max_in_flight,
+            "lookup_p50_ms": round(percentile(sorted(latencies["lookup"]), 50), 3),
+            "lookup_p99_ms": round(percentile(sorted(latencies["lookup"]), 99), 3),
+            "transfer_p99_ms": round(percentile(sorted(latencies["transfer"]), 99), 3),
+            "responses": dict(sorted(statuses.items())),
+        }
+    return report
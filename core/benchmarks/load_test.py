@@ -0,0 +1,198 @@
+import json
+import random
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from accounts.models import ApiToken, User
+from core.benchmarks.runner import Operation, Report, run_in_threads
+from core.benchmarks.seed import benchmark_users
+from core.services.hot_accounts import enable_hot_account
+from core.services.transfer_money import Service as TransferService
+
+
+AMOUNT_PER_RECIPIENT = Decimal("0.01")
+
+
+class TrafficItem(NamedTuple):
+    sender: str
+    recipients: List[str]
+    amount: Decimal
+
+
+def read_traffic(lines: Iterable[str]) -> List[TrafficItem]:
+    """Reads transfers stored as JSON lines: {"sender": tin, "recipients": [tin, ...], "amount": "1.00"}."""
+    traffic = []
+    for line in lines:
+        if line.strip():
+            item = json.loads(line)
+            traffic.append(
+                TrafficItem(
+                    item["sender"], item["recipients"], Decimal(str(item["amount"]))
+                )
+            )
+    return traffic
+
+
+def synthesize_traffic(
+    tins: List[str],
+    count: int,
+    max_recipients: int,
+    hot_skew: float,
+    seed: Optional[int] = None,
+) -> List[TrafficItem]:
+    """Random senders pay random groups of users, so transfers cross each other.
+
+    With probability hot_skew a transfer pays the first user only, which makes it a hot account.
+    """
+    rng = random.Random(seed)
+    hot_tin, *others = tins
+    traffic = []
+    for _ in range(count):
+        if rng.random() < hot_skew:
+            traffic.append(
+                TrafficItem(rng.choice(others), [hot_tin], AMOUNT_PER_RECIPIENT)
+            )
+            continue
+
+        sender, *recipients = rng.sample(
+            tins, rng.randint(2, min(max_recipients, len(tins) - 1) + 1)
+        )
+        traffic.append(
+            TrafficItem(sender, recipients, AMOUNT_PER_RECIPIENT * len(recipients))
+        )
+    return traffic
+
+
+def send_to_service(
+    senders: Dict[str, User], threads: int
+) -> Callable[[int, TrafficItem], int]:
+    def send(thread_number: int, item: TrafficItem) -> int:
+        service = TransferService(senders[item.sender], item.amount, item.recipients)
+        service.transfer()
+        return service.retries
+
+    return send
+
+
+def check_response(response, expected_status: int) -> None:
+    if response.status_code != expected_status:
+        raise RuntimeError(f"Unexpected response status {response.status_code}")
+
+
+def send_to_view(
+    senders: Dict[str, User], threads: int
+) -> Callable[[int, TrafficItem], None]:
+    # the view lets any authenticated user choose the sender, so one session per thread is enough
+    user = next(iter(senders.values()))
+    clients = [Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]) for _ in range(threads)]
+    for client in clients:
+        client.force_login(user)
+
+    def send(thread_number: int, item: TrafficItem) -> None:
+        data = {
+            "sender": senders[item.sender].pk,
+            "recipients": ", ".join(item.recipients),
+            "amount": item.amount,
+        }
+        check_response(clients[thread_number].post(reverse("transfer"), data), 302)
+
+    return send
+
+
+def send_to_api(
+    senders: Dict[str, User], threads: int
+) -> Callable[[int, TrafficItem], None]:
+    ApiToken.objects.bulk_create(
+        [ApiToken(user=user) for user in senders.values()], ignore_conflicts=True
+    )
+    tokens = dict(
+        ApiToken.objects.filter(user__in=senders.values()).values_list(
+            "user__tin", "key"
+        )
+    )
+    clients = [Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]) for _ in range(threads)]
+
+    def send(thread_number: int, item: TrafficItem) -> None:
+        response = clients[thread_number].post(
+            reverse("api-transfer"),
+            json.dumps({"recipients": item.recipients, "amount": str(item.amount)}),
+            content_type="application/json",
+            headers={"Authorization": f"Token {tokens[item.sender]}"},
+        )
+        check_response(response, 201)
+
+    return send
+
+
+SENDERS = {"service": send_to_service, "view": send_to_view, "api": send_to_api}
+TARGETS = tuple(SENDERS)
+
+
+def make_operation(target: str, traffic: List[TrafficItem], threads: int) -> Operation:
+    users = User.objects.filter(tin__in={item.sender for item in traffic}).only(
+        "pk", "tin", "username"
+    )
+    senders = {user.tin: user for user in users}
+    send = SENDERS[target](senders, threads)
+
+    def operation(thread_number: int, i: int) -> Optional[int]:
+        return send(
+            thread_number, traffic[(i * threads + thread_number) % len(traffic)]
+        )
+
+    return operation
+
+
+def run_operation(operation: Operation, threads: int, operations: int) -> Report:
+    # the threads stand for the slots of all uWSGI processes, so none of them is shed
+    with override_settings(TRANSFER_MAX_IN_FLIGHT=threads):
+        return run_in_threads(operation, threads, operations)
+
+
+def run_load_test(
+    target: str = "service",
+    threads: int = 8,
+    operations: int = 100,
+    users: int = 100,
+    max_recipients: int = 1,
+    hot_skew: float = 0.0,
+    hot_account: bool = False,
+    traffic: Optional[List[TrafficItem]] = None,
+    seed: Optional[int] = None,
+) -> Dict:
+    parameters = {
+        "target": target,
+        "threads": threads,
+        "operations_per_thread": operations,
+        "replayed": traffic is not None,
+    }
+    if traffic is not None:
+        # replayed traffic runs against the users that already exist
+        report = run_operation(
+            make_operation(target, traffic, threads), threads, operations
+        )
+        return {"parameters": parameters, **report.as_dict()}
+
+    parameters.update(
+        users=users,
+        max_recipients=max_recipients,
+        hot_skew=hot_skew,
+        hot_account=hot_account,
+    )
+    with benchmark_users(users) as accounts:
+        if hot_account:
+            enable_hot_account(accounts[0].account)
+
+        tins = [account.tin for account in accounts]
+        traffic = synthesize_traffic(
+            tins, threads * operations, max_recipients, hot_skew, seed
+        )
+        report = run_operation(
+            make_operation(target, traffic, threads), threads, operations
+        )
+
+    return {"parameters": parameters, **report.as_dict()}
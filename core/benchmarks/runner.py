@@ -0,0 +1,116 @@
+import statistics
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from django.db import DatabaseError, connection, connections
+
+from core.db import is_retryable_error
+
+
+# an operation receives the thread number and the iteration number
+# and returns how many times it had to be retried
+Operation = Callable[[int, int], Optional[int]]
+
+
+def percentile(values: List[float], percent: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+class QueryCounter:
+    """Database execute wrapper counting statements and deadlocks of a connection."""
+
+    def __init__(self):
+        self.queries = 0
+        self.deadlocks = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        try:
+            return execute(sql, params, many, context)
+        except DatabaseError as e:
+            if is_retryable_error(e):
+                self.deadlocks += 1
+            raise
+
+
+class Report:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.retries = 0
+        self.queries = 0
+        self.deadlocks = 0
+        self.errors: Counter = Counter()
+        self.elapsed = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, latency: float, retries: int = 0, error: Optional[Exception] = None):
+        with self.lock:
+            self.latencies.append(latency)
+            self.retries += retries
+            if error is not None:
+                self.errors[type(error).__name__] += 1
+
+    def as_dict(self) -> Dict:
+        operations = len(self.latencies)
+        latencies_ms = sorted(latency * 1000 for latency in self.latencies)
+        return {
+            "operations": operations,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "operations_per_second": (
+                round(operations / self.elapsed, 1) if self.elapsed else 0.0
+            ),
+            "p50_ms": round(percentile(latencies_ms, 50), 3),
+            "p95_ms": round(percentile(latencies_ms, 95), 3),
+            "p99_ms": round(percentile(latencies_ms, 99), 3),
+            "queries_per_operation": (
+                round(self.queries / operations, 2) if operations else 0.0
+            ),
+            "deadlocks": self.deadlocks,
+            "retries": self.retries,
+            "abort_rate": (
+                round(self.retries / (operations + self.retries), 4)
+                if operations
+                else 0.0
+            ),
+            "errors": dict(self.errors),
+        }
+
+
+def run_in_threads(
+    operation: Operation, threads: int, operations_per_thread: int
+) -> Report:
+    report = Report()
+
+    def worker(thread_number: int):
+        counter = QueryCounter()
+        try:
+            with connection.execute_wrapper(counter):
+                for i in range(operations_per_thread):
+                    started = time.perf_counter()
+                    try:
+                        retries = operation(thread_number, i) or 0
+                    except Exception as e:
+                        report.add(time.perf_counter() - started, error=e)
+                    else:
+                        report.add(time.perf_counter() - started, retries)
+        finally:
+            with report.lock:
+                report.queries += counter.queries
+                report.deadlocks += counter.deadlocks
+            # every thread gets its own database connection
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,56 @@
+import random
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Iterator, List
+
+from django.contrib.auth.hashers import make_password
+
+from accounts.models import Account, IdempotencyKey, LedgerEntry, Transfer, TransferJob, User
+from core.db import MAX_QUERY_PARAMETERS, max_bulk_batch_size
+
+
+BENCHMARK_TIN_PREFIX = "9"
+DEFAULT_BENCHMARK_BALANCE = Decimal("1000000")
+
+
+@contextmanager
+def benchmark_users(
+    count: int, balance: Decimal = DEFAULT_BENCHMARK_BALANCE
+) -> Iterator[List[User]]:
+    start = random.randrange(10**8)
+    tins = [f"{BENCHMARK_TIN_PREFIX}{start + i:09d}" for i in range(count)]
+    password = make_password(None)
+
+    users = User.objects.bulk_create(
+        (
+            User(
+                username=f"benchmark-{tin}",
+                first_name="benchmark",
+                last_name="benchmark",
+                tin=tin,
+                password=password,
+            )
+            for tin in tins
+        ),
+        batch_size=max_bulk_batch_size(User),
+    )
+    Account.objects.bulk_create(
+        (Account(user=user, tin=user.tin, balance=balance) for user in users),
+        batch_size=max_bulk_batch_size(Account),
+    )
+    # the tins are consecutive, a range selects them without a parameter per user
+    tin_range = (tins[0], tins[-1])
+    try:
+        yield list(User.objects.filter(tin__range=tin_range).order_by("pk"))
+    finally:
+        TransferJob.objects.filter(sender__tin__range=tin_range).delete()
+        IdempotencyKey.objects.filter(sender__tin__range=tin_range).delete()
+        LedgerEntry.objects.filter(transfer__sender__tin__range=tin_range).delete()
+        Transfer.objects.filter(sender__tin__range=tin_range).delete()
+        # the deletion cascades with a parameter per user, so users are deleted in chunks
+        user_pks = list(
+            User.objects.filter(tin__range=tin_range).values_list("pk", flat=True)
+        )
+        for start in range(0, len(user_pks), MAX_QUERY_PARAMETERS):
+            end = start + MAX_QUERY_PARAMETERS
+            User.objects.filter(pk__in=user_pks[start:end]).delete()
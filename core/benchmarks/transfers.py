@@ -0,0 +1,327 @@
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import override_settings
+
+from accounts.models import Account
+from core import metrics
+from core.benchmarks.runner import QueryCounter, run_in_threads
+from core.benchmarks.seed import benchmark_users
+from core.services.batch_transfer import Service as BatchTransferService
+from core.services.batch_transfer import TransferInstruction
+from core.services.group_commit import Service as GroupCommitService
+from core.services.group_commit import get_committer
+from core.services.hot_accounts import disable_hot_account, enable_hot_account
+from core.services.payout import Service as PayoutService
+from core.services.transfer_money import PHASE_SECONDS
+from core.services.transfer_money import Service as TransferService
+
+
+def crossing_transfers(
+    threads: int = 8, operations: int = 100, users: int = 10, **options
+) -> Dict:
+    """Random senders pay random groups of each other, so lock sets overlap in every order."""
+    with benchmark_users(users) as accounts:
+        tins = [account.tin for account in accounts]
+        total_before = Account.objects.filter(tin__in=tins).aggregate(
+            total=Sum("balance")
+        )["total"]
+
+        def operation(thread_number: int, i: int) -> int:
+            sender, *recipients = random.sample(
+                accounts, random.randint(2, min(4, len(accounts)))
+            )
+            service = TransferService(
+                sender, Decimal("1.00") * len(recipients), [r.tin for r in recipients]
+            )
+            service.transfer()
+            return service.retries
+
+        report = run_in_threads(operation, threads, operations).as_dict()
+        total_after = Account.objects.filter(tin__in=tins).aggregate(
+            total=Sum("balance")
+        )["total"]
+
+    report["balance_conserved"] = total_before == total_after
+    return report
+
+
+def group_commit(
+    threads: int = 32, operations: int = 50, users: int = 1000, **options
+) -> Dict:
+    """Random users pay each other from many threads, each transfer committed alone
+    and then grouped with the ones submitted by the other threads."""
+    report = {}
+    committer = get_committer()
+    for mode, service_class in (
+        ("single", TransferService),
+        ("grouped", GroupCommitService),
+    ):
+        with benchmark_users(users) as accounts:
+            tins = [account.tin for account in accounts]
+            total_before = Account.objects.filter(tin__in=tins).aggregate(
+                total=Sum("balance")
+            )["total"]
+
+            def operation(thread_number: int, i: int) -> int:
+                sender, recipient = random.sample(accounts, 2)
+                service = service_class(sender, Decimal("1.00"), [recipient.tin])
+                service.transfer()
+                return service.retries
+
+            groups_before = committer.groups_count
+            report[mode] = run_in_threads(operation, threads, operations).as_dict()
+            total_after = Account.objects.filter(tin__in=tins).aggregate(
+                total=Sum("balance")
+            )["total"]
+
+        operations_count = report[mode]["operations"]
+        commits = committer.groups_count - groups_before
+        report[mode]["commits"] = commits if mode == "grouped" else operations_count
+        report[mode]["transfers_per_commit"] = round(
+            operations_count / max(report[mode]["commits"], 1), 1
+        )
+        report[mode]["balance_conserved"] = total_before == total_after
+
+    single = report["single"]["operations_per_second"]
+    grouped = report["grouped"]["operations_per_second"]
+    report["speedup"] = round(grouped / single, 2)
+    return report
+
+
+def batch_transfers(operations: int = 1000, users: int = 100, **options) -> Dict:
+    """Applies the same random transfers one by one and as a single batch."""
+    with benchmark_users(users) as accounts:
+        transfers = []
+        for i in range(operations):
+            sender, *recipients = random.sample(
+                accounts, random.randint(2, min(4, len(accounts)))
+            )
+            transfers.append(
+                TransferInstruction(
+                    i, sender.tin, [r.tin for r in recipients], Decimal("1.00")
+                )
+            )
+        senders = {account.tin: account for account in accounts}
+
+        started = time.perf_counter()
+        for item in transfers:
+            TransferService(
+                senders[item.sender], item.amount, item.recipients
+            ).transfer()
+        single_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = BatchTransferService(transfers).transfer()
+        batch_elapsed = time.perf_counter() - started
+
+    return {
+        "transfers": operations,
+        "single_transfers_per_second": round(operations / single_elapsed, 1),
+        "batch_transfers_per_second": round(operations / batch_elapsed, 1),
+        "speedup": round(single_elapsed / batch_elapsed, 1),
+        "failed": sum(not result.succeeded for result in results),
+    }
+
+
+def ledger_overhead(operations: int = 100, users: int = 101, **options) -> Dict:
+    """Times fan-out transfers and the part of them spent writing their ledger entries,
+    which the ledger phase of the transfer metrics records."""
+    with benchmark_users(users) as accounts, override_settings(TRANSFER_METRICS=True):
+        sender, *recipients = accounts
+        tins = [recipient.tin for recipient in recipients]
+
+        ledger_before = metrics.registry.get_sum(PHASE_SECONDS, phase="ledger")
+        started = time.perf_counter()
+        for _ in range(operations):
+            TransferService(sender, Decimal("0.01") * len(tins), tins).transfer()
+        with_ledger = time.perf_counter() - started
+        ledger = metrics.registry.get_sum(PHASE_SECONDS, phase="ledger") - ledger_before
+
+    without_ledger = with_ledger - ledger
+    return {
+        "transfers": operations,
+        "recipients": len(tins),
+        "without_ledger_ms": round(without_ledger / operations * 1000, 3),
+        "with_ledger_ms": round(with_ledger / operations * 1000, 3),
+        "overhead_percent": round((with_ledger / without_ledger - 1) * 100, 1),
+    }
+
+
+def hot_account(
+    threads: int = 8, operations: int = 100, users: int = 10, **options
+) -> Dict:
+    """Many senders pay the same recipient, first with a single balance row, then with shards."""
+    report = {}
+    for mode in ("single_row", "sharded"):
+        with benchmark_users(max(users, threads + 1)) as accounts:
+            recipient, *senders = accounts
+            if mode == "sharded":
+                enable_hot_account(recipient.account)
+
+            def operation(thread_number: int, i: int) -> int:
+                service = TransferService(
+                    senders[thread_number], Decimal("1.00"), [recipient.tin]
+                )
+                service.transfer()
+                return service.retries
+
+            report[mode] = run_in_threads(operation, threads, operations).as_dict()
+            disable_hot_account(recipient.account)
+
+    single_row = report["single_row"]["operations_per_second"]
+    sharded = report["sharded"]["operations_per_second"]
+    report["speedup"] = round(sharded / single_row, 2)
+    return report
+
+
+PAYOUT_RECIPIENTS_COUNTS = (1000, 10000, 100000)
+
+
+def payout_fanout(**options) -> Dict:
+    """Times payouts to 1k, 10k and 100k recipients and traces their peak memory."""
+    report = {}
+    for recipients_count in PAYOUT_RECIPIENTS_COUNTS:
+        with benchmark_users(recipients_count + 1) as accounts:
+            sender, *recipients = accounts
+            tins = [recipient.tin for recipient in recipients]
+            amount = Decimal("0.01") * recipients_count
+
+            counter = QueryCounter()
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                PayoutService(sender, amount, tins, recipients_count).transfer()
+            elapsed = time.perf_counter() - started
+
+            # tracing slows allocations down, so memory is measured by a second payout
+            tracemalloc.start()
+            PayoutService(sender, amount, tins, recipients_count).transfer()
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        report[str(recipients_count)] = {
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "recipients_per_second": round(recipients_count / elapsed, 1),
+            "queries": counter.queries,
+            "peak_memory_kb": round(peak_memory / 1024),
+        }
+    return report
+
+
+def contention_levels(threads: int) -> Dict[str, int]:
+    # accounts the threads pick senders and recipients from, fewer accounts collide more
+    return {"high": 2, "medium": max(threads, 3), "low": threads * 16}
+
+
+def concurrency_modes(threads: int = 8, operations: int = 100, **options) -> Dict:
+    """Runs the same random one-recipient transfers with locking and optimistic
+    transfers, for several numbers of accounts sharing the traffic."""
+    report = {}
+    for level, users in contention_levels(threads).items():
+        report[level] = {"users": users}
+        for mode in ("pessimistic", "optimistic"):
+            with benchmark_users(users) as accounts:
+                tins = [account.tin for account in accounts]
+                total_before = Account.objects.filter(tin__in=tins).aggregate(
+                    total=Sum("balance")
+                )["total"]
+
+                def operation(thread_number: int, i: int) -> int:
+                    sender, recipient = random.sample(accounts, 2)
+                    service = TransferService(
+                        sender,
+                        Decimal("1.00"),
+                        [recipient.tin],
+                        optimistic=mode == "optimistic",
+                    )
+                    service.transfer()
+                    return service.retries
+
+                result = run_in_threads(operation, threads, operations).as_dict()
+                total_after = Account.objects.filter(tin__in=tins).aggregate(
+                    total=Sum("balance")
+                )["total"]
+
+            result["balance_conserved"] = total_before == total_after
+            report[level][mode] = result
+
+        pessimistic = report[level]["pessimistic"]["operations_per_second"]
+        optimistic = report[level]["optimistic"]["operations_per_second"]
+        report[level]["speedup"] = (
+            round(optimistic / pessimistic, 2) if pessimistic else 0.0
+        )
+    return report
+
+
+class StatementTimer:
+    """Database execute wrapper timing statements by their first keyword."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            keyword = sql.split(None, 1)[0].upper()
+            self.latencies[keyword].append(time.perf_counter() - started)
+
+    def as_dict(self) -> Dict:
+        report = {
+            keyword: round(sum(latencies) / len(latencies) * 1000, 4)
+            for keyword, latencies in sorted(self.latencies.items())
+        }
+        all_latencies = [
+            latency for latencies in self.latencies.values() for latency in latencies
+        ]
+        report["all"] = round(sum(all_latencies) / len(all_latencies) * 1000, 4)
+        return report
+
+
+def statement_latency(operations: int = 100, users: int = 11, **options) -> Dict:
+    """Times every statement of repeated transfers with parameters bound by the client
+    and by the server, which lets psycopg prepare the repeated ones."""
+    db_options = connection.settings_dict["OPTIONS"]
+    if connection.vendor != "postgresql" or "pool" in db_options:
+        # the binding of pooled connections is fixed when the pool is created
+        modes = {"configured": None}
+    else:
+        modes = {"client_side_binding": False, "server_side_binding": True}
+
+    report = {}
+    configured_binding = db_options.get("server_side_binding")
+    try:
+        with benchmark_users(users) as accounts:
+            sender, *recipients = accounts
+            tins = [recipient.tin for recipient in recipients]
+
+            for mode, binding in modes.items():
+                if binding is not None:
+                    # the cursor class is chosen when a connection is opened
+                    db_options["server_side_binding"] = binding
+                    connection.close()
+
+                timer = StatementTimer()
+                with connection.execute_wrapper(timer):
+                    for _ in range(operations):
+                        TransferService(
+                            sender, Decimal("0.01") * len(tins), tins
+                        ).transfer()
+                report[mode] = timer.as_dict()
+    finally:
+        if "configured" not in modes:
+            db_options["server_side_binding"] = configured_binding
+            connection.close()
+
+    if "server_side_binding" in report:
+        client_side = report["client_side_binding"]["all"]
+        server_side = report["server_side_binding"]["all"]
+        report["speedup"] = round(client_side / server_side, 2)
+    return report
@@ -0,0 +1,147 @@
+import random
+import time
+from typing import Callable, List, Optional, TypeVar
+
+from django.db import OperationalError, connections, transaction
+from django.db.models import Model, QuerySet
+from django.db.models.sql import UpdateQuery
+
+from accounts.constants import MAX_TRANSFER_RETRIES, TRANSFER_RETRY_BACKOFF_SECONDS
+
+
+T = TypeVar("T")
+
+DEADLOCK_DETECTED = "40P01"
+SERIALIZATION_FAILURE = "40001"
+RETRYABLE_SQLSTATES = {DEADLOCK_DETECTED, SERIALIZATION_FAILURE}
+
+LOCK_NOT_AVAILABLE = "55P03"
+QUERY_CANCELED = "57014"
+TIMEOUT_SQLSTATES = {LOCK_NOT_AVAILABLE, QUERY_CANCELED}
+
+# PostgreSQL takes at most this many parameters in one statement, and with server-side
+# binding every value of a bulk insert is a parameter
+MAX_QUERY_PARAMETERS = 65535
+
+
+class VersionConflict(Exception):
+    """A row has been changed by another transaction since it was read."""
+
+
+class Busy(Exception):
+    """The operation was rejected or has given up waiting, it can be tried again later."""
+
+
+def max_bulk_batch_size(model) -> int:
+    """Returns how many rows of the model one INSERT can take."""
+    return MAX_QUERY_PARAMETERS // len(model._meta.concrete_fields)
+
+
+def max_bulk_update_batch_size(fields: List[str]) -> int:
+    """Returns how many rows one bulk_update of the fields can take."""
+    # every field is a CASE with a primary key and a value per row, and the WHERE clause
+    # lists the primary keys once more
+    return MAX_QUERY_PARAMETERS // (2 * len(fields) + 1)
+
+
+def get_sqlstate(exc: Exception) -> Optional[str]:
+    # Django wraps driver errors, the original one is kept in __cause__
+    cause = exc.__cause__
+    return getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    if isinstance(exc, VersionConflict):
+        return True
+    return (
+        isinstance(exc, OperationalError) and get_sqlstate(exc) in RETRYABLE_SQLSTATES
+    )
+
+
+def is_timeout_error(exc: Exception) -> bool:
+    return isinstance(exc, OperationalError) and get_sqlstate(exc) in TIMEOUT_SQLSTATES
+
+
+def set_transaction_timeouts(lock_timeout_ms: int, statement_timeout_ms: int) -> None:
+    """Limits how long statements of the current transaction wait for locks and run, 0 is no limit."""
+    connection = transaction.get_connection()
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        # set_config(..., true) lasts until the end of the transaction, like SET LOCAL
+        cursor.execute(
+            "SELECT set_config('lock_timeout', %s, true), set_config('statement_timeout', %s, true)",
+            [f"{lock_timeout_ms}ms", f"{statement_timeout_ms}ms"],
+        )
+
+
+def set_repeatable_read() -> None:
+    """Makes every query of the current transaction read the same snapshot.
+
+    Must run before any other query of the transaction; inside an outer transaction,
+    which has already queried, it does nothing.
+    """
+    connection = transaction.get_connection()
+    if connection.vendor != "postgresql" or connection.savepoint_ids:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+
+
+def select_for_key_share(queryset: QuerySet) -> List[Model]:
+    """Fetches the rows of the queryset locked FOR KEY SHARE, which select_for_update() cannot take.
+
+    Only FOR UPDATE conflicts with the lock, the rows can still be updated or locked
+    FOR NO KEY UPDATE by other transactions. SQLite has no row locks, there the rows
+    are fetched as they are.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return list(queryset)
+
+    sql, params = queryset.query.sql_with_params()
+    manager = queryset.model._default_manager.db_manager(queryset.db)
+    return list(manager.raw(f"{sql} FOR KEY SHARE", params))
+
+
+def update_returning(queryset: QuerySet, **values) -> List[Model]:
+    """Updates the rows of the queryset like update() and returns them as the update has left them.
+
+    Only the primary key and the updated fields of the returned instances are loaded.
+    """
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    sql, params = query.get_compiler(queryset.db).as_sql()
+
+    connection = connections[queryset.db]
+    opts = queryset.model._meta
+    columns = [opts.pk.column, *(opts.get_field(name).column for name in values)]
+    returning = ", ".join(connection.ops.quote_name(column) for column in columns)
+    manager = queryset.model._default_manager.db_manager(queryset.db)
+    return list(manager.raw(f"{sql} RETURNING {returning}", params))
+
+
+def atomic_with_retry(
+    func: Callable[[], T],
+    retries: int = MAX_TRANSFER_RETRIES,
+    on_retry: Optional[Callable[[Exception], None]] = None,
+) -> T:
+    connection = transaction.get_connection()
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic():
+                return func()
+        except (OperationalError, VersionConflict) as e:
+            # inside an outer transaction the whole transaction is aborted,
+            # so only the outermost caller can retry
+            can_retry = not connection.in_atomic_block and attempt < retries
+            if not (can_retry and is_retryable_error(e)):
+                raise
+
+            attempt += 1
+            if on_retry is not None:
+                on_retry(e)
+            time.sleep(TRANSFER_RETRY_BACKOFF_SECONDS * 2**attempt * random.random())
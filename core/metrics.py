@@ -0,0 +1,202 @@
+"""In-process metrics exposed in the Prometheus text format.
+
+Every process keeps its own registry, so a scrape sees the process that has answered it.
+Nothing is recorded unless settings.TRANSFER_METRICS is on.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Iterator, List, Tuple, TypeVar
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+
+from core.db import Busy
+
+
+T = TypeVar("T")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# upper bounds in seconds
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+DESCRIPTIONS = {
+    "transfer_seconds": "Duration of a transfer including retries",
+    "transfer_queries_total": "Database queries executed by transfers",
+    "transfer_total": "Transfers by outcome",
+    "transfer_phase_seconds": "Duration of each phase of a transfer",
+    "transfer_retries_total": "Transfers retried after a deadlock, a serialization failure or a version conflict",
+    "transfer_shed_total": "Transfers rejected as busy, by reason",
+    "transfer_groups_total": "Groups of transfers committed together, by how they were applied",
+    "transfer_grouped_total": "Transfers applied in groups",
+}
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(dict)
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.counters[name][key] = self.counters[name].get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            histogram = self.histograms[name].get(key)
+            if histogram is None:
+                histogram = self.histograms[name][key] = Histogram()
+            histogram.observe(value)
+
+    def get_sum(self, name: str, **labels: str) -> float:
+        """Returns the sum of the values observed by a histogram, 0 before the first one."""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            histogram = self.histograms.get(name, {}).get(key)
+            return histogram.sum if histogram is not None else 0.0
+
+    def clear(self) -> None:
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def _header(self, name: str, metric_type: str) -> List[str]:
+        lines = []
+        if name in DESCRIPTIONS:
+            lines.append(f"# HELP {name} {DESCRIPTIONS[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        return lines
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for name, values in sorted(self.counters.items()):
+                lines.extend(self._header(name, "counter"))
+                for labels, value in sorted(values.items()):
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+
+            for name, histograms in sorted(self.histograms.items()):
+                lines.extend(self._header(name, "histogram"))
+                for labels, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    bounds = [*(f"{bound:g}" for bound in histogram.buckets), "+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        bucket_labels = format_labels((*labels, ("le", bound)))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def is_enabled() -> bool:
+    return settings.TRANSFER_METRICS
+
+
+def increment(name: str, value: float = 1, **labels: str) -> None:
+    if is_enabled():
+        registry.increment(name, value, **labels)
+
+
+@contextmanager
+def _timer(name: str, labels: Dict[str, str]) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - started_at, **labels)
+
+
+def timer(name: str, **labels: str) -> ContextManager[None]:
+    """Records how long the block takes in the histogram name."""
+    if not is_enabled():
+        return nullcontext()
+    return _timer(name, labels)
+
+
+def timed(name: str, **labels: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _track(name: str) -> Iterator[None]:
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    try:
+        with _timer(f"{name}_seconds", {}), connection.execute_wrapper(count_query):
+            yield
+    except ValidationError:
+        registry.increment(f"{name}_total", outcome="rejected")
+        raise
+    except Busy:
+        registry.increment(f"{name}_total", outcome="busy")
+        raise
+    except Exception:
+        registry.increment(f"{name}_total", outcome="failed")
+        raise
+    else:
+        registry.increment(f"{name}_total", outcome="succeeded")
+    finally:
+        registry.increment(f"{name}_queries_total", queries)
+
+
+def track(name: str) -> ContextManager[None]:
+    """Records duration, number of queries and outcome of the block."""
+    if not is_enabled():
+        return nullcontext()
+    return _track(name)
@@ -0,0 +1,68 @@
+"""Exact money arithmetic in integer minor units (cents)."""
+
+import decimal
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+CENT = decimal.Decimal("0.01")
+
+
+def to_cents(amount: decimal.Decimal) -> int:
+    return int(amount.quantize(CENT, rounding=decimal.ROUND_DOWN).scaleb(2))
+
+
+def from_cents(cents: int) -> decimal.Decimal:
+    return decimal.Decimal(cents).scaleb(-2)
+
+
+def split_cents(cents: int, weights: Sequence[int]) -> List[int]:
+    """Splits cents proportionally to weights so that the parts add up to cents exactly.
+
+    Every part gets the whole cents of its exact share, the cents left over go one by one
+    to the parts with the largest fractional remainders (earlier parts win ties).
+    """
+    total_weight = sum(weights)
+    numerators = [cents * weight for weight in weights]
+    parts = [numerator // total_weight for numerator in numerators]
+    leftover = cents - sum(parts)
+    if leftover:
+        by_remainder = sorted(
+            range(len(weights)),
+            key=lambda i: numerators[i] % total_weight,
+            reverse=True,
+        )
+        for i in by_remainder[:leftover]:
+            parts[i] += 1
+    return parts
+
+
+def split(
+    amount: decimal.Decimal, count: int, weights: Optional[Sequence[int]] = None
+) -> List[decimal.Decimal]:
+    """Splits amount into count parts, equal ones unless weights are given."""
+    parts = split_cents(to_cents(amount), weights or [1] * count)
+    return [from_cents(part) for part in parts]
+
+
+def split_equally(amount: decimal.Decimal, count: int) -> Tuple[decimal.Decimal, int]:
+    """Returns the smallest part and how many first parts are one cent bigger.
+
+    The parts are the ones split() returns for equal weights, without building the list.
+    """
+    smallest, bigger_count = divmod(to_cents(amount), count)
+    return from_cents(smallest), bigger_count
+
+
+def group_by_amount(
+    amounts: Dict[int, decimal.Decimal],
+) -> Dict[decimal.Decimal, List[int]]:
+    """Groups account ids by the amount they receive.
+
+    An equal split has at most two distinct amounts, so an UPDATE built from the groups
+    needs at most two CASE branches whatever the number of recipients.
+    """
+    groups: Dict[decimal.Decimal, List[int]] = defaultdict(list)
+    for account_id, amount in amounts.items():
+        groups[amount].append(account_id)
+    return groups
@@ -0,0 +1,44 @@
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from accounts.constants import ESTIMATED_COUNT_THRESHOLD
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Returns the number of rows the PostgreSQL planner expects the queryset to return.
+
+    The estimate comes from the table statistics, so it costs no scan, but it is only as
+    fresh as the last ANALYZE. None on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.select_related(None).order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts a queryset exactly only when it is small.
+
+    An exact COUNT(*) reads every matching row, which takes seconds on a table of millions
+    of rows. Above the threshold the planner estimate is shown instead, so the number of
+    pages is approximate and the last ones may be empty.
+    """
+
+    threshold = ESTIMATED_COUNT_THRESHOLD
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+        return super().count
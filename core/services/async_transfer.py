@@ -0,0 +1,93 @@
+"""Transfers for async views.
+
+Every query of the async view runs in a bounded pool of threads, each holding its own
+database connection, so the number of connections does not grow with the number of
+requests in flight. The checks that need no locks run first with a single query, so
+a transfer bound to fail is rejected without taking a row lock. The transfer itself
+stays atomic and synchronous.
+"""
+
+import asyncio
+import decimal
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+
+from asgiref.sync import sync_to_async
+
+from accounts.models import Account, Transfer, User
+from core.services.group_commit import get_committer
+from core.services.hot_accounts import is_balance_complete
+from core.services.transfer_money import Service as TransferService
+
+
+T = TypeVar("T")
+
+
+@functools.cache
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.TRANSFER_THREADS, thread_name_prefix="transfer"
+    )
+
+
+def _call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # pool threads do not serve requests, so nothing else recycles their connections
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Calls a function querying the database in a thread of the bounded pool."""
+    return await sync_to_async(_call, thread_sensitive=False, executor=get_executor())(
+        func, *args, **kwargs
+    )
+
+
+class Service:
+    def __init__(
+        self,
+        sender: User,
+        amount: decimal.Decimal,
+        recipients: List[str],
+        idempotency_key: Optional[str] = None,
+        weights: Optional[Sequence[int]] = None,
+    ):
+        self.service = TransferService(
+            sender, amount, recipients, idempotency_key, weights
+        )
+
+    def _check_accounts(self) -> None:
+        accounts = {
+            account.tin: account
+            for account in Account.objects.filter(
+                Q(pk=self.service.sender.pk) | Q(tin__in=self.service.recipients)
+            ).only("pk", "tin", "balance", "is_hot_account")
+        }
+        sender = self.service._get_sender(accounts)
+        if is_balance_complete(sender):
+            self.service._validate_transfer_amount(sender)
+        self.service._validate_recipients(accounts)
+
+    async def check(self) -> None:
+        """Rejects a transfer that would fail, the transfer checks everything again under locks."""
+        self.service._validate_amount_per_recipient()
+        await run_in_pool(self._check_accounts)
+
+    async def transfer(self) -> Transfer:
+        await self.check()
+        if settings.TRANSFER_GROUP_COMMIT:
+            # the committer thread applies it, the pool is not needed to wait
+            return await asyncio.wrap_future(get_committer().submit(self.service))
+        return await run_in_pool(self.service.transfer)
+
+    @property
+    def retries(self) -> int:
+        return self.service.retries
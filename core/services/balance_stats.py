@@ -0,0 +1,184 @@
+"""Balance statistics of the admin dashboard, served from summary tables.
+
+Transfers record the accounts that have crossed a bucket edge, which is all they can change:
+the total of the balances stays the same. refresh_balance_stats() recounts everything from
+the accounts every few minutes, which folds the recorded moves in and corrects whatever
+has changed outside the services.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.utils import timezone
+
+from accounts.constants import BALANCE_BUCKET_EDGES, TOP_ACCOUNTS_COUNT, ZERO_DECIMAL
+from accounts.models import Account, BalanceBucket, BalanceBucketChange, BalanceShard, BalanceSummary
+from core.db import atomic_with_retry, set_repeatable_read
+
+
+BUCKETS = range(len(BALANCE_BUCKET_EDGES) + 1)
+
+
+def get_bucket(balance: Decimal) -> int:
+    return bisect_right(BALANCE_BUCKET_EDGES, balance)
+
+
+def get_bucket_label(bucket: int) -> str:
+    if bucket == 0:
+        return f"< {BALANCE_BUCKET_EDGES[0]:,}"
+    if bucket == len(BALANCE_BUCKET_EDGES):
+        return f">= {BALANCE_BUCKET_EDGES[-1]:,}"
+    return f"{BALANCE_BUCKET_EDGES[bucket - 1]:,} - {BALANCE_BUCKET_EDGES[bucket]:,}"
+
+
+def record_balance_moves(balances: Iterable[Tuple[Decimal, Decimal]]) -> None:
+    """Records the buckets accounts have left and entered, given their (old, new) balances.
+
+    Most transfers move no account across an edge and cost no query. Hot accounts are left
+    out by the callers: credits to their shards are not recorded either, so they are left
+    to the refresh of the statistics, which reads their shards.
+    """
+    deltas: Counter = Counter()
+    for old_balance, new_balance in balances:
+        old_bucket, new_bucket = get_bucket(old_balance), get_bucket(new_balance)
+        if old_bucket != new_bucket:
+            deltas[old_bucket] -= 1
+            deltas[new_bucket] += 1
+
+    changes = [
+        BalanceBucketChange(bucket=bucket, accounts_delta=delta)
+        for bucket, delta in sorted(deltas.items())
+        if delta
+    ]
+    if changes:
+        BalanceBucketChange.objects.bulk_create(changes)
+
+
+def get_bucket_counts() -> Dict[int, int]:
+    """Returns the number of accounts per bucket: the last refresh plus the moves recorded since."""
+    counts = dict.fromkeys(BUCKETS, 0)
+    counts.update(BalanceBucket.objects.values_list("bucket", "accounts_count"))
+    moves = BalanceBucketChange.objects.values("bucket").annotate(
+        delta=Sum("accounts_delta")
+    )
+    for move in moves:
+        counts[move["bucket"]] = counts.get(move["bucket"], 0) + move["delta"]
+    return counts
+
+
+def get_balance_stats() -> Dict:
+    summary = BalanceSummary.objects.first() or BalanceSummary()
+    return {
+        "total_balance": summary.total_balance,
+        "accounts_count": summary.accounts_count,
+        "top_accounts": summary.top_accounts,
+        "drift": summary.drift,
+        "refreshed_at": summary.refreshed_at,
+        "buckets": [
+            {"label": get_bucket_label(bucket), "accounts_count": count}
+            for bucket, count in sorted(get_bucket_counts().items())
+        ],
+    }
+
+
+def _count_buckets() -> Tuple[Dict[int, int], Decimal, List[Tuple[str, Decimal]]]:
+    """Counts accounts per bucket and sums all balances.
+
+    Cold accounts are counted and summed by one scan, hot ones by their totals with the shards.
+    """
+    bucket = Case(
+        *(
+            When(balance__lt=edge, then=Value(i))
+            for i, edge in enumerate(BALANCE_BUCKET_EDGES)
+        ),
+        default=Value(len(BALANCE_BUCKET_EDGES)),
+        output_field=IntegerField(),
+    )
+    rows = (
+        Account.objects.filter(is_hot_account=False)
+        .annotate(bucket=bucket)
+        .values("bucket")
+        .annotate(accounts_count=Count("pk"), balance=Sum("balance"))
+        .order_by()
+    )
+    counts = dict.fromkeys(BUCKETS, 0)
+    total_balance = ZERO_DECIMAL
+    for row in rows:
+        counts[row["bucket"]] = row["accounts_count"]
+        total_balance += row["balance"]
+
+    shards_balance = (
+        BalanceShard.objects.filter(account=OuterRef("pk"))
+        .values("account")
+        .annotate(total=Sum("balance"))
+        .values("total")
+    )
+    hot_accounts = [
+        (tin, balance + (shards or ZERO_DECIMAL))
+        for tin, balance, shards in Account.objects.filter(is_hot_account=True)
+        .annotate(shards=Subquery(shards_balance))
+        .values_list("tin", "balance", "shards")
+    ]
+    for _, balance in hot_accounts:
+        counts[get_bucket(balance)] += 1
+        total_balance += balance
+    return counts, total_balance, hot_accounts
+
+
+def _get_top_accounts(hot_accounts: List[Tuple[str, Decimal]]) -> List[Dict]:
+    cold_accounts = Account.objects.filter(is_hot_account=False).order_by("-balance")
+    accounts = sorted(
+        [
+            *cold_accounts.values_list("tin", "balance")[:TOP_ACCOUNTS_COUNT],
+            *hot_accounts,
+        ],
+        key=lambda account: account[1],
+        reverse=True,
+    )
+    return [
+        {"tin": tin, "balance": str(balance)}
+        for tin, balance in accounts[:TOP_ACCOUNTS_COUNT]
+    ]
+
+
+def _refresh() -> int:
+    set_repeatable_read()
+    counts, total_balance, hot_accounts = _count_buckets()
+    expected_counts = get_bucket_counts()
+    drift = sum(abs(counts[bucket] - expected_counts[bucket]) for bucket in BUCKETS)
+
+    # the snapshot has seen exactly the moves of the transfers it counts, only those are deleted
+    BalanceBucketChange.objects.all().delete()
+    BalanceBucket.objects.bulk_create(
+        [
+            BalanceBucket(bucket=bucket, accounts_count=count)
+            for bucket, count in counts.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["bucket"],
+        update_fields=["accounts_count"],
+    )
+    BalanceSummary.objects.update_or_create(
+        pk=1,
+        defaults={
+            "total_balance": total_balance,
+            "accounts_count": sum(counts.values()),
+            "top_accounts": _get_top_accounts(hot_accounts),
+            "drift": drift,
+            "refreshed_at": timezone.now(),
+        },
+    )
+    return drift
+
+
+def refresh_balance_stats() -> int:
+    """Recounts the statistics from the accounts in one snapshot.
+
+    Returns by how much the incremental bucket counts were off, summed over the buckets:
+    accounts created or edited outside the transfer services are counted in a wrong bucket
+    or not at all until then.
+    """
+    return atomic_with_retry(_refresh)
@@ -0,0 +1,86 @@
+import uuid
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from accounts.constants import BALANCE_CACHE_TIMEOUT, ZERO_DECIMAL
+from accounts.models import Account, BalanceShard
+
+
+CACHE_KEY_PREFIX = "balance"
+# bumping the version makes all cached balances stale at once
+CACHE_VERSION_KEY = f"{CACHE_KEY_PREFIX}:version"
+
+
+def get_cache_key(tin: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{tin}"
+
+
+def get_token_cache_key(tin: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{tin}:token"
+
+
+def get_cache_version() -> int:
+    return cache.get_or_set(CACHE_VERSION_KEY, 1, timeout=None)
+
+
+def _change_tokens(tins: Iterable[str]) -> None:
+    cache.set_many(
+        {get_token_cache_key(tin): uuid.uuid4().hex for tin in tins},
+        timeout=None,
+        version=get_cache_version(),
+    )
+
+
+def _invalidate_balances() -> None:
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, timeout=None)
+
+
+def forget_balances(tins: Iterable[str]) -> None:
+    """Forgets the cached balances of accounts changed by the current transaction.
+
+    Every account has a token in the cache, replaced by a new one after the transaction
+    commits. A balance is cached with the token read before the balance, and is served
+    only while the token is the same, so neither a read that has raced the commit nor
+    callbacks of consecutive transactions running in reverse order leave it stale.
+    """
+    tins = list(tins)
+    transaction.on_commit(lambda: _change_tokens(tins))
+
+
+def invalidate_balances() -> None:
+    """Forgets all cached balances, for changes of too many accounts to list."""
+    transaction.on_commit(_invalidate_balances)
+
+
+def get_balance(tin: str) -> Optional[Decimal]:
+    version = get_cache_version()
+    key, token_key = get_cache_key(tin), get_token_cache_key(tin)
+    cached = cache.get_many([key, token_key], version=version)
+    token = cached.get(token_key)
+    if key in cached:
+        cached_token, balance = cached[key]
+        if cached_token == token:
+            return balance
+
+    account = (
+        Account.objects.filter(tin=tin).values_list("pk", "balance", "is_hot_account")
+    ).first()
+    if account is None:
+        return None
+
+    pk, balance, is_hot_account = account
+    if is_hot_account:
+        shards_balance = BalanceShard.objects.filter(account_id=pk).aggregate(
+            total=Sum("balance")
+        )["total"]
+        balance += shards_balance or ZERO_DECIMAL
+
+    cache.set(key, (token, balance), timeout=BALANCE_CACHE_TIMEOUT, version=version)
+    return balance
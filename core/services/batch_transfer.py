@@ -0,0 +1,73 @@
+import decimal
+from typing import List, NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError
+from django.db.models import Q
+
+from accounts.constants import BATCH_TRANSFER_CHUNK_SIZE
+from core.db import atomic_with_retry
+from core.services.locked_transfers import LockedTransfers, lock_accounts
+from core.services.transfer_money import Service as TransferService
+
+
+UNEXPECTED_ERROR_MESSAGE = "Unexpected error occurred. Please, try again"
+
+
+class TransferInstruction(NamedTuple):
+    index: int
+    sender: str
+    recipients: List[str]
+    amount: decimal.Decimal
+
+
+class TransferResult(NamedTuple):
+    index: int
+    errors: List[str]
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.errors
+
+
+class Service:
+    def __init__(
+        self,
+        instructions: List[TransferInstruction],
+        chunk_size: int = BATCH_TRANSFER_CHUNK_SIZE,
+    ):
+        self.instructions = instructions
+        self.chunk_size = chunk_size
+
+    def _transfer_chunk(self, chunk: List[TransferInstruction]) -> List[TransferResult]:
+        tins = {tin for item in chunk for tin in (item.sender, *item.recipients)}
+        transfers = LockedTransfers(lock_accounts(Q(tin__in=tins)))
+
+        results = []
+        for item in chunk:
+            sender = transfers.accounts.get(item.sender)
+            service = TransferService(sender, item.amount, item.recipients)
+            try:
+                transfers.apply(service, sender)
+            except ValidationError as e:
+                results.append(TransferResult(item.index, e.messages))
+                continue
+            results.append(TransferResult(item.index, []))
+
+        transfers.save()
+        return results
+
+    def transfer(self) -> List[TransferResult]:
+        results = []
+        for start in range(0, len(self.instructions), self.chunk_size):
+            end = start + self.chunk_size
+            chunk = self.instructions[start:end]
+            try:
+                results.extend(atomic_with_retry(lambda: self._transfer_chunk(chunk)))
+            except DatabaseError:
+                # chunks are independent, the ones already applied stay committed
+                results.extend(
+                    TransferResult(item.index, [UNEXPECTED_ERROR_MESSAGE])
+                    for item in chunk
+                )
+        return results
@@ -0,0 +1,212 @@
+"""Group commit: concurrent transfers of a process share one transaction.
+
+A submitted transfer waits up to TRANSFER_GROUP_COMMIT_WINDOW_MS for others, and transfers
+submitted while a group is being applied form the next one. A group is applied like a chunk
+of a batch transfer, by locked_transfers, so it pays for one commit, one WAL flush, instead
+of one per transfer.
+
+A transfer failing validation gets its errors without affecting the others. A group failing
+in the database is applied again one transfer at a time, each in a savepoint of one
+transaction, so a single broken transfer fails alone.
+"""
+
+import decimal
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Q
+
+from accounts.models import IdempotencyKey, Transfer, User
+from core import metrics
+from core.db import Busy, atomic_with_retry, max_bulk_batch_size, set_transaction_timeouts
+from core.services.locked_transfers import LockedTransfers, lock_accounts
+from core.services.transfer_money import Service as TransferService
+
+
+Outcome = Union[Transfer, Exception]
+
+
+class Submission(NamedTuple):
+    service: TransferService
+    future: Future
+
+
+def _get_previous_transfers(services: List[TransferService]) -> Dict[tuple, Transfer]:
+    keyed = [service for service in services if service.idempotency_key]
+    if not keyed:
+        return {}
+
+    keys = IdempotencyKey.objects.filter(
+        sender_id__in={service.sender.pk for service in keyed},
+        key__in={service.idempotency_key for service in keyed},
+    ).select_related("transfer")
+    return {(key.sender_id, key.key): key.transfer for key in keys}
+
+
+def _apply_together(services: List[TransferService]) -> List[Outcome]:
+    set_transaction_timeouts(
+        settings.TRANSFER_LOCK_TIMEOUT_MS, settings.TRANSFER_STATEMENT_TIMEOUT_MS
+    )
+    tins = {tin for service in services for tin in service.recipients}
+    transfers = LockedTransfers(
+        lock_accounts(
+            Q(pk__in={service.sender.pk for service in services}) | Q(tin__in=tins)
+        )
+    )
+    accounts_by_pk = {account.pk: account for account in transfers.accounts.values()}
+    # a retried request gets the result of the first one, even from the same group
+    transfers_by_key = _get_previous_transfers(services)
+
+    outcomes: List[Outcome] = []
+    idempotency_keys = []
+    for service in services:
+        key = (service.sender.pk, service.idempotency_key)
+        if service.idempotency_key and key in transfers_by_key:
+            outcomes.append(transfers_by_key[key])
+            continue
+
+        try:
+            transfer = transfers.apply(service, accounts_by_pk.get(service.sender.pk))
+        except ValidationError as e:
+            outcomes.append(e)
+            continue
+
+        if service.idempotency_key:
+            transfers_by_key[key] = transfer
+            idempotency_keys.append(
+                IdempotencyKey(
+                    sender_id=service.sender.pk,
+                    key=service.idempotency_key,
+                    transfer=transfer,
+                )
+            )
+        outcomes.append(transfer)
+
+    if not transfers.transfers:
+        return outcomes
+
+    transfers.save()
+    IdempotencyKey.objects.bulk_create(
+        idempotency_keys, batch_size=max_bulk_batch_size(IdempotencyKey)
+    )
+    return outcomes
+
+
+def _apply_one_by_one(services: List[TransferService]) -> List[Outcome]:
+    outcomes: List[Outcome] = []
+    with transaction.atomic():
+        for service in services:
+            try:
+                # inside the transaction every transfer runs in a savepoint of its own
+                outcomes.append(service.transfer())
+            except (ValidationError, DatabaseError, Busy) as e:
+                outcomes.append(e)
+    return outcomes
+
+
+def apply_group(services: List[TransferService]) -> List[Outcome]:
+    """Applies the transfers in one transaction and returns the transfer or the error of each."""
+    try:
+        outcomes = atomic_with_retry(lambda: _apply_together(services))
+        mode = "together"
+    except DatabaseError:
+        outcomes = _apply_one_by_one(services)
+        mode = "one_by_one"
+    metrics.increment("transfer_groups_total", mode=mode)
+    metrics.increment("transfer_grouped_total", len(services))
+    return outcomes
+
+
+class GroupCommitter:
+    """Thread applying the transfers submitted by all threads of the process in groups."""
+
+    def __init__(self, window_seconds: float, max_size: int):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self.submissions: queue.SimpleQueue = queue.SimpleQueue()
+        self.groups_count = 0
+        self.thread = threading.Thread(
+            target=self._run, name="group-commit", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, service: TransferService) -> Future:
+        future: Future = Future()
+        self.submissions.put(Submission(service, future))
+        return future
+
+    def _collect(self) -> List[Submission]:
+        group = [self.submissions.get()]
+        deadline = time.monotonic() + self.window_seconds
+        while len(group) < self.max_size:
+            try:
+                group.append(
+                    self.submissions.get(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except queue.Empty:
+                break
+        return group
+
+    def _apply(self, group: List[Submission]) -> None:
+        # the thread serves no requests, so nothing else recycles its connection
+        close_old_connections()
+        try:
+            outcomes = apply_group([submission.service for submission in group])
+        except Exception as e:
+            # the transaction is rolled back, none of the transfers has been applied
+            outcomes = [e] * len(group)
+        finally:
+            close_old_connections()
+        self.groups_count += 1
+
+        # callers learn their outcomes only once the group is committed
+        for submission, outcome in zip(group, outcomes):
+            if isinstance(outcome, Exception):
+                submission.future.set_exception(outcome)
+            else:
+                submission.future.set_result(outcome)
+
+    def _run(self) -> None:
+        while True:
+            self._apply(self._collect())
+
+
+@functools.cache
+def get_committer() -> GroupCommitter:
+    return GroupCommitter(
+        settings.TRANSFER_GROUP_COMMIT_WINDOW_MS / 1000,
+        settings.TRANSFER_GROUP_COMMIT_MAX_SIZE,
+    )
+
+
+class Service:
+    """A transfer applied by the group committer, with the interface of transfer_money.Service."""
+
+    def __init__(
+        self,
+        sender: User,
+        amount: decimal.Decimal,
+        recipients: List[str],
+        idempotency_key: Optional[str] = None,
+        weights: Optional[Sequence[int]] = None,
+    ):
+        self.service = TransferService(
+            sender, amount, recipients, idempotency_key, weights
+        )
+
+    def submit(self) -> Future:
+        return get_committer().submit(self.service)
+
+    def transfer(self) -> Transfer:
+        return self.submit().result()
+
+    @property
+    def retries(self) -> int:
+        return self.service.retries
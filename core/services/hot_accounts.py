@@ -0,0 +1,125 @@
+import random
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+
+from accounts.constants import HOT_ACCOUNT_SHARDS_COUNT, ZERO_DECIMAL
+from accounts.models import Account, BalanceShard
+from core.db import VersionConflict, select_for_key_share
+from core.money import group_by_amount
+
+
+def is_balance_complete(account: Account) -> bool:
+    """Tells whether the balance column of the account holds all of its money.
+
+    Money credited to a hot account waits in its shards until they are collected under
+    the lock of its row, so its balance column may be too low before that.
+    """
+    return not account.is_hot_account
+
+
+def lock_hot_accounts(condition: Q) -> List[Account]:
+    """Locks the hot accounts matching the condition FOR KEY SHARE for the credits to their shards.
+
+    Transfers lock the rows they update FOR NO KEY UPDATE, which does not conflict with
+    this lock, so a credit to a hot account neither waits for other transfers nor makes
+    them wait, whatever the order it locks its rows in. Only disable_hot_account, which
+    locks the row FOR UPDATE, waits for the credits before collecting and deleting the
+    shards. Raises VersionConflict if one of the accounts has been disabled since it was
+    read as hot.
+    """
+    accounts = select_for_key_share(
+        Account.objects.filter(condition)
+        .order_by("pk")
+        .only("pk", "tin", "is_hot_account")
+    )
+    if not all(account.is_hot_account for account in accounts):
+        raise VersionConflict("A hot account has been disabled")
+    return accounts
+
+
+def credit_balance_shards(credits: Dict[int, Decimal]) -> None:
+    """Adds the credits to the balance shards of hot accounts.
+
+    Shards are locked after all account rows of the transaction, a transaction holding
+    a shard and waiting for an account could deadlock with one collecting the shards.
+    """
+    # every transfer picks one random slot, so concurrent credits rarely touch the same row
+    updated = BalanceShard.objects.filter(
+        account_id__in=credits, slot=random.randrange(HOT_ACCOUNT_SHARDS_COUNT)
+    ).update(
+        balance=Case(
+            *(
+                When(account_id__in=account_ids, then=F("balance") + amount)
+                for amount, account_ids in group_by_amount(credits).items()
+            )
+        )
+    )
+    if updated != len(credits):
+        # disable_hot_account has removed the shards, the money would be lost;
+        # the transaction is rolled back and retried, then the account is credited as cold
+        raise VersionConflict("Balance shards have been removed")
+
+
+def collect_balance_shards(accounts: List[Account]) -> None:
+    """Moves money of the balance shards of locked hot accounts into their balance column."""
+    hot_accounts = [account for account in accounts if account.is_hot_account]
+    if not hot_accounts:
+        return
+
+    shards = (
+        BalanceShard.objects.filter(account__in=hot_accounts)
+        .order_by("pk")
+        .select_for_update()
+    )
+    collected: Dict[int, Decimal] = defaultdict(lambda: ZERO_DECIMAL)
+    for shard in shards:
+        collected[shard.account_id] += shard.balance
+
+    collected = {pk: amount for pk, amount in collected.items() if amount}
+    if not collected:
+        return
+
+    BalanceShard.objects.filter(account_id__in=collected).update(balance=ZERO_DECIMAL)
+    Account.objects.filter(pk__in=collected).update(
+        balance=Case(
+            *(
+                When(pk=pk, then=F("balance") + amount)
+                for pk, amount in collected.items()
+            )
+        ),
+        version=F("version") + 1,
+    )
+    for account in hot_accounts:
+        if account.pk in collected:
+            account.balance += collected[account.pk]
+            account.version += 1
+
+
+@transaction.atomic
+def enable_hot_account(account: Account) -> None:
+    account = Account.objects.select_for_update().get(pk=account.pk)
+    if account.is_hot_account:
+        return
+
+    BalanceShard.objects.bulk_create(
+        BalanceShard(account=account, slot=slot)
+        for slot in range(HOT_ACCOUNT_SHARDS_COUNT)
+    )
+    account.is_hot_account = True
+    account.save(update_fields=["is_hot_account"])
+
+
+@transaction.atomic
+def disable_hot_account(account: Account) -> None:
+    account = Account.objects.select_for_update().get(pk=account.pk)
+    if not account.is_hot_account:
+        return
+
+    collect_balance_shards([account])
+    account.balance_shards.all().delete()
+    account.is_hot_account = False
+    account.save(update_fields=["is_hot_account"])
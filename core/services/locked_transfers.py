@@ -0,0 +1,94 @@
+"""Transfers applied together to accounts locked by one SELECT, as batch transfers and group commit do.
+
+Every transfer is validated against the balances left by the previous ones and applied in memory,
+then the net balances are written by one UPDATE and the transfers and their ledger entries by
+one INSERT each.
+"""
+
+from typing import Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from accounts.models import Account, LedgerEntry, Transfer
+from core.db import max_bulk_batch_size, max_bulk_update_batch_size
+from core.services.balance_stats import record_balance_moves
+from core.services.balances import forget_balances
+from core.services.hot_accounts import collect_balance_shards
+from core.services.transfer_money import Service as TransferService
+
+
+def lock_accounts(condition: Q) -> Dict[str, Account]:
+    """Locks the accounts matching the condition in primary key order and returns them by tin.
+
+    Every row is locked, hot ones too, so the shards of hot accounts are collected into
+    their rows and hot accounts are debited and credited directly like the others.
+    """
+    accounts = list(
+        Account.objects.filter(condition)
+        .order_by("pk")
+        .select_for_update(no_key=True)
+        .only("pk", "tin", "balance", "is_hot_account", "version")
+    )
+    collect_balance_shards(accounts)
+    return {account.tin: account for account in accounts}
+
+
+class LockedTransfers:
+    """Transfers applied one after another to the locked accounts, written together by save()."""
+
+    def __init__(self, accounts: Dict[str, Account]):
+        self.accounts = accounts
+        self.old_balances = {
+            account.pk: account.balance for account in accounts.values()
+        }
+        self.changed_accounts: Dict[int, Account] = {}
+        self.transfers: List[Transfer] = []
+        self.ledger_entries: List[LedgerEntry] = []
+
+    def apply(self, service: TransferService, sender: Optional[Account]) -> Transfer:
+        """Validates the transfer and moves its money between the accounts in memory.
+
+        Raises ValidationError, leaving the accounts as they are, if the transfer is invalid.
+        """
+        if sender is None:
+            raise ValidationError("Sender does not exist")
+        service.validate(sender, self.accounts)
+
+        sender.balance -= service.debit
+        self.changed_accounts[sender.pk] = sender
+        recipient_ids = []
+        for tin, share in zip(service.recipients, service.shares):
+            recipient = self.accounts[tin]
+            recipient.balance += share
+            self.changed_accounts[recipient.pk] = recipient
+            recipient_ids.append(recipient.pk)
+
+        transfer = Transfer(sender_id=sender.pk, amount=service.debit)
+        self.transfers.append(transfer)
+        self.ledger_entries.extend(
+            service.build_ledger_entries(transfer, sender, recipient_ids)
+        )
+        return transfer
+
+    def save(self) -> None:
+        """Writes the balances and inserts the transfers applied so far."""
+        changed_accounts = self.changed_accounts.values()
+        for account in changed_accounts:
+            account.version += 1
+        fields = ["balance", "version"]
+        Account.objects.bulk_update(
+            changed_accounts, fields, batch_size=max_bulk_update_batch_size(fields)
+        )
+        record_balance_moves(
+            (self.old_balances[account.pk], account.balance)
+            for account in changed_accounts
+            if not account.is_hot_account
+        )
+        forget_balances(account.tin for account in changed_accounts)
+        Transfer.objects.bulk_create(
+            self.transfers, batch_size=max_bulk_batch_size(Transfer)
+        )
+        LedgerEntry.objects.bulk_create(
+            self.ledger_entries, batch_size=max_bulk_batch_size(LedgerEntry)
+        )
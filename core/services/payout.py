@@ -0,0 +1,241 @@
+import decimal
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, F, Q, When
+
+from accounts.constants import MAX_TRANSFER_AMOUNT_PER_RECIPIENT, PAYOUT_CHUNK_SIZE, ZERO_DECIMAL
+from accounts.models import Account, LedgerEntry, Transfer, User
+from core import money
+from core.db import atomic_with_retry, max_bulk_batch_size
+from core.services.balance_stats import record_balance_moves
+from core.services.balances import invalidate_balances
+from core.services.hot_accounts import (
+    collect_balance_shards,
+    credit_balance_shards,
+    is_balance_complete,
+    lock_hot_accounts,
+)
+
+
+# longest list of TINs an error message names
+MAX_REPORTED_TINS_COUNT = 10
+
+
+def format_tins(tins: Iterable[str]) -> str:
+    tins = sorted(tins)
+    message = ", ".join(tins[:MAX_REPORTED_TINS_COUNT])
+    if len(tins) > MAX_REPORTED_TINS_COUNT:
+        message += f" and {len(tins) - MAX_REPORTED_TINS_COUNT} more"
+    return message
+
+
+class Service:
+    """Splits the amount equally between a large number of recipients.
+
+    recipients is read chunk by chunk and only the ids of the recipients are kept, so memory
+    grows by a few bytes per recipient. It is read again if the transfer is retried, so it
+    must be re-iterable (a list or an accounts.forms.RecipientsFile).
+
+    The sender and the recipients are locked chunk by chunk in primary key order, the order
+    every transfer locks its rows in, so a payout does not deadlock with them.
+    """
+
+    def __init__(
+        self,
+        sender: User,
+        amount: decimal.Decimal,
+        recipients: Iterable[str],
+        recipients_count: int,
+        chunk_size: int = PAYOUT_CHUNK_SIZE,
+    ):
+        self.sender = sender
+        self.amount = amount
+        self.recipients = recipients
+        self.recipients_count = recipients_count
+        self.chunk_size = chunk_size
+        self.share, self.bigger_shares_count = money.split_equally(
+            amount, recipients_count
+        )
+        self.debit = (
+            self.share * recipients_count + money.CENT * self.bigger_shares_count
+        )
+        self.retries = 0
+
+    def get_share(self, position: int) -> decimal.Decimal:
+        if position < self.bigger_shares_count:
+            return self.share + money.CENT
+        return self.share
+
+    def _validate_shares(self) -> None:
+        if self.share == ZERO_DECIMAL:
+            raise ValidationError("The amount is too small")
+
+        if self.get_share(0) > MAX_TRANSFER_AMOUNT_PER_RECIPIENT:
+            raise ValidationError("The amount per recipient is too big")
+
+    def _validate_amount(self, sender: Account) -> None:
+        if sender.balance < self.debit:
+            raise ValidationError("User doesn't have enough money")
+
+    def _check_sender(self) -> None:
+        # rejects a payout bound to fail before its recipients are read,
+        # the balance is checked again once the sender is locked
+        sender = (
+            Account.objects.filter(pk=self.sender.pk)
+            .only("pk", "balance", "is_hot_account")
+            .first()
+        )
+        if sender is None:
+            raise ValidationError("Sender does not exist")
+
+        if is_balance_complete(sender):
+            self._validate_amount(sender)
+
+    def _chunks(self) -> Iterator[List[str]]:
+        recipients = iter(self.recipients)
+        while chunk := list(islice(recipients, self.chunk_size)):
+            yield chunk
+
+    def _resolve_chunk(self, tins: List[str]) -> List[int]:
+        if len(set(tins)) != len(tins):
+            raise ValidationError("Tin cannot be repeated")
+
+        if self.sender.tin in tins:
+            raise ValidationError("User cannot send money to himself")
+
+        ids = dict(Account.objects.filter(tin__in=tins).values_list("tin", "pk"))
+        nonexistent_tins = set(tins) - ids.keys()
+        if nonexistent_tins:
+            raise ValidationError(f"Tin not found: {format_tins(nonexistent_tins)}")
+
+        return list(ids.values())
+
+    def _resolve_recipients(self) -> List[int]:
+        """Returns the ids of the recipients in primary key order."""
+        recipient_ids = []
+        for tins in self._chunks():
+            recipient_ids.extend(self._resolve_chunk(tins))
+
+        if len(recipient_ids) != self.recipients_count:
+            raise ValidationError("The number of recipients has changed")
+
+        # a TIN repeated in different chunks
+        if len(set(recipient_ids)) != len(recipient_ids):
+            raise ValidationError("Tin cannot be repeated")
+
+        return sorted(recipient_ids)
+
+    def _lock_chunk(
+        self, recipient_ids: List[int], sender_id: Optional[int]
+    ) -> Dict[int, Account]:
+        # the sender is locked by the same statement as the recipients next to it in pk order
+        accounts = (
+            Account.objects.filter(
+                Q(pk__in=recipient_ids, is_hot_account=False) | Q(pk=sender_id)
+            )
+            .order_by("pk")
+            .select_for_update(no_key=True)
+            .only("pk", "tin", "balance", "is_hot_account", "version")
+        )
+        accounts = {account.pk: account for account in accounts}
+
+        unlocked_ids = set(recipient_ids) - accounts.keys()
+        if unlocked_ids:
+            accounts.update(
+                (account.pk, account)
+                for account in lock_hot_accounts(Q(pk__in=unlocked_ids))
+            )
+
+        # an account deleted since the recipients were read
+        if not accounts.keys() >= set(recipient_ids):
+            raise ValidationError("The number of recipients has changed")
+
+        return accounts
+
+    def _credit_chunk(
+        self,
+        transfer: Transfer,
+        accounts: Dict[int, Account],
+        position: int,
+        recipient_ids: List[int],
+    ) -> Dict[int, decimal.Decimal]:
+        """Credits the cold recipients of the chunk, returns the credits of the hot ones."""
+        credits = {
+            pk: self.get_share(position + i) for i, pk in enumerate(recipient_ids)
+        }
+        hot_ids = {pk for pk in recipient_ids if accounts[pk].is_hot_account}
+        cold_credits = {
+            pk: amount for pk, amount in credits.items() if pk not in hot_ids
+        }
+        if cold_credits:
+            Account.objects.filter(pk__in=cold_credits).update(
+                balance=Case(
+                    *(
+                        When(pk__in=pks, then=F("balance") + amount)
+                        for amount, pks in money.group_by_amount(cold_credits).items()
+                    )
+                ),
+                version=F("version") + 1,
+            )
+            record_balance_moves(
+                (accounts[pk].balance, accounts[pk].balance + amount)
+                for pk, amount in cold_credits.items()
+            )
+
+        LedgerEntry.objects.bulk_create(
+            (
+                LedgerEntry(transfer=transfer, account_id=pk, amount=amount)
+                for pk, amount in credits.items()
+            ),
+            batch_size=max_bulk_batch_size(LedgerEntry),
+        )
+        return {pk: amount for pk, amount in credits.items() if pk in hot_ids}
+
+    def _on_retry(self, exc: Exception) -> None:
+        self.retries += 1
+
+    def transfer(self) -> Transfer:
+        self._validate_shares()
+        return atomic_with_retry(self._transfer, on_retry=self._on_retry)
+
+    def _transfer(self) -> Transfer:
+        self._check_sender()
+        recipient_ids = self._resolve_recipients()
+        transfer = Transfer.objects.create(sender_id=self.sender.pk, amount=self.debit)
+
+        sender = None
+        hot_credits: Dict[int, decimal.Decimal] = {}
+        for position in range(0, len(recipient_ids), self.chunk_size):
+            end = position + self.chunk_size
+            chunk = recipient_ids[position:end]
+            is_last_chunk = end >= len(recipient_ids)
+            lock_sender = sender is None and (
+                chunk[-1] > self.sender.pk or is_last_chunk
+            )
+            accounts = self._lock_chunk(chunk, self.sender.pk if lock_sender else None)
+            if lock_sender:
+                sender = accounts.get(self.sender.pk)
+                if sender is None:
+                    raise ValidationError("Sender does not exist")
+
+            hot_credits.update(self._credit_chunk(transfer, accounts, position, chunk))
+
+        # shards are locked once every account row is
+        collect_balance_shards([sender])
+        self._validate_amount(sender)
+        if hot_credits:
+            credit_balance_shards(hot_credits)
+
+        Account.objects.filter(pk=sender.pk).update(
+            balance=F("balance") - self.debit, version=F("version") + 1
+        )
+        if not sender.is_hot_account:
+            record_balance_moves([(sender.balance, sender.balance - self.debit)])
+        # listing every recipient would keep all of them in memory until commit
+        invalidate_balances()
+        LedgerEntry.objects.create(
+            transfer=transfer, account_id=sender.pk, amount=-self.debit
+        )
+        return transfer
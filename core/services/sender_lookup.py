@@ -0,0 +1,54 @@
+from typing import Dict, List
+from urllib.parse import quote
+
+from django.core.cache import cache
+
+from accounts.constants import (
+    SENDER_LOOKUP_CACHE_TIMEOUT,
+    SENDER_LOOKUP_MAX_QUERY_LENGTH,
+    SENDER_LOOKUP_MIN_QUERY_LENGTH,
+    SENDER_LOOKUP_RESULTS_COUNT,
+)
+from accounts.models import User
+
+
+CACHE_KEY_PREFIX = "sender-lookup"
+# bumping the version makes all cached results stale at once
+CACHE_VERSION_KEY = f"{CACHE_KEY_PREFIX}:version"
+
+
+def invalidate_sender_lookup() -> None:
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 1, timeout=None)
+
+
+def find_senders(query: str) -> List[Dict]:
+    query = query.strip()[:SENDER_LOOKUP_MAX_QUERY_LENGTH]
+    if len(query) < SENDER_LOOKUP_MIN_QUERY_LENGTH:
+        return []
+
+    version = cache.get_or_set(CACHE_VERSION_KEY, 1, timeout=None)
+    cache_key = f"{CACHE_KEY_PREFIX}:{quote(query.upper())}"
+    senders = cache.get(cache_key, version=version)
+    if senders is not None:
+        return senders
+
+    # both lookups are served by prefix indexes
+    if query.isdigit():
+        users = User.objects.filter(tin__startswith=query).order_by("tin")
+    else:
+        users = User.objects.filter(last_name__istartswith=query).order_by("pk")
+
+    senders = [
+        {
+            "id": user["pk"],
+            "text": f"{user['last_name']} {user['first_name']} ({user['tin']})",
+        }
+        for user in users.values("pk", "tin", "first_name", "last_name")[
+            :SENDER_LOOKUP_RESULTS_COUNT
+        ]
+    ]
+    cache.set(cache_key, senders, timeout=SENDER_LOOKUP_CACHE_TIMEOUT, version=version)
+    return senders
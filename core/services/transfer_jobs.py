@@ -0,0 +1,75 @@
+import decimal
+import logging
+from typing import List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from accounts.models import TransferJob, User
+from core.db import Busy, atomic_with_retry, is_retryable_error
+from core.services.batch_transfer import UNEXPECTED_ERROR_MESSAGE
+from core.services.transfer_money import Service as TransferService
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_transfer(
+    sender: User,
+    amount: decimal.Decimal,
+    recipients: List[str],
+    idempotency_key: Optional[str] = None,
+) -> TransferJob:
+    return TransferJob.objects.create(
+        sender=sender,
+        amount=amount,
+        recipients=recipients,
+        idempotency_key=idempotency_key,
+    )
+
+
+def _process_next_job() -> Optional[TransferJob]:
+    # SKIP LOCKED lets every worker take a different job without waiting for the others;
+    # the job stays locked until its transfer commits, so a crashed worker leaves it pending
+    job = (
+        TransferJob.objects.filter(status=TransferJob.Status.PENDING)
+        .select_related("sender")
+        .select_for_update(skip_locked=True, of=("self",))
+        .order_by("pk")
+        .first()
+    )
+    if job is None:
+        return None
+
+    try:
+        # a failed transfer is rolled back to the savepoint, the job can still be saved
+        with transaction.atomic():
+            job.transfer = TransferService(
+                job.sender, job.amount, job.recipients, job.idempotency_key
+            ).transfer()
+        job.status = TransferJob.Status.SUCCEEDED
+    except ValidationError as e:
+        job.status = TransferJob.Status.FAILED
+        job.errors = e.messages
+    except Exception as e:
+        if is_retryable_error(e) or isinstance(e, Busy):
+            # the job is rolled back with its transaction and stays pending
+            raise
+        # the job would fail the same way every time it is taken again
+        logger.exception("Transfer job %s failed", job.pk)
+        job.status = TransferJob.Status.FAILED
+        job.errors = [UNEXPECTED_ERROR_MESSAGE]
+
+    job.save(update_fields=["transfer", "status", "errors", "updated_at"])
+    return job
+
+
+def process_next_job() -> Optional[TransferJob]:
+    """Applies the oldest pending job, returns None if there is none.
+
+    The transfer runs inside the transaction holding the job, where it cannot retry
+    a deadlock itself, so the whole job is retried instead. Raises Busy when the transfer
+    has timed out waiting for a lock, and VersionConflict when it keeps losing the race
+    for the sender; the job stays pending in both cases.
+    """
+    return atomic_with_retry(_process_next_job)
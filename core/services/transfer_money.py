@@ -1,64 +1,324 @@
 import decimal
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
-from django.db.models import F
+from django.db import IntegrityError, OperationalError
+from django.db.models import Case, F, Q, When
 
-from accounts.constants import MAX_TRANSFER_AMOUNT_PER_RECIPIENT, ZERO_DECIMAL
-from accounts.models import User
+from accounts.constants import (
+    MAX_OPTIMISTIC_TRANSFER_RETRIES,
+    MAX_TRANSFER_AMOUNT_PER_RECIPIENT,
+    MAX_TRANSFER_RETRIES,
+    ZERO_DECIMAL,
+)
+from accounts.models import Account, IdempotencyKey, LedgerEntry, Transfer, User
+from core import metrics, money
+from core.db import (
+    LOCK_NOT_AVAILABLE,
+    Busy,
+    VersionConflict,
+    atomic_with_retry,
+    get_sqlstate,
+    is_timeout_error,
+    set_transaction_timeouts,
+    update_returning,
+)
+from core.services.balance_stats import record_balance_moves
+from core.services.balances import forget_balances
+from core.services.hot_accounts import collect_balance_shards, credit_balance_shards, lock_hot_accounts
+
+
+PHASE_SECONDS = "transfer_phase_seconds"
 
 
 class Service:
-    def __init__(self, sender: User, amount: decimal.Decimal, recipients: List[str]):
+    def __init__(
+        self,
+        sender: User,
+        amount: decimal.Decimal,
+        recipients: List[str],
+        idempotency_key: Optional[str] = None,
+        weights: Optional[Sequence[int]] = None,
+        optimistic: Optional[bool] = None,
+    ):
         self.sender = sender
         self.amount = amount
         self.recipients = recipients
-        self.amount_per_recipient = self.calculate_amount_per_recipient()
-
-    def calculate_amount_per_recipient(self) -> decimal.Decimal:
-        return (self.amount / len(self.recipients)).quantize(
-            ZERO_DECIMAL, rounding=decimal.ROUND_DOWN
+        self.idempotency_key = idempotency_key
+        self.weights = weights
+        self.optimistic = (
+            settings.TRANSFER_OPTIMISTIC if optimistic is None else optimistic
         )
+        self.shares = self.calculate_shares()
+        self.debit = sum(self.shares, ZERO_DECIMAL)
+        self.retries = 0
 
-    def _validate_transfer_amount(self) -> None:
-        if self.sender.balance < self.amount:
+    def _has_valid_weights(self) -> bool:
+        if self.weights is None:
+            return True
+        if len(self.weights) != len(self.recipients):
+            return False
+        return all(weight > 0 for weight in self.weights)
+
+    def calculate_shares(self) -> List[decimal.Decimal]:
+        # the whole amount is distributed, cents left by the division go to the recipients
+        # with the largest remainders
+        if not self._has_valid_weights():
+            return []
+        return money.split(self.amount, len(self.recipients), self.weights)
+
+    @metrics.timed(PHASE_SECONDS, phase="validate_transfer_amount")
+    def _validate_transfer_amount(self, sender: Account) -> None:
+        if sender.balance < self.amount:
             raise ValidationError("User doesn't have enough money")
 
+    @metrics.timed(PHASE_SECONDS, phase="validate_amount_per_recipient")
     def _validate_amount_per_recipient(self) -> None:
-        if self.amount_per_recipient == ZERO_DECIMAL:
+        if not self.shares:
+            raise ValidationError("Every recipient must have a positive weight")
+
+        if min(self.shares) == ZERO_DECIMAL:
             raise ValidationError("The amount is too small")
 
-        if self.amount_per_recipient > MAX_TRANSFER_AMOUNT_PER_RECIPIENT:
+        if max(self.shares) > MAX_TRANSFER_AMOUNT_PER_RECIPIENT:
             raise ValidationError("The amount per recipient is too big")
 
-    def _validate_recipients(self) -> None:
-        accounts = User.objects.filter(tin__in=self.recipients)
-        if accounts.count() != len(self.recipients):
-            nonexistent_tins = set(self.recipients) - set(
-                accounts.values_list("tin", flat=True)
-            )
+    @metrics.timed(PHASE_SECONDS, phase="validate_recipients")
+    def _validate_recipients(self, accounts: Dict[str, Account]) -> None:
+        nonexistent_tins = set(self.recipients) - accounts.keys()
+        if nonexistent_tins:
             raise ValidationError(
                 f"Tin not found: {', '.join(sorted(nonexistent_tins))}"
             )
 
-    def _validate_transfer(self) -> None:
-        self._validate_transfer_amount()
-        self._validate_recipients()
+    def _fetch_accounts(self, lock: bool) -> Dict[str, Account]:
+        accounts = (
+            Account.objects.filter(
+                Q(pk=self.sender.pk) | Q(tin__in=self.recipients, is_hot_account=False)
+            )
+            .order_by("pk")
+            .only("pk", "tin", "balance", "is_hot_account", "version")
+        )
+        if lock:
+            accounts = accounts.select_for_update(no_key=True)
+        accounts = {account.tin: account for account in accounts}
+
+        # hot recipients are credited through balance shards, their rows are key-share locked;
+        # an optimistic transfer relies on credit_balance_shards noticing removed shards
+        unlocked_tins = set(self.recipients) - accounts.keys()
+        if unlocked_tins:
+            if lock:
+                hot_accounts = lock_hot_accounts(Q(tin__in=unlocked_tins))
+            else:
+                hot_accounts = Account.objects.filter(
+                    tin__in=unlocked_tins, is_hot_account=True
+                ).only("pk", "tin", "is_hot_account")
+            accounts.update((account.tin, account) for account in hot_accounts)
+
+        return accounts
+
+    @metrics.timed(PHASE_SECONDS, phase="lock")
+    def _lock_accounts(self) -> Dict[str, Account]:
+        # a single SELECT ... FOR NO KEY UPDATE fetches and locks the sender and the cold
+        # recipients in primary key order, the order every transfer locks the rows it updates in,
+        # so concurrent transfers cannot deadlock; see lock_hot_accounts for the hot recipients
+        return self._fetch_accounts(lock=True)
+
+    @metrics.timed(PHASE_SECONDS, phase="read")
+    def _read_accounts(self) -> Dict[str, Account]:
+        return self._fetch_accounts(lock=False)
+
+    def validate(self, sender: Account, accounts: Dict[str, Account]) -> None:
+        self._validate_transfer_amount(sender)
+        self._validate_recipients(accounts)
         self._validate_amount_per_recipient()
 
-    @transaction.atomic
-    def transfer(self) -> None:
-        self._validate_transfer()
+    def sum_credits(self, recipients: List[Account]) -> Dict[int, decimal.Decimal]:
+        credits: Dict[int, decimal.Decimal] = defaultdict(lambda: ZERO_DECIMAL)
+        for recipient, share in zip(recipients, self.shares):
+            credits[recipient.pk] += share
+        return credits
+
+    def build_ledger_entries(
+        self, transfer: Transfer, sender: Account, recipient_ids: List[int]
+    ) -> List[LedgerEntry]:
+        return [
+            LedgerEntry(
+                transfer=transfer, account_id=sender.pk, amount=-transfer.amount
+            ),
+            *(
+                LedgerEntry(transfer=transfer, account_id=recipient_id, amount=share)
+                for recipient_id, share in zip(recipient_ids, self.shares)
+            ),
+        ]
+
+    @metrics.timed(PHASE_SECONDS, phase="ledger")
+    def _record_ledger(self, sender: Account, recipient_ids: List[int]) -> Transfer:
+        transfer = Transfer.objects.create(sender_id=sender.pk, amount=self.debit)
+        # all legs of the transfer are written by a single INSERT
+        LedgerEntry.objects.bulk_create(
+            self.build_ledger_entries(transfer, sender, recipient_ids)
+        )
+        return transfer
+
+    def _on_retry(self, exc: Exception) -> None:
+        self.retries += 1
+        metrics.increment("transfer_retries_total")
+
+    def _get_previous_transfer(self) -> Optional[Transfer]:
+        key = (
+            IdempotencyKey.objects.filter(
+                sender_id=self.sender.pk, key=self.idempotency_key
+            )
+            .select_related("transfer")
+            .first()
+        )
+        return key.transfer if key else None
 
-        accounts = User.objects.filter(tin__in=self.recipients).select_for_update()
-        list(accounts)  # cause evaluation, locking the selected rows
-        accounts.update(balance=F("balance") + self.amount_per_recipient)
+    def transfer(self) -> Transfer:
+        with metrics.track("transfer"):
+            try:
+                return self._apply()
+            except OperationalError as e:
+                if not is_timeout_error(e):
+                    raise
+                if get_sqlstate(e) == LOCK_NOT_AVAILABLE:
+                    reason = "lock_timeout"
+                else:
+                    reason = "statement_timeout"
+                metrics.increment("transfer_shed_total", reason=reason)
+                raise Busy("The transfer has timed out") from e
+
+    def _apply(self) -> Transfer:
+        if not self.idempotency_key:
+            return self._transfer_with_retry()
+
+        # a retried request gets the result of the first one without touching the balances
+        previous_transfer = self._get_previous_transfer()
+        if previous_transfer is not None:
+            return previous_transfer
 
         try:
-            sender = User.objects.select_for_update().get(pk=self.sender.pk)
-        except User.DoesNotExist:
+            return self._transfer_with_retry()
+        except IntegrityError:
+            # a concurrent request with the same key has been committed first
+            previous_transfer = self._get_previous_transfer()
+            if previous_transfer is None:
+                raise
+            return previous_transfer
+
+    def _transfer_with_retry(self) -> Transfer:
+        if self.optimistic:
+            transfer = self._transfer_optimistically
+            retries = MAX_OPTIMISTIC_TRANSFER_RETRIES
+        else:
+            transfer = self._transfer
+            retries = MAX_TRANSFER_RETRIES
+
+        def run() -> Transfer:
+            # a transfer waiting for a locked row gives up instead of holding its worker
+            set_transaction_timeouts(
+                settings.TRANSFER_LOCK_TIMEOUT_MS,
+                settings.TRANSFER_STATEMENT_TIMEOUT_MS,
+            )
+            return transfer()
+
+        return atomic_with_retry(run, retries=retries, on_retry=self._on_retry)
+
+    def _get_sender(self, accounts: Dict[str, Account]) -> Account:
+        sender = next(
+            (account for account in accounts.values() if account.pk == self.sender.pk),
+            None,
+        )
+        if sender is None:
             raise ValidationError("Sender does not exist")
+        return sender
+
+    def _transfer(self) -> Transfer:
+        accounts = self._lock_accounts()
+        sender = self._get_sender(accounts)
+
+        with metrics.timer(PHASE_SECONDS, phase="collect_shards"):
+            collect_balance_shards([sender])
+        self.validate(sender, accounts)
+        return self._move_money(sender, accounts)
 
-        sender.balance = F("balance") - self.amount_per_recipient * accounts.count()
-        sender.save()
+    def _transfer_optimistically(self) -> Transfer:
+        """Reads the rows without locking them and debits the sender only if its row
+        still has the version read; a lost race raises VersionConflict and is retried.
+
+        Credits are added to the current balances whatever their version, so only the
+        sender's row can conflict.
+        """
+        accounts = self._read_accounts()
+        sender = self._get_sender(accounts)
+        if sender.is_hot_account:
+            # collecting the shards of a hot sender needs its row locked
+            return self._transfer()
+
+        self.validate(sender, accounts)
+        return self._move_money(sender, accounts, expected_version=sender.version)
+
+    def _move_money(
+        self,
+        sender: Account,
+        accounts: Dict[str, Account],
+        expected_version: Optional[int] = None,
+    ) -> Transfer:
+        # credit every recipient and debit the sender in one UPDATE statement
+        recipients = [accounts[tin] for tin in self.recipients]
+        recipient_ids = [recipient.pk for recipient in recipients]
+        credits = self.sum_credits(recipients)
+        hot_ids = {recipient.pk for recipient in recipients if recipient.is_hot_account}
+        cold_credits = {
+            pk: amount for pk, amount in credits.items() if pk not in hot_ids
+        }
+        if expected_version is None:
+            rows = Account.objects.filter(pk__in=[sender.pk, *cold_credits])
+        else:
+            rows = Account.objects.filter(
+                Q(pk=sender.pk, version=expected_version) | Q(pk__in=cold_credits)
+            )
+        with metrics.timer(PHASE_SECONDS, phase="balance_update"):
+            updated = update_returning(
+                rows,
+                balance=Case(
+                    When(pk=sender.pk, then=F("balance") - self.debit),
+                    *(
+                        When(pk__in=pks, then=F("balance") + amount)
+                        for amount, pks in money.group_by_amount(cold_credits).items()
+                    ),
+                ),
+                version=F("version") + 1,
+            )
+        if len(updated) != len(cold_credits) + 1:
+            # the rows updated so far are rolled back with the transaction
+            raise VersionConflict(f"Account {sender.pk} has been changed")
+
+        hot_credits = {pk: amount for pk, amount in credits.items() if pk in hot_ids}
+        if hot_credits:
+            with metrics.timer(PHASE_SECONDS, phase="hot_credit"):
+                credit_balance_shards(hot_credits)
+
+        # the moves are taken from the balances the UPDATE has written: recipients of an
+        # optimistic transfer are not locked, the balances read before may be stale
+        moves = []
+        for account in updated:
+            if account.pk != sender.pk:
+                moves.append(
+                    (account.balance - cold_credits[account.pk], account.balance)
+                )
+            elif not sender.is_hot_account:
+                moves.append((account.balance + self.debit, account.balance))
+        record_balance_moves(moves)
+
+        forget_balances([sender.tin, *self.recipients])
+
+        transfer = self._record_ledger(sender, recipient_ids)
+        if self.idempotency_key:
+            IdempotencyKey.objects.create(
+                sender_id=sender.pk, key=self.idempotency_key, transfer=transfer
+            )
+        return transfer
@@ -0,0 +1,71 @@
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection, transaction
+
+import pytest
+
+from accounts.models import Account
+from core import metrics
+from core.admission import admit
+from core.db import LOCK_NOT_AVAILABLE, Busy
+from core.services.transfer_money import Service as TransferService
+from core.tests.db_test import make_error
+
+
+def test_transfers_over_the_limit_are_shed(settings, metrics_enabled):
+    settings.TRANSFER_MAX_IN_FLIGHT = 2
+
+    with admit(), admit():
+        with pytest.raises(Busy):
+            with admit():
+                pass
+
+    # released slots are taken again
+    with admit(), admit():
+        pass
+    counters = metrics.registry.counters["transfer_shed_total"]
+    assert counters[(("reason", "in_flight_limit"),)] == 1
+
+
+@pytest.mark.django_db
+def test_lock_timeout_is_reported_as_busy(make_users, metrics_enabled):
+    sender, recipients = make_users(recipients_count=1)
+
+    service = TransferService(sender, Decimal("10"), [recipients[0].tin])
+    with patch.object(service, "_transfer", side_effect=make_error(LOCK_NOT_AVAILABLE)):
+        with pytest.raises(Busy):
+            service.transfer()
+
+    counters = metrics.registry.counters
+    assert counters["transfer_shed_total"][(("reason", "lock_timeout"),)] == 1
+    assert counters["transfer_total"][(("outcome", "busy"),)] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="row locks require PostgreSQL"
+)
+def test_transfer_gives_up_waiting_for_locked_recipient(make_users, settings):
+    settings.TRANSFER_LOCK_TIMEOUT_MS = 100
+    sender, recipients = make_users(recipients_count=1)
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with transaction.atomic():
+            Account.objects.select_for_update().get(pk=recipients[0].pk)
+            locked.set()
+            release.wait(10)
+        connection.close()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    try:
+        locked.wait(10)
+        with pytest.raises(Busy):
+            TransferService(sender, Decimal("10"), [recipients[0].tin]).transfer()
+    finally:
+        release.set()
+        holder.join()
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from core.services.async_transfer import Service as AsyncTransferService
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_check_rejects_unknown_recipients(make_users):
+    sender, recipients = make_users(recipients_count=1)
+
+    service = AsyncTransferService(
+        sender, Decimal("10"), [recipients[0].tin, "1111111111"]
+    )
+    with pytest.raises(ValidationError) as exc_info:
+        async_to_sync(service.check)()
+
+    assert [exc_info.value.message] == ["Tin not found: 1111111111"]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_check_skips_balance_of_hot_sender(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("0"), recipients_count=1)
+    sender.is_hot_account = True
+    sender.save(update_fields=["is_hot_account"])
+
+    # shards of the sender may hold the money, the transfer checks it under the lock
+    async_to_sync(
+        AsyncTransferService(sender, Decimal("10"), [recipients[0].tin]).check
+    )()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_transfer_runs_in_thread_pool(make_users):
+    sender, recipients = make_users(recipients_count=2)
+    sender_balance = sender.balance
+
+    transfer = async_to_sync(
+        AsyncTransferService(
+            sender, Decimal("10"), [recipient.tin for recipient in recipients]
+        ).transfer
+    )()
+
+    sender.refresh_from_db()
+    assert transfer.amount == Decimal("10")
+    assert sender.balance == sender_balance - Decimal("10")
@@ -0,0 +1,143 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from accounts.models import Account, BalanceBucketChange
+from core.services.balance_stats import (
+    get_balance_stats,
+    get_bucket,
+    get_bucket_counts,
+    record_balance_moves,
+    refresh_balance_stats,
+)
+from core.services.batch_transfer import Service as BatchTransferService
+from core.services.batch_transfer import TransferInstruction
+from core.services.hot_accounts import enable_hot_account
+from core.services.payout import Service as PayoutService
+from core.services.transfer_money import Service as TransferService
+
+
+def test_balances_are_bucketed_by_powers_of_ten():
+    assert get_bucket(Decimal("0")) == 0
+    assert get_bucket(Decimal("9.99")) == 0
+    assert get_bucket(Decimal("10")) == 1
+    assert get_bucket(Decimal("999.99")) == 2
+    assert get_bucket(Decimal("1000000")) == 6
+    assert get_bucket(Decimal("99999999")) == 6
+
+
+@pytest.mark.django_db
+def test_refresh_counts_all_accounts(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("5000"), recipients_count=3)
+    enable_hot_account(recipients[2])
+    TransferService(sender, Decimal("5"), [recipients[2].tin]).transfer()
+
+    assert refresh_balance_stats() > 0
+
+    stats = get_balance_stats()
+    assert stats["total_balance"] == Decimal("5030")
+    assert stats["accounts_count"] == 4
+    assert stats["top_accounts"] == [
+        {"tin": sender.tin, "balance": "4995.00"},
+        {"tin": recipients[2].tin, "balance": "25.00"},
+        {"tin": recipients[1].tin, "balance": "10.00"},
+        {"tin": recipients[0].tin, "balance": "0.00"},
+    ]
+    assert get_bucket_counts() == {0: 1, 1: 2, 2: 0, 3: 1, 4: 0, 5: 0, 6: 0}
+    assert stats["buckets"][3]["label"] == "1,000 - 10,000"
+    assert refresh_balance_stats() == 0
+
+
+@pytest.mark.django_db
+def test_transfers_move_accounts_between_buckets_without_refresh(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("1000"), recipients_count=3)
+    refresh_balance_stats()
+
+    TransferService(sender, Decimal("20"), [recipients[0].tin]).transfer()
+    TransferService(
+        sender, Decimal("20"), [recipients[1].tin], optimistic=True
+    ).transfer()
+    BatchTransferService(
+        [TransferInstruction(0, sender.tin, [recipients[2].tin], Decimal("100"))]
+    ).transfer()
+    PayoutService(sender, Decimal("1"), [recipients[0].tin], 1).transfer()
+
+    # the sender has 859, the recipients 21, 30 and 120
+    assert get_bucket_counts() == {0: 0, 1: 2, 2: 2, 3: 0, 4: 0, 5: 0, 6: 0}
+    assert refresh_balance_stats() == 0
+    assert not BalanceBucketChange.objects.exists()
+
+
+@pytest.mark.django_db
+def test_optimistic_transfer_records_moves_from_updated_balances(make_users):
+    sender, (recipient,) = make_users(sender_balance=Decimal("100"), recipients_count=1)
+    refresh_balance_stats()
+
+    transfer_service = TransferService(
+        sender, Decimal("2"), [recipient.tin], optimistic=True
+    )
+    read_accounts = transfer_service._read_accounts
+
+    def read_accounts_then_credit_recipient():
+        accounts = read_accounts()
+        # the recipient is credited after it has been read, its row is not locked
+        Account.objects.filter(pk=recipient.pk).update(balance=Decimal("9"))
+        return accounts
+
+    with mock.patch.object(
+        transfer_service,
+        "_read_accounts",
+        side_effect=read_accounts_then_credit_recipient,
+    ):
+        transfer_service.transfer()
+
+    # the recipient has moved from 9 to 11, not from 0 to 2
+    assert get_bucket_counts() == {0: 0, 1: 2, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}
+    assert refresh_balance_stats() == 0
+
+
+@pytest.mark.django_db
+def test_refresh_corrects_balances_changed_outside_transfers(make_users):
+    sender, _ = make_users(recipients_count=0)
+    refresh_balance_stats()
+
+    Account.objects.filter(pk=sender.pk).update(balance=Decimal("5"))
+
+    assert get_bucket_counts()[0] == 0
+    assert refresh_balance_stats() == 2
+    assert get_bucket_counts()[0] == 1
+    assert get_balance_stats()["total_balance"] == Decimal("5")
+
+
+@pytest.mark.django_db
+def test_moves_within_a_bucket_are_not_recorded(django_assert_num_queries):
+    with django_assert_num_queries(0):
+        record_balance_moves(
+            [(Decimal("20"), Decimal("30")), (Decimal("5"), Decimal("1"))]
+        )
+
+
+@pytest.mark.django_db
+def test_refresh_balance_stats_command(make_users, capsys):
+    make_users(recipients_count=1)
+
+    call_command("refresh_balance_stats")
+
+    assert "Refreshed balance statistics" in capsys.readouterr().out
+    assert get_balance_stats()["accounts_count"] == 2
+
+
+@pytest.mark.django_db
+def test_stats_are_read_without_scanning_accounts(make_users):
+    make_users(recipients_count=3)
+    refresh_balance_stats()
+
+    with CaptureQueriesContext(connection) as queries:
+        get_balance_stats()
+
+    assert not any("accounts_account" in query["sql"] for query in queries)
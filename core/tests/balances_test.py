@@ -0,0 +1,148 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+
+import pytest
+
+from core.services.balances import get_balance
+from core.services.batch_transfer import Service as BatchTransferService
+from core.services.batch_transfer import TransferInstruction
+from core.services.hot_accounts import enable_hot_account
+from core.services.payout import Service as PayoutService
+from core.services.transfer_money import Service as TransferService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_balance_is_read_from_cache(make_users, django_assert_num_queries):
+    sender, _ = make_users(recipients_count=0)
+
+    with django_assert_num_queries(1):
+        assert get_balance(sender.tin) == Decimal("100")
+
+    with django_assert_num_queries(0):
+        assert get_balance(sender.tin) == Decimal("100")
+
+    assert get_balance("2222222222") is None
+
+
+@pytest.mark.django_db
+def test_no_stale_balance_after_committed_transfer(
+    make_users, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    sender, recipients = make_users(recipients_count=2)
+    recipient1, recipient2 = recipients
+    enable_hot_account(recipient2)
+    for account in [sender, recipient1, recipient2]:
+        get_balance(account.tin)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        TransferService(
+            sender, Decimal("20"), [recipient1.tin, recipient2.tin]
+        ).transfer()
+
+    # every balance is read again once, then from the cache
+    assert get_balance(sender.tin) == Decimal("80")
+    assert get_balance(recipient1.tin) == recipient1.balance + Decimal("10")
+    assert get_balance(recipient2.tin) == recipient2.balance + Decimal("10")
+    with django_assert_num_queries(0):
+        assert get_balance(sender.tin) == Decimal("80")
+
+
+@pytest.mark.django_db
+def test_no_stale_balance_when_commit_callbacks_run_in_reverse(
+    make_users, django_capture_on_commit_callbacks
+):
+    sender, (recipient,) = make_users(recipients_count=1)
+    get_balance(sender.tin)
+
+    with django_capture_on_commit_callbacks() as first:
+        TransferService(sender, Decimal("10"), [recipient.tin]).transfer()
+    with django_capture_on_commit_callbacks() as second:
+        TransferService(sender, Decimal("10"), [recipient.tin]).transfer()
+    for callback in [*second, *first]:
+        callback()
+
+    assert get_balance(sender.tin) == Decimal("80")
+
+
+@pytest.mark.django_db
+def test_no_stale_balance_when_transfer_commits_during_read(
+    make_users, django_capture_on_commit_callbacks
+):
+    sender, (recipient,) = make_users(recipients_count=1)
+    transfers = []
+
+    def transfer_after_read(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if not transfers:
+            # the balance has been read, the transfer commits before it is cached
+            transfers.append(TransferService(sender, Decimal("10"), [recipient.tin]))
+            with django_capture_on_commit_callbacks(execute=True):
+                transfers[0].transfer()
+        return result
+
+    with connection.execute_wrapper(transfer_after_read):
+        get_balance(sender.tin)
+
+    assert get_balance(sender.tin) == Decimal("90")
+
+
+@pytest.mark.django_db
+def test_rolled_back_transfer_keeps_cached_balance(
+    make_users, django_capture_on_commit_callbacks
+):
+    sender, recipients = make_users(recipients_count=1)
+    get_balance(sender.tin)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(Exception):
+            TransferService(sender, Decimal("200"), [recipients[0].tin]).transfer()
+
+    assert callbacks == []
+    assert get_balance(sender.tin) == Decimal("100")
+
+
+@pytest.mark.django_db
+def test_no_stale_balance_after_batch_and_payout(
+    make_users, django_capture_on_commit_callbacks
+):
+    sender, recipients = make_users(recipients_count=2)
+    recipient1, recipient2 = recipients
+    for account in [sender, recipient1, recipient2]:
+        get_balance(account.tin)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        BatchTransferService(
+            [TransferInstruction(0, sender.tin, [recipient1.tin], Decimal("10"))]
+        ).transfer()
+
+    assert get_balance(sender.tin) == Decimal("90")
+    assert get_balance(recipient1.tin) == recipient1.balance + Decimal("10")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PayoutService(
+            sender, Decimal("20"), [recipient1.tin, recipient2.tin], 2
+        ).transfer()
+
+    assert get_balance(sender.tin) == Decimal("70")
+    assert get_balance(recipient2.tin) == recipient2.balance + Decimal("10")
+
+
+@pytest.mark.django_db
+def test_balance_edited_in_admin_is_read_again(
+    make_users, django_capture_on_commit_callbacks
+):
+    sender, _ = make_users(recipients_count=0)
+    get_balance(sender.tin)
+
+    sender.balance = Decimal("5")
+    with django_capture_on_commit_callbacks(execute=True):
+        sender.save()
+
+    assert get_balance(sender.tin) == Decimal("5")
@@ -0,0 +1,132 @@
+from decimal import Decimal
+
+import pytest
+
+from accounts.models import LedgerEntry, Transfer
+from core.services.batch_transfer import Service as BatchTransferService
+from core.services.batch_transfer import TransferInstruction
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+def test_batch_transfers_are_applied(make_users, chunk_size):
+    sender, recipients = make_users(sender_balance=Decimal("100"), recipients_count=3)
+    recipient1, recipient2, recipient3 = recipients
+    balances = {user.pk: user.balance for user in [sender, *recipients]}
+
+    instructions = [
+        TransferInstruction(
+            0, sender.tin, [recipient1.tin, recipient2.tin], Decimal("20")
+        ),
+        TransferInstruction(1, recipient2.tin, [recipient3.tin], Decimal("15")),
+        TransferInstruction(2, recipient3.tin, [sender.tin], Decimal("5.55")),
+    ]
+    results = BatchTransferService(instructions, chunk_size=chunk_size).transfer()
+
+    assert [result.index for result in results] == [0, 1, 2]
+    assert all(result.succeeded for result in results)
+
+    for obj in [sender, *recipients]:
+        obj.refresh_from_db()
+
+    assert sender.balance == balances[sender.pk] - Decimal("20") + Decimal("5.55")
+    assert recipient1.balance == balances[recipient1.pk] + Decimal("10")
+    assert recipient2.balance == balances[recipient2.pk] + Decimal("10") - Decimal("15")
+    assert recipient3.balance == balances[recipient3.pk] + Decimal("15") - Decimal(
+        "5.55"
+    )
+
+
+@pytest.mark.django_db
+def test_batch_transfer_is_validated_against_balance_left_by_previous_transfers(
+    make_users,
+):
+    sender, recipients = make_users(sender_balance=Decimal("30"), recipients_count=2)
+    recipient1, recipient2 = recipients
+    recipient1_balance, recipient2_balance = recipient1.balance, recipient2.balance
+
+    instructions = [
+        TransferInstruction(0, sender.tin, [recipient1.tin], Decimal("20")),
+        TransferInstruction(1, sender.tin, [recipient2.tin], Decimal("20")),
+        TransferInstruction(2, sender.tin, ["2222222222"], Decimal("1")),
+        TransferInstruction(3, "3333333333", [recipient2.tin], Decimal("1")),
+    ]
+    results = BatchTransferService(instructions).transfer()
+
+    assert [result.errors for result in results] == [
+        [],
+        ["User doesn't have enough money"],
+        ["Tin not found: 2222222222"],
+        ["Sender does not exist"],
+    ]
+
+    for obj in [sender, *recipients]:
+        obj.refresh_from_db()
+
+    assert sender.balance == Decimal("10")
+    assert recipient1.balance == recipient1_balance + Decimal("20")
+    assert recipient2.balance == recipient2_balance
+
+
+@pytest.mark.django_db
+def test_batch_transfer_runs_fixed_number_of_queries_per_chunk(
+    make_users, django_assert_num_queries
+):
+    sender, recipients = make_users(sender_balance=Decimal("1000"), recipients_count=5)
+
+    instructions = [
+        TransferInstruction(i, sender.tin, [recipient.tin], Decimal("1"))
+        for i, recipient in enumerate(recipients * 10)
+    ]
+    # savepoint, locking select, balances update, balance bucket moves, transfers and
+    # ledger entries inserts, savepoint release
+    with django_assert_num_queries(7):
+        results = BatchTransferService(instructions).transfer()
+
+    assert all(result.succeeded for result in results)
+
+
+@pytest.mark.django_db
+def test_batch_transfers_are_recorded_in_ledger(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("100"), recipients_count=2)
+    recipient1, recipient2 = recipients
+
+    instructions = [
+        TransferInstruction(
+            0, sender.tin, [recipient1.tin, recipient2.tin], Decimal("20")
+        ),
+        TransferInstruction(1, sender.tin, ["2222222222"], Decimal("1")),
+        TransferInstruction(2, recipient1.tin, [recipient2.tin], Decimal("5")),
+    ]
+    BatchTransferService(instructions).transfer()
+
+    assert list(Transfer.objects.order_by("pk").values_list("sender_id", "amount")) == [
+        (sender.pk, Decimal("20")),
+        (recipient1.pk, Decimal("5")),
+    ]
+    assert sorted(LedgerEntry.objects.values_list("account_id", "amount")) == sorted(
+        [
+            (sender.pk, Decimal("-20")),
+            (recipient1.pk, Decimal("10")),
+            (recipient2.pk, Decimal("10")),
+            (recipient1.pk, Decimal("-5")),
+            (recipient2.pk, Decimal("5")),
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_chunk_with_large_fan_out_is_written(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("1000"), recipients_count=20)
+    tins = [recipient.tin for recipient in recipients]
+
+    # the ledger entries of the chunk take more parameters than one INSERT can
+    instructions = [
+        TransferInstruction(i, sender.tin, tins, Decimal("0.2")) for i in range(1000)
+    ]
+    results = BatchTransferService(instructions, chunk_size=1000).transfer()
+
+    assert all(result.succeeded for result in results)
+    assert LedgerEntry.objects.count() == 21000
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("800")
@@ -0,0 +1,12 @@
+import pytest
+
+from core.benchmarks.endpoints import connection_reuse
+
+
+@pytest.mark.django_db(transaction=True)
+def test_persistent_connection_is_reused_between_requests():
+    report = connection_reuse(operations=10)
+
+    assert report["per_request"]["connects_per_request"] >= 1
+    # only the first request connects
+    assert report["persistent"]["connects_per_request"] <= 0.1
@@ -0,0 +1,56 @@
+from unittest.mock import MagicMock
+
+from django.db import OperationalError
+
+import pytest
+
+from accounts.constants import MAX_TRANSFER_RETRIES
+from core.db import DEADLOCK_DETECTED, atomic_with_retry
+
+
+def make_error(pgcode):
+    cause = Exception("driver error")
+    cause.pgcode = pgcode
+    error = OperationalError("error")
+    error.__cause__ = cause
+    return error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_is_retried_after_deadlock():
+    func = MagicMock(side_effect=[make_error(DEADLOCK_DETECTED), "result"])
+    on_retry = MagicMock()
+
+    assert atomic_with_retry(func, on_retry=on_retry) == "result"
+    assert func.call_count == 2
+    on_retry.assert_called_once()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_is_retried_limited_number_of_times():
+    func = MagicMock(side_effect=make_error(DEADLOCK_DETECTED))
+
+    with pytest.raises(OperationalError):
+        atomic_with_retry(func)
+
+    assert func.call_count == MAX_TRANSFER_RETRIES + 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_is_not_retried_after_other_errors():
+    func = MagicMock(side_effect=make_error("42P01"))
+
+    with pytest.raises(OperationalError):
+        atomic_with_retry(func)
+
+    func.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_transaction_is_not_retried_inside_outer_transaction():
+    func = MagicMock(side_effect=make_error(DEADLOCK_DETECTED))
+
+    with pytest.raises(OperationalError):
+        atomic_with_retry(func)
+
+    func.assert_called_once()
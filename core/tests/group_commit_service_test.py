@@ -0,0 +1,126 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.db import OperationalError
+
+import pytest
+
+from accounts.models import IdempotencyKey, LedgerEntry, Transfer
+from core.services.group_commit import GroupCommitter, apply_group
+from core.services.transfer_money import Service as TransferService
+
+
+@pytest.mark.django_db
+def test_group_is_applied_in_order(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("100"), recipients_count=2)
+    recipient1, recipient2 = recipients
+    balances = {account.pk: account.balance for account in [sender, *recipients]}
+
+    outcomes = apply_group(
+        [
+            TransferService(sender, Decimal("20"), [recipient1.tin, recipient2.tin]),
+            # the recipient pays with money credited by the first transfer
+            TransferService(recipient1, Decimal("5"), [sender.tin]),
+        ]
+    )
+
+    assert [type(outcome) for outcome in outcomes] == [Transfer, Transfer]
+    for account in [sender, *recipients]:
+        account.refresh_from_db()
+    assert sender.balance == balances[sender.pk] - Decimal("20") + Decimal("5")
+    assert recipient1.balance == balances[recipient1.pk] + Decimal("10") - Decimal("5")
+    assert recipient2.balance == balances[recipient2.pk] + Decimal("10")
+    assert LedgerEntry.objects.filter(transfer__in=outcomes).count() == 5
+
+
+@pytest.mark.django_db
+def test_failing_transfer_does_not_affect_group(make_users):
+    sender, (recipient,) = make_users(sender_balance=Decimal("15"), recipients_count=1)
+
+    # the second transfer is validated against the balance left by the first one
+    outcomes = apply_group(
+        [
+            TransferService(sender, Decimal("10"), [recipient.tin]),
+            TransferService(sender, Decimal("10"), [recipient.tin]),
+            TransferService(sender, Decimal("5"), ["1111111111"]),
+            TransferService(sender, Decimal("5"), [recipient.tin]),
+        ]
+    )
+
+    assert isinstance(outcomes[0], Transfer)
+    assert outcomes[1].messages == ["User doesn't have enough money"]
+    assert outcomes[2].messages == ["Tin not found: 1111111111"]
+    assert isinstance(outcomes[3], Transfer)
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("0")
+
+
+@pytest.mark.django_db
+def test_idempotency_keys_are_shared_within_group(make_users):
+    sender, (recipient,) = make_users(sender_balance=Decimal("100"), recipients_count=1)
+    previous = TransferService(
+        sender, Decimal("10"), [recipient.tin], idempotency_key="first"
+    ).transfer()
+
+    outcomes = apply_group(
+        [
+            TransferService(
+                sender, Decimal("10"), [recipient.tin], idempotency_key="first"
+            ),
+            TransferService(
+                sender, Decimal("10"), [recipient.tin], idempotency_key="second"
+            ),
+            TransferService(
+                sender, Decimal("10"), [recipient.tin], idempotency_key="second"
+            ),
+        ]
+    )
+
+    assert outcomes[0] == previous
+    assert outcomes[1] is outcomes[2]
+    assert IdempotencyKey.objects.filter(sender_id=sender.pk).count() == 2
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("80")
+
+
+@pytest.mark.django_db
+def test_group_failing_in_database_is_applied_one_by_one(make_users):
+    sender, (recipient,) = make_users(sender_balance=Decimal("100"), recipients_count=1)
+    services = [
+        TransferService(sender, Decimal("10"), [recipient.tin]),
+        TransferService(sender, Decimal("1000"), [recipient.tin]),
+    ]
+
+    with patch(
+        "core.services.group_commit._apply_together",
+        side_effect=OperationalError("could not serialize access"),
+    ):
+        outcomes = apply_group(services)
+
+    assert isinstance(outcomes[0], Transfer)
+    assert isinstance(outcomes[1], ValidationError)
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("90")
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("close_pool_connections")
+def test_concurrent_submissions_share_commit(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("100"), recipients_count=3)
+    committer = GroupCommitter(window_seconds=5, max_size=4)
+
+    futures = [
+        committer.submit(TransferService(sender, Decimal("10"), [recipient.tin]))
+        for recipient in recipients
+    ]
+    futures.append(
+        committer.submit(TransferService(sender, Decimal("1000"), [recipients[0].tin]))
+    )
+
+    assert all(isinstance(future.result(), Transfer) for future in futures[:3])
+    with pytest.raises(ValidationError):
+        futures[3].result()
+    assert committer.groups_count == 1
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("70")
@@ -0,0 +1,197 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+import pytest
+
+from accounts.constants import HOT_ACCOUNT_SHARDS_COUNT
+from accounts.models import BalanceShard
+from core.db import VersionConflict
+from core.services.batch_transfer import Service as BatchTransferService
+from core.services.batch_transfer import TransferInstruction
+from core.services.hot_accounts import credit_balance_shards, disable_hot_account, enable_hot_account, lock_hot_accounts
+from core.services.transfer_money import Service as TransferService
+
+
+@pytest.mark.django_db
+def test_enable_hot_account_creates_balance_shards(make_users):
+    _, (account,) = make_users(recipients_count=1)
+
+    enable_hot_account(account)
+    enable_hot_account(account)
+
+    account.refresh_from_db()
+    assert account.is_hot_account
+    assert account.balance_shards.count() == HOT_ACCOUNT_SHARDS_COUNT
+
+
+@pytest.mark.django_db
+def test_transfer_to_hot_account_credits_balance_shard(make_users):
+    sender, recipients = make_users(recipients_count=2)
+    hot_recipient, recipient = recipients
+    enable_hot_account(hot_recipient)
+    hot_recipient.refresh_from_db()
+    hot_recipient_balance, recipient_balance = hot_recipient.balance, recipient.balance
+
+    TransferService(
+        sender, Decimal("20"), [hot_recipient.tin, recipient.tin]
+    ).transfer()
+
+    for obj in [sender, *recipients]:
+        obj.refresh_from_db()
+
+    assert sender.balance == Decimal("80")
+    assert recipient.balance == recipient_balance + Decimal("10")
+    assert hot_recipient.balance == hot_recipient_balance
+    assert hot_recipient.total_balance == hot_recipient_balance + Decimal("10")
+    assert sorted(hot_recipient.balance_shards.values_list("balance", flat=True))[
+        -1
+    ] == Decimal("10")
+
+
+@pytest.mark.django_db
+def test_hot_account_can_spend_money_of_its_balance_shards(make_users):
+    sender, (hot_account,) = make_users(
+        sender_balance=Decimal("100"), recipients_count=1
+    )
+    enable_hot_account(hot_account)
+    hot_account.refresh_from_db()
+
+    TransferService(sender, Decimal("100"), [hot_account.tin]).transfer()
+    TransferService(hot_account, Decimal("100"), [sender.tin]).transfer()
+
+    hot_account.refresh_from_db()
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("100")
+    assert hot_account.balance == Decimal("0")
+    assert hot_account.total_balance == Decimal("0")
+
+
+@pytest.mark.django_db
+def test_batch_transfer_collects_balance_shards_of_hot_accounts(make_users):
+    sender, (hot_account,) = make_users(
+        sender_balance=Decimal("100"), recipients_count=1
+    )
+    enable_hot_account(hot_account)
+    TransferService(sender, Decimal("50"), [hot_account.tin]).transfer()
+
+    results = BatchTransferService(
+        [TransferInstruction(0, hot_account.tin, [sender.tin], Decimal("50"))]
+    ).transfer()
+
+    assert results[0].succeeded
+    hot_account.refresh_from_db()
+    assert hot_account.total_balance == Decimal("0")
+
+
+@pytest.mark.django_db
+def test_disable_hot_account_moves_money_back_to_balance(make_users):
+    sender, (hot_account,) = make_users(recipients_count=1)
+    enable_hot_account(hot_account)
+    TransferService(sender, Decimal("25"), [hot_account.tin]).transfer()
+
+    disable_hot_account(hot_account)
+
+    hot_account.refresh_from_db()
+    assert not hot_account.is_hot_account
+    assert hot_account.balance == Decimal("25")
+    assert not hot_account.balance_shards.exists()
+
+
+@pytest.mark.django_db
+def test_credit_to_removed_balance_shards_is_not_lost(make_users):
+    _, (hot_account,) = make_users(recipients_count=1)
+    enable_hot_account(hot_account)
+    BalanceShard.objects.filter(account=hot_account).delete()
+
+    with pytest.raises(VersionConflict):
+        credit_balance_shards({hot_account.pk: Decimal("10")})
+
+
+@pytest.mark.django_db
+def test_lock_hot_accounts_rejects_disabled_account(make_users):
+    _, (account,) = make_users(recipients_count=1)
+
+    with pytest.raises(VersionConflict):
+        lock_hot_accounts(Q(tin=account.tin))
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="row locks require PostgreSQL"
+)
+def test_transfer_waits_for_disabled_hot_account(make_users, settings):
+    settings.TRANSFER_LOCK_TIMEOUT_MS = 0
+    sender, (hot_account,) = make_users(recipients_count=1)
+    enable_hot_account(hot_account)
+    TransferService(sender, Decimal("25"), [hot_account.tin]).transfer()
+    disabling = threading.Event()
+    release = threading.Event()
+
+    def disable():
+        with transaction.atomic():
+            disable_hot_account(hot_account)
+            disabling.set()
+            release.wait(10)
+        connection.close()
+
+    disabler = threading.Thread(target=disable)
+    disabler.start()
+    try:
+        disabling.wait(10)
+        # the transfer has read the account as hot and waits for its share lock
+        threading.Timer(0.5, release.set).start()
+        service = TransferService(sender, Decimal("10"), [hot_account.tin])
+        service.transfer()
+    finally:
+        release.set()
+        disabler.join()
+
+    hot_account.refresh_from_db()
+    assert service.retries == 1
+    assert not hot_account.is_hot_account
+    assert hot_account.balance == Decimal("35")
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="row locks require PostgreSQL"
+)
+def test_credit_to_hot_account_does_not_deadlock_with_its_transfers(
+    make_users, settings
+):
+    settings.TRANSFER_LOCK_TIMEOUT_MS = 0
+    hot_account, (_, account) = make_users(recipients_count=2)
+    enable_hot_account(hot_account)
+    to_hot_account = TransferService(account, Decimal("5"), [hot_account.tin])
+    from_hot_account = TransferService(hot_account, Decimal("20"), [account.tin])
+    locked = threading.Event()
+
+    def pause_after_locking(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if " FOR " in sql and not locked.is_set():
+            # the other transfer locks the hot account and waits for this one's sender
+            locked.set()
+            time.sleep(0.5)
+        return result
+
+    def transfer_to_hot_account():
+        with connection.execute_wrapper(pause_after_locking):
+            to_hot_account.transfer()
+        connection.close()
+
+    # the hot account has the lower primary key but is locked by the second statement
+    thread = threading.Thread(target=transfer_to_hot_account)
+    thread.start()
+    try:
+        locked.wait(10)
+        from_hot_account.transfer()
+    finally:
+        thread.join()
+
+    assert to_hot_account.retries == from_hot_account.retries == 0
+    account.refresh_from_db()
+    assert account.balance == Decimal("10") - Decimal("5") + Decimal("20")
@@ -0,0 +1,51 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from accounts.models import User
+from core.benchmarks.load_test import TrafficItem, read_traffic, run_load_test, synthesize_traffic
+
+
+def test_synthesized_traffic_is_skewed_to_hot_account():
+    tins = [f"{i:010d}" for i in range(10)]
+
+    traffic = synthesize_traffic(
+        tins, count=200, max_recipients=3, hot_skew=0.5, seed=1
+    )
+
+    assert len(traffic) == 200
+    hot_transfers = [item for item in traffic if item.recipients == [tins[0]]]
+    assert 60 < len(hot_transfers) < 140
+    for item in traffic:
+        assert 1 <= len(item.recipients) <= 3
+        assert item.sender not in item.recipients
+        assert item.amount == Decimal("0.01") * len(item.recipients)
+
+
+def test_traffic_is_read_from_json_lines():
+    lines = [
+        json.dumps(
+            {"sender": "1111111111", "recipients": ["2222222222"], "amount": "1.50"}
+        ),
+        "",
+        json.dumps({"sender": "2222222222", "recipients": ["1111111111"], "amount": 2}),
+    ]
+
+    assert read_traffic(lines) == [
+        TrafficItem("1111111111", ["2222222222"], Decimal("1.50")),
+        TrafficItem("2222222222", ["1111111111"], Decimal("2")),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("target", ["service", "view", "api"])
+def test_load_test_reports_transfers(target):
+    report = run_load_test(
+        target=target, threads=1, operations=5, users=5, max_recipients=2, hot_skew=0.2
+    )
+
+    assert report["operations"] == 5
+    assert report["errors"] == {}
+    assert report["queries_per_operation"] > 0
+    assert not User.objects.exists()
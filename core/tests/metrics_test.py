@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+import pytest
+
+from accounts.tests.fixtures import client
+from core import metrics
+from core.services.transfer_money import Service as TransferService
+
+
+def test_registry_renders_prometheus_text():
+    registry = metrics.Registry()
+    registry.increment("transfer_total", outcome="succeeded")
+    registry.increment("transfer_total", outcome="succeeded")
+    registry.observe("transfer_phase_seconds", 0.003, phase="lock")
+    registry.observe("transfer_phase_seconds", 5, phase="lock")
+
+    lines = registry.render().splitlines()
+
+    assert 'transfer_total{outcome="succeeded"} 2' in lines
+    assert "# TYPE transfer_phase_seconds histogram" in lines
+    assert 'transfer_phase_seconds_bucket{phase="lock",le="0.0025"} 0' in lines
+    assert 'transfer_phase_seconds_bucket{phase="lock",le="0.005"} 1' in lines
+    assert 'transfer_phase_seconds_bucket{phase="lock",le="+Inf"} 2' in lines
+    assert 'transfer_phase_seconds_sum{phase="lock"} 5.003' in lines
+    assert 'transfer_phase_seconds_count{phase="lock"} 2' in lines
+
+
+def test_registry_sums_histogram_by_labels():
+    registry = metrics.Registry()
+    registry.observe("transfer_phase_seconds", 0.25, phase="ledger")
+    registry.observe("transfer_phase_seconds", 0.5, phase="ledger")
+    registry.observe("transfer_phase_seconds", 1, phase="lock")
+
+    assert registry.get_sum("transfer_phase_seconds", phase="ledger") == 0.75
+    assert registry.get_sum("transfer_phase_seconds", phase="read") == 0.0
+
+
+@pytest.mark.django_db
+def test_transfer_records_nothing_when_disabled(settings, make_users):
+    settings.TRANSFER_METRICS = False
+    metrics.registry.clear()
+    sender, recipients = make_users()
+
+    TransferService(sender, Decimal("10"), [recipients[0].tin]).transfer()
+
+    assert not metrics.registry.counters
+    assert not metrics.registry.histograms
+
+
+@pytest.mark.django_db
+def test_transfer_records_phases_and_queries(metrics_enabled, make_users):
+    sender, recipients = make_users(recipients_count=2)
+
+    TransferService(
+        sender, Decimal("10"), [recipient.tin for recipient in recipients]
+    ).transfer()
+
+    phases = {
+        dict(labels)["phase"]
+        for labels in metrics.registry.histograms["transfer_phase_seconds"]
+    }
+    assert phases == {
+        "lock",
+        "collect_shards",
+        "validate_transfer_amount",
+        "validate_recipients",
+        "validate_amount_per_recipient",
+        "balance_update",
+        "ledger",
+    }
+    assert metrics.registry.counters["transfer_total"] == {
+        (("outcome", "succeeded"),): 1
+    }
+    assert metrics.registry.counters["transfer_queries_total"][()] > 0
+    assert metrics.registry.histograms["transfer_seconds"][()].sum > 0
+
+
+@pytest.mark.django_db
+def test_rejected_transfer_is_counted(metrics_enabled, make_users):
+    sender, recipients = make_users()
+
+    with pytest.raises(ValidationError):
+        TransferService(sender, Decimal("1000"), [recipients[0].tin]).transfer()
+
+    assert metrics.registry.counters["transfer_total"] == {
+        (("outcome", "rejected"),): 1
+    }
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(metrics_enabled, make_users):
+    sender, recipients = make_users()
+    TransferService(sender, Decimal("10"), [recipients[0].tin]).transfer()
+
+    response = client().get("/metrics/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert 'transfer_total{outcome="succeeded"} 1' in response.content.decode()
+
+
+def test_metrics_endpoint_is_hidden_when_disabled(settings):
+    settings.TRANSFER_METRICS = False
+
+    assert client().get("/metrics/").status_code == 404
@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+import pytest
+
+from core import money
+
+
+@pytest.mark.parametrize(
+    "cents,weights,parts",
+    [
+        (3333, [1, 1, 1], [1111, 1111, 1111]),
+        (3332, [1, 1, 1], [1111, 1111, 1110]),
+        (1000, [1, 1, 4], [167, 167, 666]),
+        (1, [1, 1], [1, 0]),
+        (100, [3, 7], [30, 70]),
+        (10, [1, 2, 2], [2, 4, 4]),
+    ],
+)
+def test_split_cents_distributes_largest_remainders(cents, weights, parts):
+    assert money.split_cents(cents, weights) == parts
+
+
+def test_split_adds_up_to_amount():
+    amount = Decimal("1000.01")
+
+    parts = money.split(amount, 7)
+
+    assert sum(parts) == amount
+    assert max(parts) - min(parts) == Decimal("0.01")
+
+
+def test_cents_conversion():
+    assert money.to_cents(Decimal("33.32")) == 3332
+    assert money.to_cents(Decimal("10")) == 1000
+    assert money.from_cents(3332) == Decimal("33.32")
+    assert str(money.from_cents(5)) == "0.05"
+
+
+def test_group_by_amount():
+    groups = money.group_by_amount(
+        {1: Decimal("11.11"), 2: Decimal("11.10"), 3: Decimal("11.11")}
+    )
+
+    assert groups == {Decimal("11.11"): [1, 3], Decimal("11.10"): [2]}
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+
+import pytest
+
+from accounts.models import LedgerEntry, Transfer
+from core.services.hot_accounts import enable_hot_account
+from core.services.payout import Service as PayoutService
+
+
+@pytest.mark.django_db
+def test_payout_is_split_across_chunks(make_users, django_assert_num_queries):
+    sender, recipients = make_users(recipients_count=5)
+    balances = [recipient.balance for recipient in recipients]
+    tins = [recipient.tin for recipient in recipients]
+
+    # savepoint, sender check, 3 chunks of TINs resolved, transfer insert,
+    # 3 chunks of (lock, update, ledger insert), bucket moves of the recipient with nothing,
+    # sender update, bucket move of the sender, sender ledger insert, savepoint release
+    with django_assert_num_queries(20):
+        transfer = PayoutService(
+            sender, Decimal("50.02"), tins, len(tins), chunk_size=2
+        ).transfer()
+
+    assert transfer.amount == Decimal("50.02")
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("49.98")
+
+    shares = [Decimal("10.01"), Decimal("10.01"), *[Decimal("10.00")] * 3]
+    for recipient, balance, share in zip(recipients, balances, shares):
+        recipient.refresh_from_db()
+        assert recipient.balance == balance + share
+
+    assert transfer.entries.count() == 6
+    assert sum(transfer.entries.values_list("amount", flat=True)) == 0
+
+
+@pytest.mark.django_db
+def test_payout_locks_sender_in_primary_key_order(make_users):
+    _, recipients = make_users(recipients_count=2)
+    sender, more_recipients = make_users(recipients_count=2)
+    recipients += more_recipients
+    ids = [recipient.pk for recipient in recipients]
+
+    service = PayoutService(
+        sender, Decimal("40"), [r.tin for r in reversed(recipients)], 4, chunk_size=2
+    )
+    with patch.object(
+        PayoutService,
+        "_lock_chunk",
+        autospec=True,
+        side_effect=PayoutService._lock_chunk,
+    ) as lock_chunk:
+        service.transfer()
+
+    # the recipients are locked in pk order, the sender together with the ones after it
+    assert [call.args[1:] for call in lock_chunk.call_args_list] == [
+        (ids[:2], None),
+        (ids[2:], sender.pk),
+    ]
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("60")
+
+
+@pytest.mark.django_db
+def test_payout_credits_hot_recipients_through_shards(make_users):
+    sender, recipients = make_users(recipients_count=2)
+    hot_recipient = recipients[0]
+    hot_balance = hot_recipient.balance
+    enable_hot_account(hot_recipient)
+
+    PayoutService(
+        sender, Decimal("20"), [r.tin for r in recipients], 2, chunk_size=1
+    ).transfer()
+
+    hot_recipient.refresh_from_db()
+    assert hot_recipient.balance == hot_balance
+    assert hot_recipient.total_balance == hot_balance + Decimal("10")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "tins,error_message",
+    [
+        (["2222222222"], "Tin not found: 2222222222"),
+        (["recipient", "recipient"], "Tin cannot be repeated"),
+        (["recipient", "sender"], "User cannot send money to himself"),
+    ],
+    ids=["tin_not_found", "tin_repeated_in_other_chunk", "sender_is_recipient"],
+)
+def test_failed_payout_changes_nothing(make_users, tins, error_message):
+    sender, recipients = make_users(recipients_count=1)
+    names = {"sender": sender.tin, "recipient": recipients[0].tin}
+    tins = [names.get(tin, tin) for tin in tins]
+
+    service = PayoutService(sender, Decimal("20"), tins, len(tins), chunk_size=1)
+    with pytest.raises(ValidationError) as exc_info:
+        service.transfer()
+
+    assert exc_info.value.messages == [error_message]
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("100")
+    assert not Transfer.objects.exists()
+    assert not LedgerEntry.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "amount,error_message",
+    [
+        (Decimal("100.01"), "User doesn't have enough money"),
+        (Decimal("0.01"), "The amount is too small"),
+    ],
+)
+def test_cannot_payout_invalid_amount(make_users, amount, error_message):
+    sender, recipients = make_users(recipients_count=2)
+
+    with pytest.raises(ValidationError) as exc_info:
+        PayoutService(sender, amount, [r.tin for r in recipients], 2).transfer()
+
+    assert exc_info.value.messages == [error_message]
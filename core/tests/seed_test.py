@@ -0,0 +1,17 @@
+import pytest
+
+from accounts.models import Account, User
+from core.benchmarks.seed import benchmark_users
+from core.db import max_bulk_batch_size
+
+
+@pytest.mark.django_db
+def test_more_users_than_one_query_can_take_are_seeded_and_removed():
+    # accounts have the fewest fields, so more than their batch overflows both inserts
+    count = max_bulk_batch_size(Account) + 1
+
+    with benchmark_users(count) as users:
+        assert len(users) == count
+        assert Account.objects.filter(user__in=users).count() == count
+
+    assert not User.objects.exists()
@@ -0,0 +1,45 @@
+from django.db import connection
+
+import pytest
+
+from core.benchmarks.endpoints import transfer_storm
+from core.benchmarks.transfers import concurrency_modes, crossing_transfers
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="row locks require PostgreSQL"
+)
+def test_concurrent_crossing_transfers_do_not_fail():
+    report = crossing_transfers(threads=8, operations=25, users=6)
+
+    assert report["errors"] == {}
+    assert report["operations"] == 8 * 25
+    assert report["balance_conserved"]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="row locks require PostgreSQL"
+)
+def test_concurrency_modes_conserve_balances():
+    report = concurrency_modes(threads=4, operations=10)
+
+    for level in report.values():
+        for mode in ("pessimistic", "optimistic"):
+            assert level[mode]["balance_conserved"]
+            assert level[mode]["operations"] == 4 * 10
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="row locks require PostgreSQL"
+)
+def test_other_pages_keep_latency_during_transfer_storm():
+    report = transfer_storm(threads=4, operations=3, hold_seconds=1)
+
+    protected, unprotected = report["admission_control"], report["unprotected"]
+    # without admission control every slot waits for the lock, the lookups wait behind them
+    assert unprotected["lookup_p50_ms"] > 1000
+    assert protected["lookup_p99_ms"] < unprotected["lookup_p50_ms"]
+    assert protected["responses"]["transfer_503"] > 0
@@ -0,0 +1,146 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import IntegrityError
+
+import pytest
+
+from accounts.models import TransferJob
+from core.db import DEADLOCK_DETECTED, Busy
+from core.services.batch_transfer import UNEXPECTED_ERROR_MESSAGE
+from core.services.transfer_jobs import enqueue_transfer, process_next_job
+from core.services.transfer_money import Service as TransferService
+from core.tests.db_test import make_error
+
+
+@pytest.mark.django_db
+def test_enqueued_transfer_is_applied_by_worker(make_users):
+    sender, recipients = make_users(recipients_count=2)
+    recipient1, recipient2 = recipients
+    recipient1_balance = recipient1.balance
+
+    job = enqueue_transfer(sender.user, Decimal("20"), [recipient1.tin, recipient2.tin])
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("100")
+
+    processed_job = process_next_job()
+
+    assert processed_job == job
+    assert processed_job.status == TransferJob.Status.SUCCEEDED
+    assert processed_job.transfer.amount == Decimal("20")
+
+    sender.refresh_from_db()
+    recipient1.refresh_from_db()
+    assert sender.balance == Decimal("80")
+    assert recipient1.balance == recipient1_balance + Decimal("10")
+
+    assert process_next_job() is None
+
+
+@pytest.mark.django_db
+def test_failed_transfer_job_keeps_errors(make_users):
+    sender, _ = make_users(recipients_count=0)
+
+    enqueue_transfer(sender.user, Decimal("20"), ["2222222222"])
+    job = process_next_job()
+
+    assert job.status == TransferJob.Status.FAILED
+    assert job.errors == ["Tin not found: 2222222222"]
+    assert job.transfer is None
+
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("100")
+
+
+@pytest.mark.django_db
+def test_transfer_job_failing_unexpectedly_is_not_taken_again(make_users):
+    sender, (recipient,) = make_users(recipients_count=1)
+    enqueue_transfer(sender.user, Decimal("20"), [recipient.tin])
+
+    with patch.object(TransferService, "transfer", side_effect=IntegrityError):
+        job = process_next_job()
+
+    assert job.status == TransferJob.Status.FAILED
+    assert job.errors == [UNEXPECTED_ERROR_MESSAGE]
+    assert process_next_job() is None
+
+
+@pytest.mark.django_db
+def test_transfer_job_timing_out_stays_pending(make_users):
+    sender, (recipient,) = make_users(recipients_count=1)
+    job = enqueue_transfer(sender.user, Decimal("20"), [recipient.tin])
+
+    with patch.object(TransferService, "transfer", side_effect=Busy):
+        with pytest.raises(Busy):
+            process_next_job()
+
+    job.refresh_from_db()
+    assert job.status == TransferJob.Status.PENDING
+    assert process_next_job().status == TransferJob.Status.SUCCEEDED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transfer_job_is_retried_after_deadlock(make_users):
+    sender, (recipient,) = make_users(recipients_count=1)
+    enqueue_transfer(sender.user, Decimal("20"), [recipient.tin])
+    transfer = TransferService.transfer
+    errors = [make_error(DEADLOCK_DETECTED)]
+
+    def deadlock_once(service):
+        if errors:
+            raise errors.pop()
+        return transfer(service)
+
+    with patch.object(TransferService, "transfer", deadlock_once):
+        job = process_next_job()
+
+    assert job.status == TransferJob.Status.SUCCEEDED
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("80")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_command_drains_queue(make_users):
+    sender, recipients = make_users(recipients_count=2)
+    for recipient in recipients:
+        enqueue_transfer(sender.user, Decimal("10"), [recipient.tin])
+
+    call_command("process_transfer_jobs", workers=1, once=True)
+
+    assert list(TransferJob.objects.values_list("status", flat=True)) == [
+        TransferJob.Status.SUCCEEDED,
+        TransferJob.Status.SUCCEEDED,
+    ]
+    sender.refresh_from_db()
+    assert sender.balance == Decimal("80")
+
+
+@patch(
+    "accounts.management.commands.process_transfer_jobs.process_next_job",
+    side_effect=[RuntimeError, None],
+)
+def test_worker_survives_failing_job(process_next_job):
+    call_command("process_transfer_jobs", workers=1, once=True, poll_interval=0)
+
+    assert process_next_job.call_count == 2
+
+
+@patch(
+    "accounts.management.commands.process_transfer_jobs.process_next_job",
+    side_effect=[Busy, None],
+)
+def test_worker_waits_for_contended_job(process_next_job, caplog):
+    call_command("process_transfer_jobs", workers=1, once=True, poll_interval=0)
+
+    assert process_next_job.call_count == 2
+    assert not caplog.records
+
+
+@patch(
+    "accounts.management.commands.process_transfer_jobs.process_next_job",
+    side_effect=[SystemExit, *[None] * 1000],
+)
+def test_dead_worker_stops_other_workers(process_next_job):
+    with pytest.raises(SystemExit):
+        call_command("process_transfer_jobs", workers=2, poll_interval=0.01)
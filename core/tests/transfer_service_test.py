@@ -1,10 +1,14 @@
 from decimal import Decimal
+from unittest import mock
 
 from django.core.exceptions import ValidationError
+from django.db.models import F
 
 import pytest
 
 from accounts.constants import MAX_TRANSFER_AMOUNT_PER_RECIPIENT
+from accounts.models import Account, LedgerEntry
+from accounts.tests.fixtures import TIMEOUTS_QUERIES_COUNT
 from core.services.transfer_money import Service as TransferService
 
 
@@ -33,25 +37,18 @@ def test_transfer_money_to_one_recipient(amount_to_transfer, make_users):
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
-    "amount_to_transfer,amount_per_recipient",
+    "amount_to_transfer,shares",
     [
-        (Decimal("33.33"), Decimal("11.11")),
-        (Decimal("33.32"), Decimal("11.10")),
+        (Decimal("33.33"), [Decimal("11.11"), Decimal("11.11"), Decimal("11.11")]),
+        (Decimal("33.32"), [Decimal("11.11"), Decimal("11.11"), Decimal("11.10")]),
     ],
     ids=["amount_equally_divided", "amount_not_equally_divided"],
 )
-def test_transfer_money_to_multiple_recipients(
-    make_users, amount_to_transfer, amount_per_recipient
-):
+def test_transfer_money_to_multiple_recipients(make_users, amount_to_transfer, shares):
     sender, recipients = make_users(recipients_count=3)
-    recipient1, recipient2, recipient3 = recipients
 
     sender_balance = sender.balance
-    recipient1_balance, recipient2_balance, recipient3_balance = (
-        recipient1.balance,
-        recipient2.balance,
-        recipient3.balance,
-    )
+    recipient_balances = [recipient.balance for recipient in recipients]
 
     transfer_service = TransferService(
         sender=sender,
@@ -63,12 +60,51 @@ def test_transfer_money_to_multiple_recipients(
     for obj in [sender, *recipients]:
         obj.refresh_from_db()
 
-    assert sender.balance == sender_balance - len(recipients) * amount_per_recipient
+    # the whole amount is debited, nothing is lost to rounding
+    assert sender.balance == sender_balance - amount_to_transfer
+
+    for recipient, balance, share in zip(recipients, recipient_balances, shares):
+        assert recipient.balance == balance + share
+
+
+@pytest.mark.django_db
+def test_transfer_money_split_by_weights(make_users):
+    sender, recipients = make_users(recipients_count=3)
+    recipient_balances = [recipient.balance for recipient in recipients]
+
+    TransferService(
+        sender=sender,
+        amount=Decimal("10"),
+        recipients=[recipient.tin for recipient in recipients],
+        weights=[1, 1, 4],
+    ).transfer()
 
-    for recipient, balance in zip(
-        recipients, [recipient1_balance, recipient2_balance, recipient3_balance]
+    for obj in [sender, *recipients]:
+        obj.refresh_from_db()
+
+    assert sender.balance == Decimal("90")
+    for recipient, balance, share in zip(
+        recipients,
+        recipient_balances,
+        [Decimal("1.67"), Decimal("1.67"), Decimal("6.66")],
     ):
-        assert recipient.balance == balance + amount_per_recipient
+        assert recipient.balance == balance + share
+
+
+@pytest.mark.django_db
+def test_cannot_transfer_money_with_invalid_weights(make_users):
+    sender, recipients = make_users(recipients_count=2)
+
+    transfer_service = TransferService(
+        sender=sender,
+        amount=Decimal("10"),
+        recipients=[recipient.tin for recipient in recipients],
+        weights=[1, 0],
+    )
+    with pytest.raises(ValidationError) as exc_info:
+        transfer_service.transfer()
+
+    assert [exc_info.value.message] == ["Every recipient must have a positive weight"]
 
 
 @pytest.mark.django_db
@@ -148,3 +184,163 @@ def test_cannot_transfer_money_if_user_does_not_exist(make_users):
 
     assert [exc_info.value.message] == ["Sender does not exist"]
     assert recipient.balance == recipient_balance
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("recipients_count", [1, 10])
+def test_transfer_runs_fixed_number_of_queries(
+    recipients_count, make_users, django_assert_num_queries
+):
+    sender, recipients = make_users(
+        sender_balance=Decimal("1000"), recipients_count=recipients_count
+    )
+
+    transfer_service = TransferService(
+        sender=sender,
+        amount=Decimal("100"),
+        recipients=[recipient.tin for recipient in recipients],
+    )
+    # savepoint, transaction timeouts, locking select of sender and recipients,
+    # balances update, balance bucket moves, transfer and ledger entries inserts,
+    # savepoint release
+    with django_assert_num_queries(7 + TIMEOUTS_QUERIES_COUNT):
+        transfer_service.transfer()
+
+
+@pytest.mark.django_db
+def test_transfer_is_recorded_in_ledger(make_users):
+    sender, recipients = make_users(recipients_count=3)
+
+    transfer = TransferService(
+        sender=sender,
+        amount=Decimal("33.32"),
+        recipients=[recipient.tin for recipient in recipients],
+    ).transfer()
+
+    assert transfer.sender == sender.user
+    assert transfer.amount == Decimal("33.32")
+    assert sorted(transfer.entries.values_list("account_id", "amount")) == sorted(
+        [
+            (sender.pk, Decimal("-33.32")),
+            (recipients[0].pk, Decimal("11.11")),
+            (recipients[1].pk, Decimal("11.11")),
+            (recipients[2].pk, Decimal("11.10")),
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_transfer_with_same_idempotency_key_is_applied_once(
+    make_users, django_assert_num_queries
+):
+    sender, recipients = make_users(recipients_count=1)
+    recipient = recipients[0]
+    recipient_balance = recipient.balance
+
+    transfer = TransferService(
+        sender, Decimal("10"), [recipient.tin], idempotency_key="key"
+    ).transfer()
+
+    with django_assert_num_queries(1):
+        retried_transfer = TransferService(
+            sender, Decimal("10"), [recipient.tin], idempotency_key="key"
+        ).transfer()
+
+    assert retried_transfer == transfer
+
+    sender.refresh_from_db()
+    recipient.refresh_from_db()
+    assert sender.balance == Decimal("90")
+    assert recipient.balance == recipient_balance + Decimal("10")
+
+
+@pytest.mark.django_db
+def test_idempotency_keys_are_scoped_by_sender(make_users):
+    sender, recipients = make_users(recipients_count=1)
+    another_sender, _ = make_users(recipients_count=0)
+    recipient = recipients[0]
+
+    transfer = TransferService(
+        sender, Decimal("10"), [recipient.tin], idempotency_key="key"
+    ).transfer()
+    another_transfer = TransferService(
+        another_sender, Decimal("10"), [recipient.tin], idempotency_key="key"
+    ).transfer()
+
+    assert another_transfer != transfer
+    assert another_transfer.sender == another_sender.user
+
+
+@pytest.mark.django_db
+def test_failed_transfer_does_not_store_idempotency_key(make_users):
+    sender, recipients = make_users(recipients_count=1)
+
+    with pytest.raises(ValidationError):
+        TransferService(
+            sender, Decimal("1000"), [recipients[0].tin], idempotency_key="key"
+        ).transfer()
+
+    transfer = TransferService(
+        sender, Decimal("10"), [recipients[0].tin], idempotency_key="key"
+    ).transfer()
+
+    assert transfer.amount == Decimal("10")
+
+
+@pytest.mark.django_db
+def test_optimistic_transfer_runs_fixed_number_of_queries(
+    make_users, django_assert_num_queries
+):
+    sender, recipients = make_users(sender_balance=Decimal("1000"), recipients_count=3)
+    versions = [account.version for account in [sender, *recipients]]
+
+    transfer_service = TransferService(
+        sender=sender,
+        amount=Decimal("30"),
+        recipients=[recipient.tin for recipient in recipients],
+        optimistic=True,
+    )
+    # savepoint, transaction timeouts, select of sender and recipients without locks,
+    # conditional balances update, balance bucket moves, transfer and ledger entries inserts,
+    # savepoint release
+    with django_assert_num_queries(7 + TIMEOUTS_QUERIES_COUNT) as queries:
+        transfer_service.transfer()
+
+    assert not any("FOR UPDATE" in query["sql"] for query in queries.captured_queries)
+    for account in [sender, *recipients]:
+        account.refresh_from_db()
+    assert sender.balance == Decimal("970")
+    assert [account.version for account in [sender, *recipients]] == [
+        version + 1 for version in versions
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_optimistic_transfer_is_retried_after_version_conflict(make_users):
+    sender, recipients = make_users(sender_balance=Decimal("100"), recipients_count=1)
+    recipient = recipients[0]
+    recipient_balance = recipient.balance
+
+    transfer_service = TransferService(
+        sender=sender, amount=Decimal("10"), recipients=[recipient.tin], optimistic=True
+    )
+    read_accounts = transfer_service._read_accounts
+
+    def read_accounts_changed_once():
+        accounts = read_accounts()
+        if not transfer_service.retries:
+            # another transfer changes the sender after it has been read
+            Account.objects.filter(pk=sender.pk).update(version=F("version") + 1)
+        return accounts
+
+    with mock.patch.object(
+        transfer_service, "_read_accounts", side_effect=read_accounts_changed_once
+    ):
+        transfer_service.transfer()
+
+    sender.refresh_from_db()
+    recipient.refresh_from_db()
+    assert transfer_service.retries == 1
+    assert sender.balance == Decimal("90")
+    assert recipient.balance == recipient_balance + Decimal("10")
+    assert LedgerEntry.objects.filter(account=sender).count() == 1
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Local
     "accounts",
 ]
@@ -70,15 +71,71 @@ WSGI_APPLICATION = "money_transfer.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("DB_NAME"),
         "USER": os.getenv("DB_USER"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        # every uWSGI thread keeps its connection open between requests for this many seconds
+        # instead of connecting for each request, 0 closes it at the end of every request
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        # a persistent connection is checked before it is reused by a new request,
+        # so one dropped by a database restart is replaced instead of failing the request
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+        "OPTIONS": {
+            # parameters are sent apart from the statement, so psycopg prepares the statements
+            # a connection keeps repeating, like the few shapes every transfer issues;
+            # prepared statements need session pooling if a PgBouncer is put in between
+            "server_side_binding": os.getenv("DB_SERVER_SIDE_BINDING") != "False",
+            # executions of a statement after which it is prepared
+            "prepare_threshold": int(os.getenv("DB_PREPARE_THRESHOLD", "5")),
+        },
     }
 }
 
+# connections of a process are taken from a psycopg 3 pool shared by its threads,
+# pooled connections are returned at the end of every request instead of being persistent
+if os.getenv("DB_POOL") == "True":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "4")),
+        # seconds a request waits for a free connection
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/
+
+# django.contrib.sessions.backends.cached_db reads sessions from the cache and writes them
+# through to the database; it needs a cache shared by all workers, with the local memory
+# one a session ended in one worker would go on in the others
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.db")
+
+
+# Authentication
+# https://docs.djangoproject.com/en/5.1/topics/auth/customizing/
+
+AUTHENTICATION_BACKENDS = ["accounts.backends.CachedModelBackend"]
+
+# seconds the user of a session is cached, saving the user forgets it; 0 is no caching
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "10"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -132,3 +189,37 @@ STATIC_ROOT = BASE_DIR / "static"
 CSRF_TRUSTED_ORIGINS = list(
     filter(None, os.getenv("CSRF_TRUSTED_ORIGINS", "").split(","))
 )
+
+# Transfers
+
+# enqueue transfers to be applied by the process_transfer_jobs workers instead of
+# applying them inside the request
+TRANSFER_ASYNC = os.getenv("TRANSFER_ASYNC") == "True"
+
+# transfers a process runs at once, the others are rejected as busy right away;
+# uWSGI runs 2 threads per process, so one of them always serves the other pages
+TRANSFER_MAX_IN_FLIGHT = int(os.getenv("TRANSFER_MAX_IN_FLIGHT", "1"))
+
+# a transfer gives up after waiting this long for a locked row or running this long,
+# 0 is no limit; the lock timeout must stay above deadlock_timeout of PostgreSQL (1 s by
+# default), or a deadlock is reported as a timeout instead of being retried
+TRANSFER_LOCK_TIMEOUT_MS = int(os.getenv("TRANSFER_LOCK_TIMEOUT_MS", "2000"))
+TRANSFER_STATEMENT_TIMEOUT_MS = int(os.getenv("TRANSFER_STATEMENT_TIMEOUT_MS", "5000"))
+
+# threads running the queries of the async view in every ASGI worker,
+# each of them holds a database connection
+TRANSFER_THREADS = int(os.getenv("TRANSFER_THREADS", "8"))
+
+# debit the sender with a conditional UPDATE checking the version of the row read before,
+# retrying on conflict, instead of locking the rows with SELECT ... FOR UPDATE
+TRANSFER_OPTIMISTIC = os.getenv("TRANSFER_OPTIMISTIC") == "True"
+
+# transfers submitted by the threads of a process within the window are applied together
+# in one transaction by a single thread, which pays for one commit per group; this pays off
+# when a process has many transfers in flight: the async view or TRANSFER_MAX_IN_FLIGHT > 1
+TRANSFER_GROUP_COMMIT = os.getenv("TRANSFER_GROUP_COMMIT") == "True"
+TRANSFER_GROUP_COMMIT_WINDOW_MS = int(os.getenv("TRANSFER_GROUP_COMMIT_WINDOW_MS", "2"))
+TRANSFER_GROUP_COMMIT_MAX_SIZE = int(os.getenv("TRANSFER_GROUP_COMMIT_MAX_SIZE", "100"))
+
+# record transfer timings and query counts, exposed on /metrics
+TRANSFER_METRICS = os.getenv("TRANSFER_METRICS") == "True"
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.urls import include, path, reverse_lazy
 
+from accounts.views.metrics import MetricsView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -20,4 +22,6 @@ urlpatterns = [
         name="logout",
     ),
     path("transfer/", include("accounts.urls")),
+    path("api/", include("accounts.api_urls")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]